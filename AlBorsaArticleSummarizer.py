@@ -1,24 +1,68 @@
+import asyncio
 import json
 import time
 from datetime import datetime
 import os
 
-try:
-    from openai import OpenAI
-except ImportError:
-    print("Error: OpenAI library not found!")
-    print("Install it with: pip install openai")
-    exit(1)
+from arabic_text import word_count
+from article import ContentStore, as_article, dump_articles, load_articles
+from llm_rate_limiter import LLMRateLimiter, estimate_tokens, retry_after
+from metrics import LLM_REQUESTS, LLM_SECONDS, LLM_TOKENS, REGISTRY, SLEEP_SECONDS
+from near_duplicates import link_duplicates
+from parquet_store import ParquetStore
+from url_dedup import url_fingerprint
+
+# Result for articles with too little text to send
+SHORT_CONTENT = {
+    'summary': 'محتوى غير كافٍ للتلخيص',
+    'key_points': [],
+    'error': 'Content too short'
+}
+
+# Batch API states after which a batch won't change any more
+BATCH_FINAL_STATES = ('completed', 'failed', 'expired', 'cancelled')
+
+
+def batch_custom_id(article):
+    """Stable Batch API custom ID of an article: a fingerprint of its canonical URL"""
+    return f"article-{url_fingerprint(article.get('url', '')):016x}"
+
 
 class ArticleSummarizer:
-    def __init__(self, input_file='AlBorsaNewsScraped.json', api_key=''):
-        """Initialize summarizer with OpenAI"""
+    def __init__(self, input_file='AlBorsaNewsScraped.json', api_key='', quiet=False, base_url=None, interactive=True):
+        """Initialize summarizer with OpenAI (quiet: no per-article output)
+        
+        base_url: an OpenAI-compatible endpoint instead of api.openai.com
+        (also read from OPENAI_BASE_URL), e.g. benchmarks/mock_openai.py
+        interactive=False never prompts: a missing API key is an error
+        
+        The OpenAI client (and the openai package) is only loaded on first
+        use, so reports from saved summaries don't need either.
+        """
         self.input_file = input_file
         self.articles = []
         self.summarized_articles = []
-        
-        # Initialize OpenAI client
+        self.content_store = None  # On-disk article text when loaded with lazy_content
+        self.quiet = quiet
+        self.interactive = interactive
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.base_url = base_url or os.getenv('OPENAI_BASE_URL')
+        self._client = None
+    
+    @property
+    def client(self):
+        if self._client is None:
+            self.connect()
+        return self._client
+    
+    def connect(self):
+        """Create the OpenAI client, asking for the API key if needed (exits if there is none)"""
+        try:
+            from openai import OpenAI
+        except ImportError:
+            print("Error: OpenAI library not found!")
+            print("Install it with: pip install openai")
+            exit(1)
         
         if not self.api_key:
             print("⚠️  OpenAI API key not found!")
@@ -27,21 +71,27 @@ class ArticleSummarizer:
             print("2. Pass it when creating the summarizer: ArticleSummarizer(api_key='your-key')")
             print("\nGet your API key from: https://platform.openai.com/api-keys")
             
-            self.api_key = input("\n👉 Enter your OpenAI API key (or press ENTER to exit): ").strip()
+            if self.interactive:
+                self.api_key = input("\n👉 Enter your OpenAI API key (or press ENTER to exit): ").strip()
             if not self.api_key:
                 print("Cancelled.")
                 exit(1)
         
-        self.client = OpenAI(api_key=self.api_key)
+        self._client = OpenAI(api_key=self.api_key, base_url=self.base_url)
         print("✓ OpenAI client initialized\n")
         
-    def load_articles(self):
-        """Load articles from JSON file"""
+    def load_articles(self, lazy_content=False):
+        """Load articles from JSON file
+        
+        lazy_content: keep article text on disk and read it only when needed
+        (for very large corpora)
+        """
         print("📂 Loading articles...")
         
         try:
-            with open(self.input_file, 'r', encoding='utf-8') as f:
-                self.articles = json.load(f)
+            if lazy_content and self.content_store is None:
+                self.content_store = ContentStore()
+            self.articles = load_articles(self.input_file, content_store=self.content_store if lazy_content else None)
             
             print(f"✓ Loaded {len(self.articles)} articles from {self.input_file}\n")
             return True
@@ -54,25 +104,20 @@ class ArticleSummarizer:
             print(f"✗ Error loading file: {e}")
             return False
     
-    def summarize_with_openai(self, article, model="gpt-4o-mini"):
-        """Summarize article using OpenAI API"""
-        try:
-            title = article.get('title', 'No Title')
-            content = article.get('content', '')
-            
-            if not content or len(content) < 100:
-                return {
-                    'summary': 'محتوى غير كافٍ للتلخيص',
-                    'key_points': [],
-                    'error': 'Content too short'
-                }
-            
-            # Truncate very long content to save tokens
-            if len(content) > 4000:
-                content = content[:4000] + "..."
-            
-            # Create prompt
-            prompt = f"""قم بتلخيص هذا المقال الاقتصادي المصري باللغة العربية بشكل احترافي.
+    def completion_request(self, article, model="gpt-4o-mini"):
+        """Chat completion parameters for summarizing article, or None if it is too short to summarize"""
+        title = article.get('title', 'No Title')
+        content = article.get('content', '')
+        
+        if not content or len(content) < 100:
+            return None
+        
+        # Truncate very long content to save tokens
+        if len(content) > 4000:
+            content = content[:4000] + "..."
+        
+        # Create prompt
+        prompt = f"""قم بتلخيص هذا المقال الاقتصادي المصري باللغة العربية بشكل احترافي.
 
 العنوان: {title}
 
@@ -88,32 +133,49 @@ class ArticleSummarizer:
   "summary": "الملخص هنا",
   "key_points": ["نقطة 1", "نقطة 2", "نقطة 3"]
 }}"""
+        
+        return {
+            'model': model,
+            'messages': [
+                {
+                    "role": "system",
+                    "content": "أنت مساعد متخصص في تلخيص الأخبار الاقتصادية المصرية باللغة العربية. تقدم ملخصات دقيقة ومهنية."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            'temperature': 0.3,
+            'max_tokens': 500,
+            'response_format': {"type": "json_object"}
+        }
+    
+    def summarize_with_openai(self, article, model="gpt-4o-mini"):
+        """Summarize article using OpenAI API"""
+        try:
+            request = self.completion_request(article, model)
+            if request is None:
+                return SHORT_CONTENT.copy()
             
             # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "أنت مساعد متخصص في تلخيص الأخبار الاقتصادية المصرية باللغة العربية. تقدم ملخصات دقيقة ومهنية."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=500,
-                response_format={"type": "json_object"}
-            )
+            start = time.perf_counter()
+            response = self.client.chat.completions.create(**request)
+            LLM_SECONDS.labels(model).observe(time.perf_counter() - start)
+            usage = getattr(response, 'usage', None)
+            if usage is not None:
+                LLM_TOKENS.labels(model, 'prompt').inc(usage.prompt_tokens or 0)
+                LLM_TOKENS.labels(model, 'completion').inc(usage.completion_tokens or 0)
             
             # Parse response
             result_text = response.choices[0].message.content
             result = json.loads(result_text)
+            LLM_REQUESTS.labels(model, 'ok').inc()
             
             return result
             
         except json.JSONDecodeError as e:
+            LLM_REQUESTS.labels(model, 'bad_json').inc()
             print(f"  ⚠️  JSON parsing error: {e}")
             return {
                 'summary': 'خطأ في معالجة الرد',
@@ -121,6 +183,7 @@ class ArticleSummarizer:
                 'error': 'JSON parse error'
             }
         except Exception as e:
+            LLM_REQUESTS.labels(model, 'error').inc()
             print(f"  ✗ API Error: {e}")
             return {
                 'summary': 'خطأ في الاتصال بالخدمة',
@@ -128,55 +191,369 @@ class ArticleSummarizer:
                 'error': str(e)
             }
     
-    def summarize_all(self, delay=2, model="gpt-4o-mini"):
-        """Summarize all articles using OpenAI"""
+    async def summarize_async(self, client, limiter, article, model="gpt-4o-mini", max_retries=5):
+        """summarize_with_openai on an AsyncOpenAI client, paced by an LLMRateLimiter
+        
+        429s and server errors are retried up to max_retries times; the
+        limiter learns from every response's x-ratelimit-* headers.
+        """
+        from openai import APIConnectionError, APIStatusError, RateLimitError
+        
+        request = self.completion_request(article, model)
+        if request is None:
+            return SHORT_CONTENT.copy()
+        # OpenAI counts a request's tokens up front as prompt + max_tokens
+        reserved = sum(estimate_tokens(message['content']) for message in request['messages']) + request['max_tokens']
+        
+        error = 'rate limited'
+        for attempt in range(max_retries + 1):
+            await limiter.acquire(reserved)
+            start = time.perf_counter()
+            try:
+                raw = await client.chat.completions.with_raw_response.create(**request)
+            except RateLimitError as e:
+                if e.code == 'insufficient_quota':  # Billing, not pacing: retrying won't help
+                    error = str(e)
+                    break
+                LLM_REQUESTS.labels(model, 'rate_limited').inc()
+                limiter.update(e.response.headers)
+                limiter.backoff(retry_after(e.response.headers))
+                continue
+            except (APIConnectionError, APIStatusError) as e:
+                error = str(e)
+                if isinstance(e, APIStatusError) and e.status_code < 500:
+                    break
+                LLM_REQUESTS.labels(model, 'retried').inc()
+                SLEEP_SECONDS.labels('llm_retry').inc(2 ** attempt)
+                await asyncio.sleep(2 ** attempt)
+                continue
+            except Exception as e:
+                error = str(e)
+                break
+            LLM_SECONDS.labels(model).observe(time.perf_counter() - start)
+            limiter.update(raw.headers)
+            response = raw.parse()
+            usage = getattr(response, 'usage', None)
+            if usage is not None:
+                LLM_TOKENS.labels(model, 'prompt').inc(usage.prompt_tokens or 0)
+                LLM_TOKENS.labels(model, 'completion').inc(usage.completion_tokens or 0)
+                limiter.settle(reserved, usage.total_tokens)
+            try:
+                result = json.loads(response.choices[0].message.content)
+            except json.JSONDecodeError as e:
+                LLM_REQUESTS.labels(model, 'bad_json').inc()
+                print(f"  ⚠️  JSON parsing error: {e}")
+                return {
+                    'summary': 'خطأ في معالجة الرد',
+                    'key_points': [],
+                    'error': 'JSON parse error'
+                }
+            LLM_REQUESTS.labels(model, 'ok').inc()
+            return result
+        
+        LLM_REQUESTS.labels(model, 'error').inc()
+        print(f"  ✗ API Error: {error}")
+        return {
+            'summary': 'خطأ في الاتصال بالخدمة',
+            'key_points': [],
+            'error': error
+        }
+    
+    async def summarize_many_async(self, articles, model="gpt-4o-mini", concurrency=16, rpm=500, tpm=200000):
+        """Summaries of articles, in their order, with up to concurrency requests in flight
+        
+        rpm/tpm are the account's limits until the API reports its own.
+        """
+        from openai import AsyncOpenAI
+        
+        self.client  # Checks the package and the API key (prompting if interactive)
+        client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)  # 429s are ours to pace
+        limiter = LLMRateLimiter(rpm=rpm, tpm=tpm)
+        slots = asyncio.Semaphore(concurrency)
+        
+        async def summarize_one(article):
+            async with slots:
+                return await self.summarize_async(client, limiter, article, model)
+        
+        try:
+            results = await asyncio.gather(*(summarize_one(article) for article in articles))
+        finally:
+            await client.close()
+        limits = limiter.metrics()
+        print(f"⏱️  Settled at {limits['rpm']} requests/min, {limits['tpm']} tokens/min "
+              f"after {limits['rate_limited']} rate-limit responses")
+        return results
+    
+    def summarize_concurrently(self, articles, model="gpt-4o-mini", concurrency=16, rpm=500, tpm=200000):
+        """Summaries for summarize_all(concurrency=...): {index: result}
+        
+        Near-duplicates are left out, and sent in a second round only
+        if the summary of their first copy failed.
+        """
+        first = [i for i, article in enumerate(articles) if not article.get('duplicate_of')]
+        results = dict(zip(first, asyncio.run(
+            self.summarize_many_async([articles[i] for i in first], model, concurrency, rpm, tpm)
+        )))
+        ok = {articles[i].get('url') for i, result in results.items() if not result.get('error')}
+        retry = [i for i, article in enumerate(articles) if i not in results and article['duplicate_of'] not in ok]
+        if retry:
+            results.update(zip(retry, asyncio.run(
+                self.summarize_many_async([articles[i] for i in retry], model, concurrency, rpm, tpm)
+            )))
+        return results
+    
+    def summarize_batch(self, articles, model="gpt-4o-mini", batch_file='AlBorsaSummaryBatch.jsonl', poll_interval=10,
+                        max_poll_interval=300, max_requests=50000):
+        """Summaries for summarize_all(batch=True), from the OpenAI Batch API: {index: result}
+        
+        The requests are written to batch_file (one more file per
+        max_requests, the API's limit per batch), uploaded and submitted;
+        each batch is polled every poll_interval seconds, doubling up to
+        max_poll_interval, and its output is streamed back line by line.
+        Results find their article through batch_custom_id(), whatever
+        order they come back in. Near-duplicates are not sent.
+        """
+        results = {}
+        indexes_by_id = {}
+        requests = []
+        for i, article in enumerate(articles):
+            if article.get('duplicate_of'):
+                continue
+            request = self.completion_request(article, model)
+            if request is None:
+                results[i] = SHORT_CONTENT.copy()
+                continue
+            custom_id = batch_custom_id(article)
+            if custom_id not in indexes_by_id:
+                requests.append({'custom_id': custom_id, 'method': 'POST', 'url': '/v1/chat/completions', 'body': request})
+            indexes_by_id.setdefault(custom_id, []).append(i)
+        
+        root, ext = os.path.splitext(batch_file)
+        batch_ids = []
+        for n, start in enumerate(range(0, len(requests), max_requests)):
+            path = batch_file if n == 0 else f"{root}.{n}{ext}"
+            with open(path, 'w', encoding='utf-8') as f:
+                for request in requests[start:start + max_requests]:
+                    f.write(json.dumps(request, ensure_ascii=False) + '\n')
+            batch_ids.append(self.submit_batch(path))
+        
+        by_id = {}
+        for batch_id in batch_ids:
+            batch = self.wait_for_batch(batch_id, poll_interval, max_poll_interval)
+            for custom_id, result in self.read_batch_results(batch, model):
+                by_id[custom_id] = result
+        
+        for custom_id, indexes in indexes_by_id.items():
+            result = by_id.get(custom_id) or {
+                'summary': 'خطأ في الاتصال بالخدمة',
+                'key_points': [],
+                'error': 'Missing from the batch output'
+            }
+            for i in indexes:
+                results[i] = result
+        
+        # Duplicates whose first copy failed would need another batch: report them as failed too
+        for i, article in enumerate(articles):
+            if i not in results:
+                results[i] = {
+                    'summary': 'خطأ في الاتصال بالخدمة',
+                    'key_points': [],
+                    'error': f"Not summarized: duplicate of {article['duplicate_of']}, which failed"
+                }
+        return results
+    
+    def submit_batch(self, path):
+        """Upload a JSONL file of chat completion requests and start a batch on it; returns the batch ID"""
+        with open(path, 'rb') as f:
+            uploaded = self.client.files.create(file=f, purpose='batch')
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id, endpoint='/v1/chat/completions', completion_window='24h',
+            metadata={'source': 'AlBorsaArticleSummarizer'}
+        )
+        print(f"📤 Submitted {path} as batch {batch.id}")
+        return batch.id
+    
+    def wait_for_batch(self, batch_id, poll_interval=10, max_poll_interval=300):
+        """Poll a batch until it reaches a final state, backing off between polls; returns the batch"""
+        wait = poll_interval
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            counts = batch.request_counts
+            done = f"{counts.completed + counts.failed}/{counts.total} requests" if counts else 'no requests yet'
+            if batch.status in BATCH_FINAL_STATES:
+                print(f"📥 Batch {batch_id} {batch.status}: {done}")
+                if batch.errors and batch.errors.data:
+                    for error in batch.errors.data:
+                        print(f"  ✗ {error.code}: {error.message}")
+                return batch
+            self.progress(f"  ⏳ Batch {batch_id} {batch.status}: {done}")
+            SLEEP_SECONDS.labels('llm_batch_poll').inc(wait)
+            time.sleep(wait)
+            wait = min(max_poll_interval, wait * 2)
+    
+    def read_batch_results(self, batch, model="gpt-4o-mini"):
+        """(custom_id, result) for each line of a finished batch's output and error files, streamed
+        
+        Expired and cancelled batches still have the output of the requests they finished.
+        """
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            with self.client.files.with_streaming_response.content(file_id) as response:
+                for line in response.iter_lines():
+                    if line.strip():
+                        row = json.loads(line)
+                        yield row['custom_id'], self.batch_result(row, model)
+    
+    @staticmethod
+    def batch_result(row, model="gpt-4o-mini"):
+        """Summary result of one line of a batch output (or error) file"""
+        response = row.get('response') or {}
+        body = response.get('body') or {}
+        if row.get('error') or response.get('status_code') != 200:
+            error = row.get('error') or body.get('error') or {}
+            LLM_REQUESTS.labels(model, 'error').inc()
+            return {
+                'summary': 'خطأ في الاتصال بالخدمة',
+                'key_points': [],
+                'error': error.get('message') or f"HTTP {response.get('status_code')}"
+            }
+        usage = body.get('usage') or {}
+        LLM_TOKENS.labels(model, 'prompt').inc(usage.get('prompt_tokens') or 0)
+        LLM_TOKENS.labels(model, 'completion').inc(usage.get('completion_tokens') or 0)
+        try:
+            result = json.loads(body['choices'][0]['message']['content'])
+        except (KeyError, IndexError, TypeError, json.JSONDecodeError) as e:
+            LLM_REQUESTS.labels(model, 'bad_json').inc()
+            return {
+                'summary': 'خطأ في معالجة الرد',
+                'key_points': [],
+                'error': f"JSON parse error: {e}"
+            }
+        LLM_REQUESTS.labels(model, 'ok').inc()
+        return result
+    
+    def progress(self, message):
+        """Per-article output, silenced in quiet mode"""
+        if not self.quiet:
+            print(message)
+    
+    def summarize_all(self, delay=2, model="gpt-4o-mini", reuse_duplicates=True, concurrency=None, rpm=500, tpm=200000,
+                      batch=False, batch_file='AlBorsaSummaryBatch.jsonl', poll_interval=10):
+        """Summarize all articles using OpenAI
+        
+        reuse_duplicates: near-duplicate copies of a story (see near_duplicates)
+        get the summary of its first copy instead of another API call
+        concurrency: send up to this many requests at once (asyncio) instead
+        of one every delay seconds, paced by the account's requests and
+        tokens per minute (rpm/tpm, updated from the API's rate-limit headers)
+        batch: go through the Batch API instead (see summarize_batch), for
+        runs that can wait for results in exchange for throughput and price
+        """
         print("="*80)
         print("📝 SUMMARIZING ARTICLES WITH OPENAI")
         print("="*80)
         print(f"Articles to summarize: {len(self.articles)}")
         print(f"Model: {model}")
-        print(f"Delay between requests: {delay} seconds\n")
+        if batch:
+            print(f"Batch API: {batch_file}, polled from every {poll_interval} seconds")
+        elif concurrency:
+            print(f"Concurrency: {concurrency} requests, within {rpm} requests/min and {tpm} tokens/min")
+        else:
+            print(f"Delay between requests: {delay} seconds")
+        
+        duplicate_count = link_duplicates(self.articles) if reuse_duplicates else 0
+        if duplicate_count:
+            print(f"Near-duplicates: {duplicate_count} (their summaries are reused)")
+        print()
+        
+        # Concurrent mode gets every API result first, then reports them in input order
+        precomputed = None
+        if batch:
+            precomputed = self.summarize_batch(
+                [as_article(article) for article in self.articles], model, batch_file, poll_interval
+            )
+        elif concurrency:
+            precomputed = self.summarize_concurrently(
+                [as_article(article) for article in self.articles], model, concurrency, rpm, tpm
+            )
         
         total_cost = 0
         success_count = 0
+        summaries_by_url = {}  # Successful results, for reuse by duplicates
         
         for idx, article in enumerate(self.articles, 1):
+            article = as_article(article)
             title = article.get('title', 'No Title')
-            print(f"[{idx}/{len(self.articles)}] {title[:60]}...")
+            self.progress(f"[{idx}/{len(self.articles)}] {title[:60]}...")
             
-            # Get summary from OpenAI
-            summary_result = self.summarize_with_openai(article, model=model)
+            canonical = summaries_by_url.get(article.get('duplicate_of'))
+            if canonical is not None:
+                # Same story as an article already summarized: no API call needed
+                summary_result = canonical
+                self.progress(f"  ♻️  Duplicate of {article['duplicate_of']}")
+            else:
+                # Get summary from OpenAI
+                if precomputed is not None:
+                    summary_result = precomputed[idx - 1]
+                else:
+                    summary_result = self.summarize_with_openai(article, model=model)
+                if not summary_result.get('error'):
+                    summaries_by_url[article.get('url')] = summary_result
             
-            # Create enhanced article
-            enhanced_article = article.copy()
-            enhanced_article['summary'] = summary_result.get('summary', '')
-            enhanced_article['key_points'] = summary_result.get('key_points', [])
-            enhanced_article['summarized_at'] = datetime.now().isoformat()
-            enhanced_article['summarization_model'] = model
+            # Enhanced article shares the original's fields instead of copying them
+            enhanced_article = article.enrich(
+                summary=summary_result.get('summary', ''),
+                key_points=summary_result.get('key_points', []),
+                summarized_at=datetime.now().isoformat(),
+                summarization_model=model
+            )
             
             self.summarized_articles.append(enhanced_article)
             
             # Show summary
             if summary_result.get('summary') and not summary_result.get('error'):
-                print(f"  ✓ {summary_result['summary'][:80]}...")
+                self.progress(f"  ✓ {summary_result['summary'][:80]}...")
                 success_count += 1
             else:
                 print(f"  ⚠️  Error: {summary_result.get('error', 'Unknown error')}")
             
-            time.sleep(delay)
+            if canonical is None and delay and precomputed is None:
+                SLEEP_SECONDS.labels('llm_delay').inc(delay)
+                time.sleep(delay)
         
         print(f"\n{'='*80}")
         print(f"✅ SUMMARIZATION COMPLETE!")
         print(f"   Successfully summarized: {success_count}/{len(self.articles)} articles")
         print("="*80)
     
-    def save_summaries(self, output_file='AlBorsaArticlesSummarized.json'):
-        """Save summarized articles to JSON"""
+    def save_summaries(self, output_file='AlBorsaArticlesSummarized.json', compact_duplicates=False):
+        """Save summarized articles to JSON
+        
+        compact_duplicates: save near-duplicates without their content,
+        which can be read from the article named in duplicate_of
+        """
+        articles = self.summarized_articles
+        if compact_duplicates:
+            articles = [
+                {key: value for key, value in article.items() if key != 'content'} if article.get('duplicate_of') else article
+                for article in articles
+            ]
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(self.summarized_articles, f, ensure_ascii=False, indent=2)
+            dump_articles(articles, f)
         
         print(f"\n💾 Saved to {output_file}")
         
+    def update_search_index(self, search_index):
+        """Add the summaries and key points to a SearchIndex (articles are upserted by URL)"""
+        search_index.add_many(self.summarized_articles)
+        print(f"🔎 Indexed {len(self.summarized_articles)} summaries")
+    
+    def save_to_parquet(self, root='AlBorsaCorpus'):
+        """Append summaries (without article text) to the Parquet corpus (needs pyarrow)"""
+        count = ParquetStore(root).write_summaries(self.summarized_articles)
+        print(f"\n💾 Saved {count} summaries to {root}/summaries")
+    
     def create_summary_report(self, output_file='Summary_Report.txt'):
         """Create a readable summary report"""
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -400,7 +777,12 @@ class ArticleSummarizer:
         
         # Stats
         total_articles = len(self.summarized_articles)
-        total_words = sum(len(a.get('content', '').split()) for a in self.summarized_articles)
+        # Compacted near-duplicates have no content of their own; count their canonical article's
+        by_url = {a.get('url'): a for a in self.summarized_articles}
+        total_words = sum(
+            word_count(a.get('content') or by_url.get(a.get('duplicate_of'), {}).get('content', ''))
+            for a in self.summarized_articles
+        )
         avg_words = total_words // total_articles if total_articles > 0 else 0
         
         html += f"""
@@ -476,20 +858,34 @@ class ArticleSummarizer:
         print(f"🌐 Created HTML report: {output_file}")
 
 
-# Example usage
-if __name__ == "__main__":
+MODELS = {
+    "1": "gpt-4o-mini",
+    "2": "gpt-4o",
+    "3": "gpt-3.5-turbo"
+}
+
+
+def main(input_file='AlBorsaNewsScraped.json', output_file='AlBorsaArticlesSummarized.json', model=None, delay=1,
+         api_key='', base_url=None, interactive=True, reports=True, metrics_file='AlBorsaSummarizerMetrics.prom',
+         concurrency=None, rpm=500, tpm=200000, batch=False, batch_file='AlBorsaSummaryBatch.jsonl', poll_interval=10):
+    """Summarize input_file into output_file and the reports; True on success
+    
+    interactive=False (scheduled runs) asks nothing: the key comes from
+    api_key or OPENAI_API_KEY and model defaults to gpt-4o-mini.
+    concurrency, rpm, tpm, batch, batch_file and poll_interval go to summarize_all.
+    """
     print("\n" + "="*80)
     print("ARTICLE SUMMARIZER WITH OPENAI")
     print("="*80)
     print("This tool uses OpenAI to create high-quality Arabic summaries")
     print("="*80 + "\n")
     
-    # Initialize (will prompt for API key if not found)
-    summarizer = ArticleSummarizer('AlBorsaNewsScraped.json')
+    summarizer = ArticleSummarizer(input_file, api_key=api_key, base_url=base_url, interactive=interactive)
+    summarizer.connect()  # Ask for (or check) the API key before anything else
     
     # Load articles
     if not summarizer.load_articles():
-        exit(1)
+        return False
     
     # Show sample
     if summarizer.articles:
@@ -497,51 +893,57 @@ if __name__ == "__main__":
         sample = summarizer.articles[0]
         print(f"   Title: {sample.get('title', 'N/A')}")
         print(f"   Content length: {len(sample.get('content', ''))} characters")
-        print(f"   Words: ~{len(sample.get('content', '').split())} words\n")
-    
-    # Select model
-    print("Available OpenAI models:")
-    print("  1. gpt-4o-mini (Recommended - Fast & Affordable)")
-    print("  2. gpt-4o (Best Quality)")
-    print("  3. gpt-3.5-turbo (Most Affordable)\n")
-    
-    model_choice = input("Select model (1/2/3) [default: 1]: ").strip() or "1"
+        print(f"   Words: ~{word_count(sample.get('content', ''))} words\n")
     
-    model_map = {
-        "1": "gpt-4o-mini",
-        "2": "gpt-4o",
-        "3": "gpt-3.5-turbo"
-    }
-    
-    selected_model = model_map.get(model_choice, "gpt-4o-mini")
-    print(f"✓ Selected model: {selected_model}\n")
+    if model is None and interactive:
+        # Select model
+        print("Available OpenAI models:")
+        print("  1. gpt-4o-mini (Recommended - Fast & Affordable)")
+        print("  2. gpt-4o (Best Quality)")
+        print("  3. gpt-3.5-turbo (Most Affordable)\n")
+        
+        model_choice = input("Select model (1/2/3) [default: 1]: ").strip() or "1"
+        model = MODELS.get(model_choice, "gpt-4o-mini")
+    model = model or "gpt-4o-mini"
+    print(f"✓ Selected model: {model}\n")
     
     # Confirm
-    print(f"⚠️  Note: This will make {len(summarizer.articles)} API calls to OpenAI")
+    if batch:
+        print(f"⚠️  Note: This will send {len(summarizer.articles)} requests as an OpenAI batch (results may take hours)")
+    else:
+        print(f"⚠️  Note: This will make {len(summarizer.articles)} API calls to OpenAI")
     print(f"   Estimated cost: ~$0.01-0.05 USD (depending on model and content length)")
     
-    response = input("\nStart summarizing? (y/n): ")
-    if response.lower() != 'y':
-        print("Cancelled.")
-        exit(0)
+    if interactive:
+        response = input("\nStart summarizing? (y/n): ")
+        if response.lower() != 'y':
+            print("Cancelled.")
+            return False
     
     # Summarize
     try:
-        summarizer.summarize_all(delay=1, model=selected_model)
+        summarizer.summarize_all(delay=delay, model=model, concurrency=concurrency, rpm=rpm, tpm=tpm,
+                                 batch=batch, batch_file=batch_file, poll_interval=poll_interval)
+        REGISTRY.print_summary()
+        if metrics_file:
+            REGISTRY.write(metrics_file)
         
         # Save results
-        summarizer.save_summaries('AlBorsaArticlesSummarized.json')
-        summarizer.create_summary_report('Summary_Report.txt')
-        summarizer.create_html_report('Summary_Report.html')
+        summarizer.save_summaries(output_file)
+        if reports:
+            summarizer.create_summary_report('Summary_Report.txt')
+            summarizer.create_html_report('Summary_Report.html')
         
         print("\n" + "="*80)
         print("✅ ALL DONE!")
         print("="*80)
         print("\nCreated files:")
-        print("  📄 AlBorsaArticlesSummarized.json - Full data with AI summaries")
-        print("  📄 Summary_Report.txt - Readable text report")
-        print("  🌐 Summary_Report.html - Beautiful HTML report (open in browser)")
-        print("\n💡 Tip: Open Summary_Report.html in your browser for the best experience!")
+        print(f"  📄 {output_file} - Full data with AI summaries")
+        if reports:
+            print("  📄 Summary_Report.txt - Readable text report")
+            print("  🌐 Summary_Report.html - Beautiful HTML report (open in browser)")
+            print("\n💡 Tip: Open Summary_Report.html in your browser for the best experience!")
+        return True
         
     except KeyboardInterrupt:
         print("\n\n⚠️  Interrupted by user")
@@ -549,3 +951,21 @@ if __name__ == "__main__":
         print(f"\n✗ Error: {e}")
         import traceback
         traceback.print_exc()
+    return False
+
+
+def create_reports(summaries_file='AlBorsaArticlesSummarized.json', text_file='Summary_Report.txt', html_file='Summary_Report.html'):
+    """Rebuild the text and HTML reports from saved summaries (no OpenAI needed); True on success"""
+    summarizer = ArticleSummarizer(summaries_file, interactive=False)
+    if not summarizer.load_articles():
+        return False
+    summarizer.summarized_articles = summarizer.articles
+    if text_file:
+        summarizer.create_summary_report(text_file)
+    if html_file:
+        summarizer.create_html_report(html_file)
+    return True
+
+
+if __name__ == "__main__":
+    main()
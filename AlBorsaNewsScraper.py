@@ -1,26 +1,78 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
 import json
+import os
+import queue
+import socket
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from urllib.parse import unquote, urljoin, urlparse
+
+from arabic_dates import as_datetime, to_iso, url_date, within
+from article import Article, ContentStore, dump_articles, load_articles
+from crawl_frontier import CrawlFrontier, page_freshness
+from feed_discovery import FeedDiscovery
+from field_extraction import ALBORSA_ARTICLE
+from html_parser import LINKS, headline_links, make_soup
+from fetch_parse import FetchParsePool
+from http_client import AsyncFetchClient, get_client
+from metrics import ARTICLES, EXTRACT_SECONDS, PARSE_SECONDS, QUEUE_DEPTH, REGISTRY, SLEEP_SECONDS
+from parquet_store import ParquetStore
+from url_dedup import UrlFingerprintIndex, canonicalize_url
+from url_index import UrlIndex
 
 class AlBorsaNewsScraper:
-    def __init__(self):
-        self.base_url = "https://www.alborsaanews.com"
+    def __init__(self, client=None, url_index=None, search_index=None, quiet=False, base_url="https://www.alborsaanews.com"):
+        self.base_url = base_url.rstrip('/')  # Overridden to crawl a replay of the site (benchmarks/replay_server.py)
         self.category_url = f"{self.base_url}/category/%d8%a7%d9%84%d8%a8%d9%88%d8%b1%d8%b5%d8%a9-%d9%88%d8%a7%d9%84%d8%b4%d8%b1%d9%83%d8%a7%d8%aa"
+        self.feed_url = f"{self.category_url}/feed/"
+        self.feed_page_size = 10  # WordPress default posts per feed page
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        self.client = client or get_client()  # Shared pooled session with retries
         self.articles_data = []
-        self.seen_urls = set()  # Track URLs to avoid duplicates
-        self.static_articles = set()  # Track static articles that appear on every page
+        self.seen_urls = UrlFingerprintIndex()  # Fingerprints of canonical URLs, to avoid duplicates
+        self.static_articles = set()  # Canonical URLs of static articles that appear on every page
+        self.static_articles_file = 'AlBorsaStaticArticles.json'  # Learned static set, reused between runs
+        self.static_max_age = 24 * 3600  # Seconds before the static set is re-learned
+        self.page_links = {}  # Unfiltered links of each listing page fetched this run
+        self.url_index = url_index  # Persistent record of extracted URLs (incremental mode)
+        self.search_index = search_index  # Optional SearchIndex updated as articles are extracted
+        self.quiet = quiet  # No per-article output; see metrics.REGISTRY for the numbers
     
-    def get_article_links_from_page(self, page_number=1, identify_static=False):
-        """Extract article links from a category page"""
+    def listing_page_url(self, page_number, category_url=None):
+        """URL of a category listing page (the default category unless category_url is given)"""
+        category_url = category_url or self.category_url
         if page_number == 1:
-            url = self.category_url
-        else:
-            url = f"{self.category_url}/page/{page_number}"
+            return category_url
+        return f"{category_url}/page/{page_number}"
+    
+    def pause(self, delay):
+        """Politeness delay between requests, skipped when the client's rate limiter paces them"""
+        if delay and getattr(self.client, 'rate_limiter', None) is None:
+            SLEEP_SECONDS.labels('delay').inc(delay)
+            time.sleep(delay)
+    
+    def progress(self, message):
+        """Per-article output, silenced in quiet mode"""
+        if not self.quiet:
+            print(message)
+    
+    def fetch_listing_page(self, page_number, wait=0):
+        """Download a listing page's HTML, or None on failure (used for prefetching)"""
+        self.pause(wait)
+        try:
+            response = self.client.get(self.listing_page_url(page_number), headers=self.headers)
+            response.encoding = 'utf-8'
+            return response.text
+        except Exception:
+            return None
+    
+    def get_article_links_from_page(self, page_number=1, identify_static=False, html=None):
+        """Extract article links from a category page (html skips the download if already fetched)"""
+        url = self.listing_page_url(page_number)
         
         print(f"\n{'='*80}")
         print(f"📰 Fetching Page {page_number}")
@@ -28,37 +80,29 @@ class AlBorsaNewsScraper:
         print("="*80)
         
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            response.encoding = 'utf-8'
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
+            if html is None:
+                response = self.client.get(url, headers=self.headers)
+                response.encoding = 'utf-8'
+                html = response.text
             
             # Find all article links
-            article_links = []
-            
             # Method 1: Find h2 and h3 tags with links (main article titles)
-            headlines = soup.find_all(['h2', 'h3'])
-            
-            for headline in headlines:
-                link = headline.find('a', href=True)
-                if link and link.get('href'):
-                    article_url = link.get('href')
-                    if article_url.startswith('http'):
-                        article_links.append(article_url)
+            article_links = [link for link in headline_links(html) if link.startswith('http')]
             
-            # Remove duplicates while preserving order
+            # Remove duplicates (including tracking-parameter variants) while preserving order
             seen = set()
             unique_links = []
             for link in article_links:
-                if link not in seen:
-                    seen.add(link)
+                key = canonicalize_url(link)
+                if key not in seen:
+                    seen.add(key)
                     unique_links.append(link)
             
             article_links = unique_links
+            self.page_links[page_number] = article_links
             
-            # If this is page 1 and we're identifying static articles
-            if page_number == 1 and identify_static:
+            # If we're only identifying static articles
+            if identify_static:
                 print(f"\n   ℹ️  Analyzing page structure to identify static articles...")
                 # Store all links from page 1 to compare with page 2
                 return article_links, set(article_links)
@@ -66,7 +110,7 @@ class AlBorsaNewsScraper:
             # Filter out static articles if we've identified them
             if self.static_articles:
                 before_filter = len(article_links)
-                article_links = [link for link in article_links if link not in self.static_articles]
+                article_links = [link for link in article_links if canonicalize_url(link) not in self.static_articles]
                 filtered_count = before_filter - len(article_links)
                 if filtered_count > 0:
                     print(f"   🔹 Filtered out {filtered_count} static articles")
@@ -74,9 +118,8 @@ class AlBorsaNewsScraper:
             # Filter out already seen articles
             new_links = []
             for link in article_links:
-                if link not in self.seen_urls:
+                if self.seen_urls.add(link):
                     new_links.append(link)
-                    self.seen_urls.add(link)
             
             duplicate_count = len(article_links) - len(new_links)
             if duplicate_count > 0:
@@ -84,7 +127,7 @@ class AlBorsaNewsScraper:
             
             print(f"\n   ✅ Found {len(new_links)} new unique articles on this page")
             
-            if new_links and len(new_links) <= 5:
+            if new_links and len(new_links) <= 5 and not self.quiet:
                 print(f"\n   📄 Sample articles:")
                 for url in new_links[:5]:
                     print(f"      • {url}")
@@ -95,41 +138,60 @@ class AlBorsaNewsScraper:
             print(f"   ❌ Error fetching page {page_number}: {e}")
             return [], None
     
-    def identify_static_articles(self):
-        """Identify static articles by comparing page 1 and page 2"""
-        print("\n" + "="*80)
-        print("🔍 IDENTIFYING STATIC ARTICLES")
-        print("="*80)
-        print("Comparing pages 1 and 2 to find articles that appear on both...")
-        
-        # Temporarily store the current seen_urls
-        original_seen = self.seen_urls.copy()
-        
-        # Clear seen_urls for identification phase
-        self.seen_urls = set()
-        
-        # Get articles from page 1
-        page1_links, page1_set = self.get_article_links_from_page(1, identify_static=True)
-        time.sleep(1)
-        
-        # Get articles from page 2
-        page2_links, _ = self.get_article_links_from_page(2, identify_static=False)
-        page2_set = set(page2_links)
+    def load_static_articles(self):
+        """Load the persisted static article set. Returns True if it is still fresh"""
+        try:
+            with open(self.static_articles_file, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            learned_at = datetime.fromisoformat(saved['learned_at'])
+        except (OSError, ValueError, KeyError):
+            return False
         
-        # Find common articles (these are static/featured)
-        static = page1_set.intersection(page2_set)
+        self.static_articles = {canonicalize_url(url) for url in saved.get('urls', [])}
+        age = (datetime.now() - learned_at).total_seconds()
+        return age <= self.static_max_age
+    
+    def save_static_articles(self):
+        """Persist the static article set for later runs"""
+        with open(self.static_articles_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'learned_at': datetime.now().isoformat(),
+                'urls': sorted(self.static_articles)
+            }, f, ensure_ascii=False, indent=2)
+    
+    def learn_static_articles(self):
+        """Find static articles from pages 1 and 2 already fetched by the crawl"""
+        # Articles that appear on both pages are static/featured
+        static = {canonicalize_url(url) for url in self.page_links.get(1, [])}
+        static &= {canonicalize_url(url) for url in self.page_links.get(2, [])}
+        self.static_articles = static
+        self.save_static_articles()
         
         if static:
-            self.static_articles = static
             print(f"\n   ✅ Identified {len(static)} static articles that appear on every page")
             print(f"\n   📌 Static articles (will be excluded):")
             for url in static:
                 print(f"      • {url}")
         else:
             print(f"\n   ℹ️  No static articles detected")
+        return static
+    
+    def identify_static_articles(self):
+        """Identify static articles by fetching and comparing pages 1 and 2"""
+        print("\n" + "="*80)
+        print("🔍 IDENTIFYING STATIC ARTICLES")
+        print("="*80)
+        print("Comparing pages 1 and 2 to find articles that appear on both...")
         
-        # Clear seen_urls again so scraping starts fresh
-        self.seen_urls = set()
+        # Identification must not mark anything as seen
+        original_seen = self.seen_urls.copy()
+        
+        self.get_article_links_from_page(1, identify_static=True)
+        self.pause(1)
+        self.get_article_links_from_page(2, identify_static=True)
+        self.learn_static_articles()
+        
+        self.seen_urls = original_seen
         
         print("\n" + "="*80)
     
@@ -138,123 +200,425 @@ class AlBorsaNewsScraper:
         if verbose:
             print(f"\n📄 Extracting: {article_url}")
         
+        start = time.perf_counter()
         try:
-            response = requests.get(article_url, headers=self.headers, timeout=10)
-            response.raise_for_status()
+            response = self.client.get(article_url, headers=self.headers)
             response.encoding = 'utf-8'
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract title
-            title = ""
-            title_tag = soup.find('h1', class_='jeg_post_title') or soup.find('h1')
-            if title_tag:
-                title = title_tag.get_text(strip=True)
-            
-            if verbose:
-                print(f"   Title: {title[:70]}..." if len(title) > 70 else f"   Title: {title}")
+            article = self.parse_article_content(response.text, article_url, verbose=verbose)
+            ARTICLES.labels('alborsa', 'extracted').inc()
+            return article
             
-            # Extract author
-            author = ""
-            author_tag = soup.find('div', class_='jeg_meta_author') or soup.find('a', rel='author')
-            if author_tag:
-                author = author_tag.get_text(strip=True)
-            
-            if verbose and author:
-                print(f"   Author: {author}")
-            
-            # Extract date
-            date = ""
-            date_tag = soup.find('div', class_='jeg_meta_date') or soup.find('time')
-            if date_tag:
-                date = date_tag.get_text(strip=True)
-            
-            if verbose and date:
-                print(f"   Date: {date}")
-            
-            # Extract category - try multiple methods
-            category = ""
-            # Method 1: Look for category link
-            category_tag = soup.find('a', rel='category tag')
-            if not category_tag:
-                # Method 2: Look for meta category div
-                category_tag = soup.find('div', class_='jeg_meta_category')
-            if not category_tag:
-                # Method 3: Look for any link with 'category' in href
-                category_links = soup.find_all('a', href=True)
-                for link in category_links:
-                    if '/category/' in link.get('href', ''):
-                        category_tag = link
-                        break
+        except Exception as e:
+            # Retries are exhausted by now, so always report the failure
+            print(f"   ❌ Error extracting {article_url}: {e}")
+            ARTICLES.labels('alborsa', 'failed').inc()
+            return None
+        finally:
+            EXTRACT_SECONDS.labels('alborsa').observe(time.perf_counter() - start)
+    
+    @staticmethod
+    def parse_article_content(html, article_url, verbose=False):
+        """Build an Article from the HTML of an article page"""
+        # Only the title/meta tags and content containers are parsed, and
+        # every field (with its fallbacks) is located in a single tree walk
+        start = time.perf_counter()
+        soup = make_soup(html, parse_only=ALBORSA_ARTICLE.parse_only)
+        fields = ALBORSA_ARTICLE.extract(soup)
+        
+        # Extract title
+        title = fields['title'].get_text(strip=True) if fields['title'] else ""
+        
+        if verbose:
+            print(f"   Title: {title[:70]}..." if len(title) > 70 else f"   Title: {title}")
+        
+        # Extract author
+        author = fields['author'].get_text(strip=True) if fields['author'] else ""
+        
+        if verbose and author:
+            print(f"   Author: {author}")
+        
+        # Extract date
+        date = fields['date'].get_text(strip=True) if fields['date'] else ""
+        
+        if verbose and date:
+            print(f"   Date: {date}")
+        
+        # Extract category - category link, meta category div, or any /category/ link
+        category = fields['category'].get_text(strip=True) if fields['category'] else ""
+        
+        if verbose:
+            print(f"   Category: {category if category else 'N/A'}")
+        
+        # Extract main content
+        content = ""
+        content_div = fields['content']
+        
+        if content_div:
+            # Remove script and style tags
+            for script in content_div(['script', 'style']):
+                script.decompose()
             
-            if category_tag:
-                category = category_tag.get_text(strip=True)
+            # Get paragraphs
+            paragraphs = (p.get_text(strip=True) for p in content_div.find_all('p'))
+            content = '\n\n'.join([text for text in paragraphs if text])
+        
+        if verbose:
+            content_preview = content[:100] + "..." if len(content) > 100 else content
+            print(f"   Content length: {len(content)} chars")
+            if content:
+                print(f"   Preview: {content_preview}")
+        
+        PARSE_SECONDS.labels('alborsa_article').observe(time.perf_counter() - start)
+        article_data = Article(
+            url=article_url,
+            title=title,
+            author=author,
+            date=date,
+            category=category,
+            content=content,
+            scraped_at=datetime.now().isoformat(),
+            published_at=to_iso(date)
+        )
+        
+        return article_data
+    
+    def extract_articles_parallel(self, article_urls, fetch_workers=8, processes=None):
+        """Download on threads and parse on a process pool, returning articles in input order"""
+        pool = FetchParsePool(
+            parse_article_bytes, fetch_workers=fetch_workers, processes=processes,
+            client=self.client, headers=self.headers
+        )
+        return [article for article in pool.run(article_urls) if article]
+    
+    def extract_articles_async(self, article_urls, concurrency=10, per_host_concurrency=4, per_host_delay=0.5, verbose=False):
+        """Extract many articles concurrently, returning them in input order"""
+        return asyncio.run(self._extract_articles_async(
+            article_urls, concurrency, per_host_concurrency, per_host_delay, verbose
+        ))
+    
+    async def _extract_articles_async(self, article_urls, concurrency, per_host_concurrency, per_host_delay, verbose):
+        global_slots = asyncio.Semaphore(concurrency)
+        hosts = {}  # host -> per-host politeness state
+        
+        # Same cache and rate limiter as the shared sync client, so both paths see one history
+        rate_limiter = getattr(self.client, 'rate_limiter', None)
+        cache = getattr(self.client, 'cache', None)
+        async with AsyncFetchClient(headers=self.headers, max_connections=concurrency, cache=cache, rate_limiter=rate_limiter) as client:
+            tasks = [
+                self._extract_article_async(client, url, global_slots, hosts, per_host_concurrency, per_host_delay, verbose)
+                for url in article_urls
+            ]
+            results = await asyncio.gather(*tasks)
+        
+        return [article for article in results if article]
+    
+    async def _extract_article_async(self, client, article_url, global_slots, hosts, per_host_concurrency, per_host_delay, verbose):
+        host = urlparse(article_url).netloc
+        if host not in hosts:
+            hosts[host] = {
+                'slots': asyncio.Semaphore(per_host_concurrency),
+                'lock': asyncio.Lock(),
+                'last_start': 0.0
+            }
+        host_state = hosts[host]
+        
+        async with global_slots, host_state['slots']:
+            # Space out request starts to the same host
+            async with host_state['lock']:
+                wait = host_state['last_start'] + per_host_delay - time.monotonic()
+                if wait > 0:
+                    SLEEP_SECONDS.labels('delay').inc(wait)
+                    await asyncio.sleep(wait)
+                host_state['last_start'] = time.monotonic()
             
             if verbose:
-                print(f"   Category: {category if category else 'N/A'}")
+                print(f"\n📄 Extracting: {article_url}")
             
-            # Extract main content
-            content = ""
-            content_div = soup.find('div', class_='content-inner') or soup.find('div', class_='entry-content') or soup.find('article')
+            start = time.perf_counter()
+            try:
+                response = await client.get(article_url)
+                html = response.content.decode('utf-8', errors='replace')
+                article = self.parse_article_content(html, article_url, verbose=verbose)
+                ARTICLES.labels('alborsa', 'extracted').inc()
+                return article
             
-            if content_div:
-                # Remove script and style tags
-                for script in content_div(['script', 'style']):
-                    script.decompose()
+            except Exception as e:
+                print(f"   ❌ Error extracting {article_url}: {e}")
+                ARTICLES.labels('alborsa', 'failed').inc()
+                return None
+            finally:
+                EXTRACT_SECONDS.labels('alborsa').observe(time.perf_counter() - start)
+    
+    def record_articles(self, articles):
+        """Add extracted articles to the URL index and the search index, when configured"""
+        if self.url_index is not None:
+            self.url_index.add_many([(article['url'], article['title']) for article in articles])
+        if self.search_index is not None:
+            self.search_index.add_many(articles)
+    
+    def drop_known_links(self, links, page_number):
+        """Remove links already in the URL index. Returns (links, stop_paginating)"""
+        if not links:
+            return links, False
+        known = self.url_index.known(links)
+        links = [link for link in links if link not in known]
+        if known:
+            print(f"   🔹 Skipped {len(known)} articles extracted in earlier runs")
+        if not links:
+            print(f"\n   ⏹️  Page {page_number} has only known articles - stopping pagination")
+            return links, True
+        return links, False
+    
+    def filter_by_date(self, links, page_number, since=None, until=None):
+        """Keep links whose URL date is inside the window. Returns (links, stop_paginating)
+        
+        Listing pages run newest first, so once every dated link on a page
+        is older than since, later pages can't have anything in the window.
+        """
+        if not links or (since is None and until is None):
+            return links, False
+        days = [url_date(link) for link in links]
+        kept = [link for link, day in zip(links, days) if within(day, since, until)]
+        if len(kept) < len(links):
+            print(f"   🔹 Skipped {len(links) - len(kept)} articles outside the date window")
+        dated = [day for day in days if day is not None]
+        if since is not None and dated and not any(within(day, since) for day in dated):
+            print(f"\n   ⏹️  Page {page_number} is older than {since:%Y-%m-%d} - stopping pagination")
+            return kept, True
+        return kept, False
+    
+    def discover_article_links(self, max_pages=1, since=None, until=None, incremental=False, verbose=False):
+        """Article links from the category feed, or the sitemaps if it is missing
+        
+        since drops entries published/modified before it, and until entries
+        published after it (aware datetimes). Returns
+        None when the site has neither, so the caller can walk the HTML pages.
+        Sitemaps are site-wide, so without since only the newest
+        max_pages * feed_page_size entries are kept.
+        """
+        print(f"\n{'='*80}")
+        print("📡 Discovering articles from feeds")
+        print("="*80)
+        
+        discovery = FeedDiscovery(self.client, self.headers, verbose=verbose)
+        source = 'feed'
+        entries = discovery.from_feed(self.feed_url, since=since, max_pages=max_pages)
+        if entries is None:
+            source = 'sitemap'
+            entries = discovery.from_sitemaps(self.base_url, since=since)
+            if entries is not None and since is None:
+                entries = entries[:max_pages * self.feed_page_size]
+        if entries is None:
+            print("   ⚠️  No feed or sitemap found - falling back to HTML pages")
+            return None
+        
+        links = []
+        for entry in entries:
+            if not within(url_date(entry['url']) or entry['modified'], until=until):
+                continue
+            if self.seen_urls.add(entry['url']):
+                links.append(entry['url'])
+        print(f"   ✓ {len(links)} articles from the {source} in {discovery.requests} requests")
+        
+        if incremental and links:
+            links, _ = self.drop_known_links(links, 1)
+        return links
+    
+    def scrape_pipelined(self, start_page, end_page, delay=1, verbose=False, incremental=False, workers=4, queue_size=50, learn_static=False, since=None, until=None):
+        """Extract articles while later listing pages are still being walked
+        
+        The listing walk feeds a bounded queue that extraction workers drain,
+        and the next listing page is prefetched while the current one is parsed.
+        Articles are added to articles_data as soon as they are extracted.
+        With learn_static, page 1 links are held back until page 2 shows
+        which of them are static.
+        """
+        link_queue = queue.Queue(maxsize=queue_size)
+        results = {}  # position in listing order -> article
+        results_lock = threading.Lock()
+        first_new = len(self.articles_data)
+        depth = QUEUE_DEPTH.labels('pipeline_links')
+        
+        def extract_worker():
+            while True:
+                item = link_queue.get()
+                depth.set(link_queue.qsize())
+                if item is None:
+                    break
+                position, article_url = item
+                article_data = self.extract_article_content(article_url, verbose=verbose)
                 
-                # Get paragraphs
-                paragraphs = content_div.find_all('p')
-                content = '\n\n'.join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
-            
-            if verbose:
-                content_preview = content[:100] + "..." if len(content) > 100 else content
-                print(f"   Content length: {len(content)} chars")
-                if content:
-                    print(f"   Preview: {content_preview}")
-            
-            article_data = {
-                'url': article_url,
-                'title': title,
-                'author': author,
-                'date': date,
-                'category': category,
-                'content': content,
-                'scraped_at': datetime.now().isoformat()
-            }
-            
-            return article_data
+                if article_data:
+                    with results_lock:
+                        results[position] = article_data
+                        self.articles_data.append(article_data)
+                    self.record_articles([article_data])
+                    if not verbose:
+                        self.progress(f"   ✅ [{position + 1}] {article_data['title'][:60]}...")
+                
+                self.pause(delay)
+        
+        threads = [threading.Thread(target=extract_worker, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        
+        position = 0
+        held_links = None  # Page 1 links waiting for page 2 (learn_static)
+        
+        def enqueue(links):
+            nonlocal position
+            # Blocks when extraction falls behind, which bounds memory
+            for link in links:
+                link_queue.put((position, link))
+                position += 1
+            depth.set(link_queue.qsize())
+        
+        try:
+            with ThreadPoolExecutor(max_workers=1) as prefetcher:
+                next_page = prefetcher.submit(self.fetch_listing_page, start_page)
+                for page_num in range(start_page, end_page + 1):
+                    html = next_page.result()
+                    if page_num < end_page:
+                        next_page = prefetcher.submit(self.fetch_listing_page, page_num + 1, delay)
+                    
+                    if html is None:
+                        print(f"\n   ❌ Error fetching page {page_num} - skipped")
+                        if held_links is not None:
+                            # No page 2 to learn static articles from
+                            enqueue(held_links)
+                            held_links = None
+                        continue
+                    
+                    links, _ = self.get_article_links_from_page(page_num, html=html)
+                    if incremental:
+                        links, stop = self.drop_known_links(links, page_num)
+                        if stop:
+                            next_page.cancel()
+                            break
+                    links, stop = self.filter_by_date(links, page_num, since, until)
+                    
+                    if learn_static and page_num == 1 and not stop:
+                        held_links = links
+                        continue
+                    if held_links is not None:
+                        static = self.learn_static_articles()
+                        links = [link for link in held_links + links if canonicalize_url(link) not in static]
+                        held_links = None
+                    
+                    enqueue(links)
+                    if stop:
+                        next_page.cancel()
+                        break
             
-        except Exception as e:
-            if verbose:
-                print(f"   ❌ Error extracting article: {e}")
-            return None
+            # Crawl stopped before page 2: page 1 links can't wait any longer
+            enqueue(held_links or [])
+        finally:
+            for _ in threads:
+                link_queue.put(None)
+            for thread in threads:
+                thread.join()
+        
+        # Keep the output in listing order, like the collect-then-extract path
+        self.articles_data[first_new:] = [results[i] for i in sorted(results)]
+        return self.articles_data
     
-    def scrape_articles(self, start_page=1, end_page=1, delay=1, verbose=False):
-        """Scrape articles from multiple pages"""
+    def scrape_articles(self, start_page=1, end_page=1, delay=1, verbose=False, concurrency=None, incremental=False, pipeline=False, workers=4, processes=None, use_feeds=False, since=None, until=None):
+        """Scrape articles from multiple pages
+        
+        incremental=True skips articles already in the URL index and stops
+        paginating at the first page with nothing new (end_page is the cap).
+        pipeline=True extracts with `workers` threads while listing pages are walked.
+        processes=N parses articles on N worker processes (downloads stay on threads).
+        use_feeds=True discovers articles from the RSS feed/sitemaps (up to
+        end_page feed pages, entries older than since dropped) instead of the
+        HTML listing pages, which are only walked if the site has no feeds.
+        since/until (datetimes, dates or date strings; naive means Cairo time)
+        keep only articles published in that window, and pagination stops at
+        the first listing page older than since.
+        
+        With a rate-limited client, delay only sets the starting request rate;
+        the limiter then adapts it to how the site responds.
+        """
+        if incremental and self.url_index is None:
+            self.url_index = UrlIndex()
+        since = as_datetime(since)
+        until = as_datetime(until, end_of_day=True)
+        
+        rate_limiter = getattr(self.client, 'rate_limiter', None)
+        if rate_limiter is not None and delay:
+            rate_limiter.configure(urlparse(self.base_url).netloc, rate=1.0 / delay)
+        
         print("\n" + "="*80)
         print("ALBORSA NEWS SCRAPER")
         print("="*80)
         print(f"Pages: {start_page} to {end_page}")
         print(f"Delay: {delay} seconds between requests")
+        if incremental:
+            print(f"Incremental: {len(self.url_index)} articles already extracted")
+        if since or until:
+            print(f"Published: {since or 'any time'} to {until or 'now'}")
         print("="*80)
         
-        # First, identify static articles by comparing page 1 and 2
-        if start_page == 1:
-            self.identify_static_articles()
-            time.sleep(delay)
+        feed_links = None
+        if use_feeds:
+            feed_links = self.discover_article_links(
+                max_pages=end_page, since=since, until=until, incremental=incremental, verbose=verbose
+            )
+        
+        # Static articles are learned from pages 1 and 2 as the crawl fetches
+        # them, and reused from disk until they go stale (feeds have none)
+        learn_static = False
+        if feed_links is None and not self.load_static_articles():
+            if start_page == 1 and end_page >= 2:
+                learn_static = True
+            elif start_page == 1 and not self.static_articles:
+                # Single-page crawl with nothing saved: fetch page 2 just this once
+                self.identify_static_articles()
+                self.pause(delay)
         
         # Now scrape the requested pages
         print("\n" + "="*80)
         print("SCRAPING ARTICLES")
         print("="*80)
         
-        all_article_links = []
+        if pipeline and feed_links is None:
+            self.scrape_pipelined(
+                start_page, end_page, delay=delay, verbose=verbose, incremental=incremental,
+                workers=workers, learn_static=learn_static, since=since, until=until
+            )
+            
+            print(f"\n" + "="*80)
+            print(f"✅ SCRAPING COMPLETE!")
+            print(f"   Successfully scraped: {len(self.articles_data)} articles")
+            self.print_rate_limits()
+            print("="*80)
+            return self.articles_data
         
-        # Collect all article links
-        for page_num in range(start_page, end_page + 1):
-            links, _ = self.get_article_links_from_page(page_num)
-            all_article_links.extend(links)
-            time.sleep(delay)
+        if feed_links is not None:
+            all_article_links = feed_links
+        else:
+            all_article_links = []
+            
+            # Collect all article links from the listing pages
+            for page_num in range(start_page, end_page + 1):
+                links, _ = self.get_article_links_from_page(page_num)
+                
+                if incremental:
+                    links, stop = self.drop_known_links(links, page_num)
+                    if stop:
+                        break
+                links, stop = self.filter_by_date(links, page_num, since, until)
+                
+                all_article_links.extend(links)
+                
+                if learn_static and page_num == 2:
+                    static = self.learn_static_articles()
+                    all_article_links = [link for link in all_article_links if canonicalize_url(link) not in static]
+                
+                if stop:
+                    break
+                self.pause(delay)
         
         print(f"\n" + "="*80)
         print(f"📊 TOTAL: {len(all_article_links)} unique articles to extract")
@@ -269,43 +633,360 @@ class AlBorsaNewsScraper:
         print("EXTRACTING ARTICLE CONTENT")
         print("="*80)
         
-        for idx, article_url in enumerate(all_article_links, 1):
-            print(f"\n[{idx}/{len(all_article_links)}]")
-            article_data = self.extract_article_content(article_url, verbose=verbose)
-            
-            if article_data:
-                self.articles_data.append(article_data)
-                if not verbose:
-                    print(f"   ✅ {article_data['title'][:60]}...")
-            
-            time.sleep(delay)
+        # Async mode: wall-clock time scales with concurrency, not article count
+        if concurrency:
+            print(f"Concurrency: {concurrency} requests in flight")
+            articles = self.extract_articles_async(
+                all_article_links, concurrency=concurrency,
+                per_host_delay=0 if rate_limiter is not None else delay / concurrency, verbose=verbose
+            )
+            self.articles_data.extend(articles)
+            if not verbose:
+                for article_data in articles:
+                    self.progress(f"   ✅ {article_data['title'][:60]}...")
+        
+        # Process-pool mode: parsing runs on every core instead of under one GIL
+        elif processes:
+            print(f"Parsing on {processes} processes")
+            articles = self.extract_articles_parallel(all_article_links, processes=processes)
+            self.articles_data.extend(articles)
+            if not verbose:
+                for article_data in articles:
+                    self.progress(f"   ✅ {article_data['title'][:60]}...")
+        
+        else:
+            for idx, article_url in enumerate(all_article_links, 1):
+                self.progress(f"\n[{idx}/{len(all_article_links)}]")
+                article_data = self.extract_article_content(article_url, verbose=verbose)
+                
+                if article_data:
+                    self.articles_data.append(article_data)
+                    if not verbose:
+                        self.progress(f"   ✅ {article_data['title'][:60]}...")
+                
+                self.pause(delay)
+        
+        self.record_articles(self.articles_data)
         
         print(f"\n" + "="*80)
         print(f"✅ SCRAPING COMPLETE!")
         print(f"   Successfully scraped: {len(self.articles_data)} articles")
+        self.print_rate_limits()
         print("="*80)
         
         return self.articles_data
     
-    def save_to_json(self, filename='AlBorsaNewsScraped.json'):
-        """Save articles to JSON file"""
+    def print_rate_limits(self):
+        """Show the rate each host settled at"""
+        rate_limiter = getattr(self.client, 'rate_limiter', None)
+        if rate_limiter is None:
+            return
+        for host, state in rate_limiter.metrics().items():
+            print(f"   ⏱️  {host}: {state['rate']} req/s, concurrency {state['concurrency']}, "
+                  f"{state['requests']} requests, {state['backoffs']} back-offs")
+    
+    def discover_categories(self):
+        """Seed categories linked from the home page: [(name, url, weight)]
+        
+        The default category comes first with double weight.
+        """
+        seeds = [(unquote(self.category_url.rsplit('/', 1)[-1]), self.category_url, 2.0)]
+        try:
+            response = self.client.get(self.base_url, headers=self.headers)
+            response.encoding = 'utf-8'
+            soup = make_soup(response.text, parse_only=LINKS)
+        except Exception as e:
+            print(f"   ❌ Error fetching home page: {e}")
+            return seeds
+        
+        known = {self.category_url.lower()}
+        for link in soup.find_all('a', href=True):
+            url = urljoin(self.base_url, link['href']).split('#')[0].split('?')[0].rstrip('/')
+            if not url.startswith(f"{self.base_url}/category/") or '/page/' in url or url.endswith('/feed'):
+                continue
+            if url.lower() in known:
+                continue
+            known.add(url.lower())
+            seeds.append((unquote(url.rsplit('/', 1)[-1]), url, 1.0))
+        return seeds
+    
+    def listing_links(self, url, page, incremental=False, since=None, until=None):
+        """Article links of one listing page, minus static, known and out-of-window ones
+        
+        Returns (links, listed, too_old): listed counts the links before
+        the date filter, too_old is True once the page is older than since.
+        """
+        response = self.client.get(url, headers=self.headers)
+        response.encoding = 'utf-8'
+        
+        links, keys = [], set()
+        for link in headline_links(response.text):
+            key = canonicalize_url(link)
+            if link.startswith('http') and key not in self.static_articles and key not in keys:
+                keys.add(key)
+                links.append(link)
+        if incremental and links:
+            known = self.url_index.known(links)
+            links = [link for link in links if link not in known]
+        listed = len(links)
+        links, too_old = self.filter_by_date(links, page, since, until)
+        return links, listed, too_old
+    
+    def crawl_listing(self, frontier, item, max_pages=5, incremental=False, since=None, until=None):
+        """Queue the articles on a listing page, and the next page if this one had anything new"""
+        page = item['page']
+        links, listed, too_old = self.listing_links(item['url'], page, incremental, since, until)
+        
+        queued = [
+            link for position, link in enumerate(links)
+            if frontier.push(item['category'], link, freshness=page_freshness(page, position), page=page)
+        ]
+        print(f"   📰 {item['category']} page {page}: {len(queued)} new articles")
+        
+        # Pages of articles newer than until are walked through, not counted as done
+        if (queued or len(links) < listed) and not too_old and page < max_pages:
+            frontier.push(
+                item['category'], self.listing_page_url(page + 1, item['category_url']), kind='listing',
+                freshness=page_freshness(page + 1), page=page + 1, category_url=item['category_url']
+            )
+    
+    def crawl_categories(self, categories=None, budget=200, max_pages=5, delay=1, workers=4, incremental=False, verbose=False, since=None, until=None):
+        """Crawl many categories at once under a shared request budget
+        
+        categories: [(name, url, weight)], discovered from the home page if None.
+        since/until bound publish dates as in scrape_articles; a category
+        stops paginating at its first page older than since.
+        Every listing page and article costs one request of the budget, split
+        between categories by weight. An article listed in several categories
+        is extracted once.
+        """
+        if incremental and self.url_index is None:
+            self.url_index = UrlIndex()
+        since = as_datetime(since)
+        until = as_datetime(until, end_of_day=True)
+        if categories is None:
+            categories = self.discover_categories()
+        self.load_static_articles()  # Featured articles repeat on every category page
+        
+        print("\n" + "="*80)
+        print("ALBORSA MULTI-CATEGORY CRAWL")
+        print("="*80)
+        print(f"Categories: {len(categories)}, budget: {budget} requests, up to {max_pages} pages each")
+        print("="*80)
+        
+        frontier = CrawlFrontier(budget=budget, seen=self.seen_urls)
+        for name, url, weight in categories:
+            frontier.add_category(name, weight)
+            frontier.push(name, url, kind='listing', freshness=page_freshness(1), page=1, category_url=url)
+        
+        articles_lock = threading.Lock()
+        
+        def crawl_worker():
+            while True:
+                item = frontier.pop()
+                if item is None:
+                    return
+                try:
+                    if item['kind'] == 'listing':
+                        self.crawl_listing(
+                            frontier, item, max_pages=max_pages, incremental=incremental, since=since, until=until
+                        )
+                    else:
+                        article_data = self.extract_article_content(item['url'], verbose=verbose)
+                        if article_data:
+                            article_data['section'] = item['category']
+                            with articles_lock:
+                                self.articles_data.append(article_data)
+                            self.record_articles([article_data])
+                            if not verbose:
+                                self.progress(f"   ✅ [{item['category']}] {article_data['title'][:60]}...")
+                except Exception as e:
+                    print(f"   ❌ Error crawling {item['url']}: {e}")
+                finally:
+                    frontier.task_done()
+                self.pause(delay)
+        
+        threads = [threading.Thread(target=crawl_worker, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        print(f"\n" + "="*80)
+        print(f"✅ CRAWL COMPLETE!")
+        print(f"   Successfully scraped: {len(self.articles_data)} articles in {frontier.spent} requests")
+        for name, state in frontier.stats().items():
+            print(f"   📂 {name}: {state['spent']} requests (share {state['share']:.0%}), {state['queued']} left queued")
+        self.print_rate_limits()
+        print("="*80)
+        
+        return self.articles_data
+    
+    def seed_work_queue(self, work_queue, start_page=1, end_page=1, categories=None, walk=False):
+        """Queue listing pages start_page..end_page of each category as work-queue jobs
+        
+        categories: [(name, url, weight)], the default category if None.
+        Every page is queued up front so any number of workers can fetch
+        them at once; walk=True queues only start_page and lets each page
+        queue the next one, stopping early like crawl_categories (for
+        incremental or since-bounded runs). Pages finished by an earlier
+        crawl of the same queue are queued again, so new articles are found;
+        articles already extracted stay done. Returns how many pages were queued.
+        """
+        if categories is None:
+            categories = [(unquote(self.category_url.rsplit('/', 1)[-1]), self.category_url, 1.0)]
+        pages = [start_page] if walk else range(start_page, end_page + 1)
+        jobs = [
+            {'kind': 'listing', 'url': self.listing_page_url(page, url), 'priority': page_freshness(page),
+             'category': name, 'category_url': url, 'page': page, 'last_page': end_page, 'walk': walk, 'requeue': True}
+            for name, url, weight in categories for page in pages
+        ]
+        added = work_queue.put_many(jobs)
+        print(f"📥 Queued {added} listing pages ({len(jobs) - added} already pending)")
+        return added
+    
+    def work_listing(self, job, incremental=False, since=None, until=None):
+        """Follow-up jobs of a listing-page job: its articles, and the next page while it has any"""
+        page = job['page']
+        links, listed, too_old = self.listing_links(job['url'], page, incremental, since, until)
+        # Articles outrank listing pages, so workers drain a page before fetching more of them
+        jobs = [
+            {'kind': 'article', 'url': canonicalize_url(link), 'link': link, 'category': job['category'],
+             'priority': 1 + page_freshness(page, position)}
+            for position, link in enumerate(links)
+        ]
+        # Without walk every page was seeded already
+        if job.get('walk') and (links or len(links) < listed) and not too_old and page < job['last_page']:
+            jobs.append({
+                'kind': 'listing', 'url': self.listing_page_url(page + 1, job['category_url']),
+                'priority': page_freshness(page + 1), 'category': job['category'],
+                'category_url': job['category_url'], 'page': page + 1, 'last_page': job['last_page'],
+                'walk': True, 'requeue': True  # Done in an earlier crawl of this queue, due again now
+            })
+        print(f"   📰 {job['category']} page {page}: {len(links)} articles")
+        return jobs
+    
+    def run_worker(self, work_queue, worker_id=None, threads=1, delay=1, visibility_timeout=120, incremental=False, verbose=False, since=None, until=None, poll_interval=2):
+        """Work through listing and article jobs of a shared work queue until nothing is left
+        
+        Run one worker per process, on as many processes as the site
+        tolerates; they coordinate only through work_queue (see
+        work_queue.py), so a backfill scales with their number. Articles
+        are stored in the queue's results, export them with
+        export_work_queue(). A job that takes longer than visibility_timeout
+        seconds may be handed to another worker. Returns the number of
+        jobs this worker completed.
+        """
+        if incremental and self.url_index is None:
+            self.url_index = UrlIndex()
+        since = as_datetime(since)
+        until = as_datetime(until, end_of_day=True)
+        self.load_static_articles()  # Featured articles repeat on every listing page
+        worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        completed = []
+        
+        def queue_worker(owner):
+            while True:
+                jobs = work_queue.lease(owner, visibility_timeout=visibility_timeout)
+                if not jobs:
+                    if not work_queue.pending():
+                        return
+                    # Other workers hold the last jobs, and may queue more when they finish
+                    time.sleep(poll_interval)
+                    continue
+                job = jobs[0]
+                try:
+                    if job['kind'] == 'listing':
+                        result, follow_up = None, self.work_listing(job, incremental, since, until)
+                    else:
+                        article_data = self.extract_article_content(job['link'], verbose=verbose)
+                        if article_data is None:
+                            raise RuntimeError('extraction failed')
+                        article_data['section'] = job['category']
+                        result, follow_up = article_data.to_dict(), ()
+                except Exception as e:
+                    retry = work_queue.fail(job, e)
+                    print(f"   ❌ {job['kind']} {job['url']} (attempt {job['attempts']}): {e}"
+                          f"{' - will retry' if retry else ' - giving up'}")
+                else:
+                    if work_queue.complete(job, result, follow_up):
+                        completed.append(job['id'])
+                        if result is not None:
+                            self.record_articles([result])
+                            if not verbose:
+                                self.progress(f"   ✅ [{job['category']}] {result['title'][:60]}...")
+                self.pause(delay)
+        
+        print(f"\n👷 Worker {worker_id}: {threads} thread(s) on {work_queue.pending()} pending jobs")
+        workers = [
+            threading.Thread(target=queue_worker, args=(f"{worker_id}/{n}",), daemon=True) for n in range(threads)
+        ]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        print(f"✅ Worker {worker_id} done: completed {len(completed)} jobs")
+        self.print_rate_limits()
+        return len(completed)
+    
+    def export_work_queue(self, work_queue, filename='AlBorsaNewsScraped.json', append=False):
+        """Save the articles collected in a work queue to JSON, like save_to_json"""
+        self.articles_data = [Article.from_dict(data) for data in work_queue.results('article')]
+        self.save_to_json(filename, append=append)
+        return self.articles_data
+    
+    def save_to_parquet(self, root='AlBorsaCorpus'):
+        """Append articles to the Parquet corpus, partitioned by month and category (needs pyarrow)"""
+        count = ParquetStore(root).write_articles(self.articles_data)
+        print(f"\n💾 Saved {count} articles to {root}/articles")
+    
+    def save_to_json(self, filename='AlBorsaNewsScraped.json', append=False):
+        """Save articles to JSON file (append=True merges with the existing file)"""
+        articles = self.articles_data
+        store = None
+        if append and os.path.exists(filename):
+            # Earlier articles' text waits on disk rather than in memory
+            store = ContentStore()
+            existing = load_articles(filename, content_store=store)
+            new_urls = {article['url'] for article in articles}
+            articles = [article for article in existing if article['url'] not in new_urls] + articles
+        
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(self.articles_data, f, ensure_ascii=False, indent=2)
-        print(f"\n💾 Saved {len(self.articles_data)} articles to {filename}")
+            dump_articles(articles, f)
+        if store is not None:
+            store.close()
+        print(f"\n💾 Saved {len(articles)} articles to {filename}")
 
 
-# Example usage
-if __name__ == "__main__":
-    # Initialize scraper
-    scraper = AlBorsaNewsScraper()
+def parse_article_bytes(raw, article_url):
+    """Process-pool entry point: decode a downloaded article page and parse it"""
+    return AlBorsaNewsScraper.parse_article_content(raw.decode('utf-8', errors='replace'), article_url)
+
+
+def main(start_page=1, end_page=3, delay=2, output='AlBorsaNewsScraped.json', append=False, parquet=False,
+         metrics_file='AlBorsaMetrics.prom', quiet=False, **options):
+    """Scrape listing pages start_page..end_page, save the articles and print a summary
+    
+    options go to scrape_articles (verbose, concurrency, incremental,
+    pipeline, workers, processes, use_feeds, since, until); append=True
+    merges with the existing output file, as incremental runs need.
+    """
+    # Initialize scraper (quiet=True prints no per-article lines)
+    scraper = AlBorsaNewsScraper(quiet=quiet)
     
-    # Scrape articles from pages 1-3
     # Set verbose=True to see detailed extraction info
-    articles = scraper.scrape_articles(start_page=1, end_page=3, delay=2, verbose=False)
+    # Set concurrency=N to extract articles with N concurrent requests
+    # Set incremental=True (and append=True) for scheduled runs
+    # Set pipeline=True to extract articles while listing pages are still being walked
+    # Set use_feeds=True to discover articles from the RSS feed/sitemaps instead of listing pages
+    # Use scraper.crawl_categories(budget=300) to cover every category under one request budget
+    articles = scraper.scrape_articles(start_page=start_page, end_page=end_page, delay=delay, **options)
     
     if articles:
         # Save to JSON format
-        scraper.save_to_json('AlBorsaNewsScraped.json')
+        scraper.save_to_json(output, append=append)
+        if parquet:
+            scraper.save_to_parquet()
         
         # Print summary
         print(f"\n" + "="*80)
@@ -333,4 +1014,13 @@ if __name__ == "__main__":
             print(f"   Content: {len(articles[0]['content'])} characters")
     else:
         print("\n⚠️  No articles were scraped")
-        
\ No newline at end of file
+    
+    # Where the time went (fetching, parsing, sleeping), plus the raw numbers for Prometheus
+    REGISTRY.print_summary()
+    if metrics_file:
+        REGISTRY.write(metrics_file)
+    return articles
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,23 @@
 #**Extracting articles
 # Import libraries
-import requests
-from bs4 import BeautifulSoup
+from arabic_text import split_sentences
+from http_client import get_client
+from html_parser import LINKS, ParseOnly, make_soup
 import pandas as pd
 
+client = get_client()  # Shared pooled session with retries
+
+# Article pages: only the title and paragraphs are read
+TITLE_AND_PARAGRAPHS = ParseOnly(("h1", {}), ("p", {}))
+
 # URL of the news category
 category_url = "https://www.alborsaanews.com/category/%D8%A7%D9%84%D8%A8%D9%88%D8%B1%D8%B5%D8%A9-%D9%88%D8%A7%D9%84%D8%B4%D8%B1%D9%83%D8%A7%D8%AA"
 
 # Send HTTP GET request
-response = requests.get(category_url)
+response = client.get(category_url)
 response.encoding = 'utf-8'
 
-soup = BeautifulSoup(response.text, "html.parser")
+soup = make_soup(response.text, parse_only=LINKS)
 
 # 1. Find all article links
 article_links = []
@@ -30,9 +36,9 @@ data = []
 
 for link in article_links:
     try:
-        resp = requests.get(link)
+        resp = client.get(link)
         resp.encoding = 'utf-8'
-        article_soup = BeautifulSoup(resp.text, "html.parser")
+        article_soup = make_soup(resp.text, parse_only=TITLE_AND_PARAGRAPHS)
         
         # Get title
         title_tag = article_soup.find("h1")
@@ -56,23 +62,19 @@ print(f"{len(data)} articles saved to articles.xlsx successfully!")
 print()
 
 #**Summarizing all articles
-# Function to summarize text in Arabic by splitting on Arabic periods
+# Function to summarize text in Arabic: the first sentences, split on . ؟ ۔ ، and ! ?
 def summarize_text(text, num_sentences=5):
-    # Arabic full stop "۔" or fallback to English period "."
-    sentences = text.split("۔")
-    if len(sentences) < 2:
-        sentences = text.split(".")
-    # Remove empty strings
-    sentences = [s.strip() for s in sentences if s.strip()]
-    return "۔ ".join(sentences[:num_sentences]) + ("۔" if sentences else "")
+    # Sentences keep their own closing punctuation
+    sentences = split_sentences(text)
+    return " ".join(sentences[:num_sentences])
 
 # URL of the news category
 category_url = "https://www.alborsaanews.com/category/%D8%A7%D9%84%D8%A8%D9%88%D8%B1%D8%B5%D8%A9-%D9%88%D8%A7%D9%84%D8%B4%D8%B1%D9%83%D8%A7%D8%AA"
 
 # Send GET request
-response = requests.get(category_url)
+response = client.get(category_url)
 response.encoding = 'utf-8'
-soup = BeautifulSoup(response.text, "html.parser")
+soup = make_soup(response.text, parse_only=LINKS)
 
 # 1. Find article links (filter by year in URL)
 article_links = []
@@ -90,9 +92,9 @@ data = []
 
 for link in article_links:
     try:
-        resp = requests.get(link)
+        resp = client.get(link)
         resp.encoding = 'utf-8'
-        article_soup = BeautifulSoup(resp.text, "html.parser")
+        article_soup = make_soup(resp.text, parse_only=TITLE_AND_PARAGRAPHS)
         
         # Title
         title_tag = article_soup.find("h1")
@@ -10,15 +10,25 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.keys import Keys
 from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
-import json
+from arabic_dates import as_datetime, parse_arabic_date, to_iso, within
+from arabic_text import word_count
+from article import Article, dump_articles
+from field_extraction import MUBASHER_ARTICLE
+from html_parser import LINKS, make_soup
+from metrics import ARTICLES, EXTRACT_SECONDS, FETCH_SECONDS, PARSE_SECONDS, SLEEP_SECONDS
+from rate_limiter import AdaptiveRateLimiter
+from url_dedup import UrlFingerprintIndex
+from urllib.parse import urlparse
 import time
 from datetime import datetime
 
-def setup_driver():
-    """Setup Chrome driver"""
+def setup_driver(headless=False):
+    """Setup Chrome driver (headless: no window, for scheduled runs)"""
     print("Setting up browser...")
     options = Options()
     options.add_argument("--start-maximized")
+    if headless:
+        options.add_argument("--headless=new")
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option('useAutomationExtension', False)
@@ -114,8 +124,8 @@ def login_to_mubasher(driver, email, password):
         retry = input("Try to continue anyway? (y/n): ")
         return retry.lower() == 'y'
 
-def get_article_links(driver, url, max_links=30):
-    """Get article links from listing page"""
+def get_article_links(driver, url, max_links=30, seen=None):
+    """Get article links from listing page (seen: UrlFingerprintIndex shared across sections)"""
     print(f"\n{'='*60}")
     print(f"Getting article links from: {url}")
     print("="*60)
@@ -130,8 +140,8 @@ def get_article_links(driver, url, max_links=30):
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
         time.sleep(2)
     
-    # Parse page
-    soup = BeautifulSoup(driver.page_source, 'html.parser')
+    # Parse page - only the links are needed
+    soup = make_soup(driver.page_source, parse_only=LINKS)
     
     # EXCLUDE these patterns - they are NOT articles
     exclude_patterns = [
@@ -158,6 +168,8 @@ def get_article_links(driver, url, max_links=30):
     
     # Find all article links
     article_links = []
+    if seen is None:
+        seen = UrlFingerprintIndex()
     links = soup.find_all('a', href=True)
     
     for link in links:
@@ -180,8 +192,8 @@ def get_article_links(driver, url, max_links=30):
         if len(title) < 20 or title in ['Read More', 'More', 'News', 'Articles']:
             continue
         
-        # Avoid duplicates
-        if full_url not in [a['url'] for a in article_links]:
+        # Avoid duplicates (canonical URL, so tracking parameters don't hide them)
+        if seen.add(full_url):
             article_links.append({
                 'url': full_url,
                 'title': title
@@ -193,143 +205,147 @@ def get_article_links(driver, url, max_links=30):
     print(f"✓ Found {len(article_links)} unique article links")
     return article_links
 
-def extract_full_article(driver, article_url):
-    """Extract full article content from article page"""
+def extract_full_article(driver, article_url, rate_limiter=None, render_wait=3):
+    """Extract full article content from article page (paced by rate_limiter if given)
+    
+    render_wait: seconds the page's scripts get to fill in the article
+    """
+    host = urlparse(article_url).netloc
+    extract_start = time.perf_counter()
     try:
-        driver.get(article_url)
-        time.sleep(3)
-        
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        
-        # Extract article title
-        title = ""
-        title_elem = soup.find('h1')
-        if title_elem:
-            title = title_elem.get_text(strip=True)
-        
-        # Extract article date/time
-        date = ""
-        date_elem = soup.find('time') or soup.find(class_=['date', 'published', 'post-date', 'article-date'])
-        if date_elem:
-            date = date_elem.get('datetime', date_elem.get_text(strip=True))
-        
-        # Extract author - try multiple strategies
-        author = ""
-        
-        # Strategy 1: Look for author class
-        author_elem = soup.find(class_=['author', 'byline', 'writer', 'article-author', 'post-author'])
-        if author_elem:
-            author = author_elem.get_text(strip=True).replace('By', '').replace('by', '').strip()
-        
-        # Strategy 2: Look for author in meta tags
-        if not author:
-            author_meta = soup.find('meta', {'name': 'author'}) or soup.find('meta', {'property': 'article:author'})
-            if author_meta:
-                author = author_meta.get('content', '').strip()
-        
-        # Strategy 3: Look for "By [Name]" pattern in text
-        if not author:
-            for p in soup.find_all('p', limit=3):
-                text = p.get_text(strip=True)
-                if text.startswith('By ') and len(text) < 50:
-                    author = text.replace('By', '').replace('–', '').strip()
-                    break
-        
-        # Extract category/tags - improved
-        category = ""
-        
-        # Strategy 1: Look for breadcrumbs
-        breadcrumb = soup.find(class_=['breadcrumb', 'breadcrumbs'])
-        if breadcrumb:
-            links = breadcrumb.find_all('a')
-            if len(links) > 1:
-                category = links[-1].get_text(strip=True)
-        
-        # Strategy 2: Look for category/tag elements
-        if not category:
-            category_elem = soup.find(class_=['category', 'tag', 'section', 'article-category', 'post-category', 'news-category'])
-            if category_elem:
-                category = category_elem.get_text(strip=True)
-        
-        # Strategy 3: Look for meta tags
-        if not category:
-            category_meta = soup.find('meta', {'property': 'article:section'}) or soup.find('meta', {'name': 'category'})
-            if category_meta:
-                category = category_meta.get('content', '').strip()
-        
-        # Strategy 4: Extract from URL
-        if not category:
-            # URL format: /news/eg/category/banking or /news/category/11/Banking-and-Finance
-            url_parts = article_url.split('/')
-            for i, part in enumerate(url_parts):
-                if part in ['category', 'section'] and i + 1 < len(url_parts):
-                    category = url_parts[i + 1].replace('-', ' ').replace('_', ' ').title()
-                    break
-        
-        # Extract main article content - IMPROVED
-        content = ""
-        
-        # Try to find article body with common selectors
-        content_container = (
-            soup.find('div', class_=lambda x: x and 'article-body' in str(x).lower()) or
-            soup.find('div', class_=lambda x: x and 'article-content' in str(x).lower()) or
-            soup.find('div', class_=lambda x: x and 'story-body' in str(x).lower()) or
-            soup.find('div', class_=lambda x: x and 'news-body' in str(x).lower()) or
-            soup.find('div', {'id': lambda x: x and 'article' in str(x).lower()}) or
-            soup.find('article')
-        )
-        
-        if content_container:
-            # Extract all paragraphs - filter out short/empty ones
-            paragraphs = content_container.find_all('p')
-            valid_paragraphs = []
-            
-            for p in paragraphs:
-                text = p.get_text(strip=True)
-                # Only include paragraphs with substantial content
-                if len(text) > 30 and not text.startswith('©') and 'cookie' not in text.lower():
-                    valid_paragraphs.append(text)
-            
-            content = '\n\n'.join(valid_paragraphs)
-        
-        # If no content found, skip this article
-        if not content or len(content) < 100:
-            print(f"      ⚠ Skipping - insufficient content")
-            return None
-        
-        # Extract featured image
-        image = ""
-        img_elem = soup.find('img', class_=lambda x: x and ('featured' in str(x).lower() or 'main' in str(x).lower()))
-        if not img_elem:
-            # Find first substantial image in article
-            imgs = soup.find_all('img')
-            for img in imgs:
-                src = img.get('src', '')
-                # Skip tracking pixels and tiny images
-                if 'facebook.com' not in src and 'pixel' not in src and '1x1' not in src:
-                    image = src
-                    break
-        else:
-            image = img_elem.get('src', '')
-        
-        if image and not image.startswith('http'):
-            image = 'https://english.mubasher.info' + image
-        
-        return {
-            'title': title,
-            'url': article_url,
-            'date': date,
-            'author': author,
-            'category': category,
-            'image': image,
-            'content': content,
-            'word_count': len(content.split()) if content else 0,
-            'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
+        if rate_limiter:
+            rate_limiter.acquire(host)
+            SLEEP_SECONDS.labels('rate_limit').inc(time.perf_counter() - extract_start)
+        start = time.perf_counter()
+        status = None  # A page that failed to load counts as no response
+        try:
+            driver.get(article_url)
+            status = 200
+        finally:
+            FETCH_SECONDS.labels(host).observe(time.perf_counter() - start)
+            if rate_limiter:
+                # The browser hides status codes, so page load time is the congestion signal
+                rate_limiter.release(host, status=status, latency=time.perf_counter() - start)
+        if render_wait:
+            SLEEP_SECONDS.labels('render_wait').inc(render_wait)
+            time.sleep(render_wait)
+        
+        with PARSE_SECONDS.labels('mubasher_article').time():
+            article = parse_full_article(driver.page_source, article_url)
+        ARTICLES.labels('mubasher', 'extracted' if article else 'empty').inc()
+        return article
         
     except Exception as e:
         print(f"      ✗ Error extracting article: {e}")
+        ARTICLES.labels('mubasher', 'failed').inc()
+        return None
+    finally:
+        EXTRACT_SECONDS.labels('mubasher').observe(time.perf_counter() - extract_start)
+
+def parse_full_article(html, article_url):
+    """Build an article dict from an article page's HTML (None if it has no real content)"""
+    # Every candidate element for every strategy below is found in one tree walk
+    soup = make_soup(html, parse_only=MUBASHER_ARTICLE.parse_only)
+    fields = MUBASHER_ARTICLE.extract(soup)
+    
+    # Extract article title
+    title = fields['title'].get_text(strip=True) if fields['title'] else ""
+    
+    # Extract article date/time
+    date = ""
+    date_elem = fields['date']
+    if date_elem:
+        date = date_elem.get('datetime', date_elem.get_text(strip=True))
+    
+    # Extract author - try multiple strategies
+    author = ""
+    
+    # Strategy 1: Look for author class
+    if fields['author']:
+        author = fields['author'].get_text(strip=True).replace('By', '').replace('by', '').strip()
+    
+    # Strategy 2: Look for author in meta tags
+    if not author and fields['author_meta']:
+        author = fields['author_meta'].get('content', '').strip()
+    
+    # Strategy 3: Look for "By [Name]" pattern in text
+    if not author:
+        for p in fields['lead_paragraphs']:
+            text = p.get_text(strip=True)
+            if text.startswith('By ') and len(text) < 50:
+                author = text.replace('By', '').replace('–', '').strip()
+                break
+    
+    # Extract category/tags - improved
+    category = ""
+    
+    # Strategy 1: Look for breadcrumbs
+    if fields['breadcrumb']:
+        links = fields['breadcrumb'].find_all('a')
+        if len(links) > 1:
+            category = links[-1].get_text(strip=True)
+    
+    # Strategy 2: Look for category/tag elements
+    if not category and fields['category']:
+        category = fields['category'].get_text(strip=True)
+    
+    # Strategy 3: Look for meta tags
+    if not category and fields['category_meta']:
+        category = fields['category_meta'].get('content', '').strip()
+    
+    # Strategy 4: Extract from URL
+    if not category:
+        # URL format: /news/eg/category/banking or /news/category/11/Banking-and-Finance
+        url_parts = article_url.split('/')
+        for i, part in enumerate(url_parts):
+            if part in ['category', 'section'] and i + 1 < len(url_parts):
+                category = url_parts[i + 1].replace('-', ' ').replace('_', ' ').title()
+                break
+    
+    # Extract main article content - article-body, article-content, story-body,
+    # news-body, an id containing "article", or <article>, in that order
+    content = ""
+    content_container = fields['content']
+    
+    if content_container:
+        # Extract all paragraphs - filter out short/empty ones
+        valid_paragraphs = []
+        
+        for p in content_container.find_all('p'):
+            text = p.get_text(strip=True)
+            # Only include paragraphs with substantial content
+            if len(text) > 30 and not text.startswith('©') and 'cookie' not in text.lower():
+                valid_paragraphs.append(text)
+        
+        content = '\n\n'.join(valid_paragraphs)
+    
+    # If no content found, skip this article
+    if not content or len(content) < 100:
+        print(f"      ⚠ Skipping - insufficient content")
         return None
+    
+    # Extract featured image, else the first image that isn't a tracking pixel
+    image = ""
+    if fields['featured_image']:
+        image = fields['featured_image'].get('src', '')
+    elif fields['first_image']:
+        image = fields['first_image'].get('src', '')
+    
+    if image and not image.startswith('http'):
+        image = 'https://english.mubasher.info' + image
+    
+    return Article.from_dict({
+        'title': title,
+        'url': article_url,
+        'date': date,
+        'published_at': to_iso(date),
+        'author': author,
+        'category': category,
+        'image': image,
+        'content': content,
+        'word_count': word_count(content),
+        'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    })
 
 def extract_article_info(container):
     """DEPRECATED - Old function kept for compatibility"""
@@ -338,28 +354,42 @@ def extract_article_info(container):
 def save_to_json(data, filename='mubasher_articles.json'):
     """Save to JSON"""
     with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+        dump_articles(data, f)
     print(f"\n{'='*60}")
     print(f"✓ SAVED {len(data)} ARTICLES")
     print(f"✓ File: {filename}")
     print("="*60)
 
-def main():
-    """Main function"""
+def main(since=None, until=None, interactive=True, headless=False, output='mubasher_articles.json'):
+    """Main function (since/until: keep only articles published in that window)
+    
+    interactive=False (scheduled runs) skips the manual login and never
+    waits for Enter; only articles readable without an account are saved.
+    Returns True if articles were saved.
+    """
     print("="*60)
     print("MUBASHER EGYPT ARTICLE SCRAPER")
     print("="*60)
     
-    driver = setup_driver()
+    # Before Chrome starts, so a bad date doesn't leave a browser behind
+    since = as_datetime(since)
+    until = as_datetime(until, end_of_day=True)
+    driver = setup_driver(headless=headless)
+    rate_limiter = AdaptiveRateLimiter(initial_rate=1 / 1.5, max_rate=2.0, initial_concurrency=1, max_concurrency=1)
+    seen = UrlFingerprintIndex()  # An article listed in several sections is extracted once
     all_articles = []
+    saved = False
     
     try:
         # Attempt login (with manual fallback)
-        login_successful = login_to_mubasher(driver, "", "")
-        
-        if not login_successful:
-            print("\n❌ Cannot proceed without login")
-            return
+        if interactive:
+            login_successful = login_to_mubasher(driver, "", "")
+            
+            if not login_successful:
+                print("\n❌ Cannot proceed without login")
+                return False
+        else:
+            print("\nℹ️  Non-interactive run: continuing without login")
         
         # Extract articles
         print("\n" + "="*60)
@@ -376,16 +406,28 @@ def main():
             print(f"\n📰 Section: {section_name}")
             
             # Step 1: Get article links from listing page
-            article_links = get_article_links(driver, url, max_links=15)
+            article_links = get_article_links(driver, url, max_links=15, seen=seen)
             
             # Step 2: Visit each article and extract full content
             print(f"\nExtracting full content from {len(article_links)} articles...")
             section_articles = []
+            older = 0  # Consecutive articles published before since
             
             for i, link_info in enumerate(article_links, 1):
                 print(f"  [{i}/{len(article_links)}] {link_info['title'][:60]}...")
                 
-                article_data = extract_full_article(driver, link_info['url'])
+                article_data = extract_full_article(driver, link_info['url'], rate_limiter)
+                
+                published = parse_arabic_date(article_data['published_at']) if article_data else None
+                if not within(published, since, until):
+                    print(f"      - Skipped (published {article_data['date']})")
+                    # Listings run newest first; a few pinned older stories are tolerated
+                    older = older + 1 if not within(published, since) else 0
+                    if older >= 3:
+                        print("      ⏹️  Reached articles older than the window - next section")
+                        break
+                    continue
+                older = 0
                 
                 if article_data and article_data['word_count'] > 50:  # Only save articles with real content
                     article_data['section'] = section_name
@@ -397,12 +439,9 @@ def main():
                         article_data['author'] = "Mubasher"
                     section_articles.append(article_data)
                     print(f"      ✓ Extracted ({article_data['word_count']} words)")
-                
-                time.sleep(1.5)  # Be polite to the server
             
             all_articles.extend(section_articles)
             print(f"\n✓ Section complete: {len(section_articles)} articles extracted")
-            time.sleep(2)
         
         # Results
         print("\n" + "="*60)
@@ -419,7 +458,8 @@ def main():
                 print(f"   Content Preview: {article['content'][:150]}...")
                 print()
             
-            save_to_json(all_articles)
+            save_to_json(all_articles, output)
+            saved = True
             print("\n✅ SUCCESS! Your articles with full content are ready.")
         else:
             print("\n⚠ No articles extracted")
@@ -432,9 +472,11 @@ def main():
         import traceback
         traceback.print_exc()
     finally:
-        input("\nPress Enter to close browser...")
+        if interactive:
+            input("\nPress Enter to close browser...")
         driver.quit()
         print("✓ Browser closed")
+    return saved
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
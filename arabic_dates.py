@@ -0,0 +1,173 @@
+"""
+Publish-date parsing for Arabic and English news pages.
+
+Al Borsa shows dates as "16 أكتوبر 2025" (Egyptian month names), other
+Arabic sites use the Levantine names (تشرين الأول) or Arabic-Indic
+digits, and Mubasher gives either an ISO datetime attribute or
+"16 October 2025 02:32 PM". parse_arabic_date() turns all of these into
+a timezone-aware datetime (Cairo time unless the text carries an
+offset), and to_iso() into the ISO string stored as published_at.
+
+Article pages repeat a handful of date strings, so results are cached.
+"""
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+
+from arabic_text import normalize
+
+try:
+    from zoneinfo import ZoneInfo
+    CAIRO = ZoneInfo('Africa/Cairo')
+except (ImportError, KeyError):
+    # No tz database (Windows without tzdata): Egypt standard time, no DST
+    CAIRO = timezone(timedelta(hours=2))
+
+MONTH_NAMES = {
+    # Egyptian / Gulf
+    'يناير': 1, 'فبراير': 2, 'مارس': 3, 'أبريل': 4, 'إبريل': 4, 'مايو': 5, 'يونيو': 6,
+    'يونيه': 6, 'يوليو': 7, 'يوليه': 7, 'أغسطس': 8, 'سبتمبر': 9, 'أكتوبر': 10,
+    'نوفمبر': 11, 'ديسمبر': 12,
+    # Levantine / Iraqi
+    'كانون الثاني': 1, 'شباط': 2, 'آذار': 3, 'نيسان': 4, 'أيار': 5, 'حزيران': 6,
+    'تموز': 7, 'آب': 8, 'أيلول': 9, 'تشرين الأول': 10, 'تشرين الثاني': 11, 'كانون الأول': 12,
+    # Maghreb
+    'جانفي': 1, 'فيفري': 2, 'أفريل': 4, 'ماي': 5, 'جوان': 6, 'جويلية': 7, 'أوت': 8,
+    # English, full and abbreviated
+    'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6, 'july': 7,
+    'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12,
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'jun': 6, 'jul': 7, 'aug': 8, 'sep': 9,
+    'sept': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+# Keys as they look after arabic_text.normalize() (أ/إ/آ folded, etc.)
+MONTHS = {normalize(name): number for name, number in MONTH_NAMES.items()}
+MONTH = '|'.join(sorted(map(re.escape, MONTHS), key=len, reverse=True))
+
+SEPARATOR = r'[\s,،\-/]+'
+DAY_MONTH_YEAR = re.compile(rf'(?<!\d)(\d{{1,2}}){SEPARATOR}({MONTH})\.?{SEPARATOR}(\d{{4}})')
+MONTH_DAY_YEAR = re.compile(rf'(?<!\w)({MONTH})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?{SEPARATOR}(\d{{4}})')
+NUMERIC_DATE = re.compile(r'(?<!\d)(\d{1,2})[/.\-](\d{1,2})[/.\-](\d{4})(?!\d)')
+ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?(?:Z|[+-]\d{2}:?\d{2})?', re.I)
+# Al Borsa article URLs carry their publish date: /2025/10/12/<id>/
+URL_DATE = re.compile(r'/(\d{4})/(\d{1,2})/(\d{1,2})/')
+# RSS pubDate: "Thu, 16 Oct 2025 12:00:00 GMT" (its zone is in the text)
+RFC_822 = re.compile(r'[a-z]{3},\s+\d{1,2}\s+[a-z]{3}\s+\d{4}\s+\d')
+# 02:32 PM / 10:30 ص / 8:15 مساء (ص and م are the Arabic a.m./p.m.)
+TIME = re.compile(r'(?<!\d)(\d{1,2}):(\d{2})(?::(\d{2}))?\s*(am|pm|a\.m\.|p\.m\.|صباحا|ص|مساء|م)?(?!\w)', re.I)
+PM_MARKERS = ('pm', 'p.m.', 'مساء', 'م')
+
+
+def _time_of_day(text):
+    """Time written in text, or None"""
+    match = TIME.search(text)
+    if not match:
+        return None
+    hour, minute, second = int(match.group(1)), int(match.group(2)), int(match.group(3) or 0)
+    marker = (match.group(4) or '').lower()
+    if marker in PM_MARKERS and hour < 12:
+        hour += 12
+    elif marker and marker not in PM_MARKERS and hour == 12:
+        hour = 0
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+    return time(hour, minute, second)
+
+
+@lru_cache(maxsize=4096)
+def parse_arabic_date(text, tz=CAIRO):
+    """Aware datetime for a date string (naive ones are taken as tz), or None"""
+    if not text:
+        return None
+    value = normalize(str(text)).strip().lower()
+
+    iso = ISO_DATE.search(value)
+    if iso:
+        try:
+            parsed = datetime.fromisoformat(iso.group(0).upper().replace('Z', '+00:00'))
+        except ValueError:
+            parsed = None
+        if parsed is not None:
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=tz)
+
+    if RFC_822.match(value):
+        try:
+            parsed = parsedate_to_datetime(str(text))
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=tz)
+        except (TypeError, ValueError):
+            pass
+
+    match = DAY_MONTH_YEAR.search(value)
+    if match:
+        day, month, year = int(match.group(1)), MONTHS[match.group(2)], int(match.group(3))
+    else:
+        match = MONTH_DAY_YEAR.search(value)
+        if match:
+            month, day, year = MONTHS[match.group(1)], int(match.group(2)), int(match.group(3))
+        else:
+            match = NUMERIC_DATE.search(value)
+            if not match:
+                return None
+            # Day first, as written in Egypt
+            day, month, year = int(match.group(1)), int(match.group(2)), int(match.group(3))
+
+    try:
+        day_date = date(year, month, day)
+    except ValueError:
+        return None
+    # The time usually follows the date ("16 October 2025 02:32 PM") but may precede it
+    time_of_day = _time_of_day(value[match.end():]) or _time_of_day(value[:match.start()]) or time()
+    return datetime.combine(day_date, time_of_day, tzinfo=tz)
+
+
+def to_iso(text, tz=CAIRO):
+    """ISO 8601 timestamp with offset for a date string, or '' if it can't be parsed"""
+    parsed = parse_arabic_date(text, tz)
+    return parsed.isoformat() if parsed else ''
+
+
+def as_datetime(value, end_of_day=False, tz=CAIRO):
+    """Aware datetime for a since/until bound given as a datetime, date or date string
+
+    A bare date means its first moment, or its last with end_of_day (for until).
+    """
+    if value is None or isinstance(value, datetime):
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=tz)
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time.max if end_of_day else time(), tzinfo=tz)
+    parsed = parse_arabic_date(value, tz)
+    if parsed is None:
+        raise ValueError(f"Unrecognized date: {value!r}")
+    if end_of_day and not TIME.search(normalize(str(value))):
+        return datetime.combine(parsed.date(), time.max, tzinfo=parsed.tzinfo)
+    return parsed
+
+
+def url_date(url):
+    """Publish date from an article URL's /YYYY/MM/DD/ segment, or None"""
+    match = URL_DATE.search(url or '')
+    if match:
+        try:
+            return date(*map(int, match.groups()))
+        except ValueError:
+            pass
+    return None
+
+
+def within(moment, since=None, until=None):
+    """Whether a datetime or date falls between since and until (aware datetimes or None)
+
+    Unknown (None) moments count as inside. Dates are compared with the
+    bounds' calendar days in Cairo.
+    """
+    if moment is None:
+        return True
+    if isinstance(moment, datetime):
+        moment = as_datetime(moment)
+        return (since is None or moment >= since) and (until is None or moment <= until)
+    return (
+        (since is None or moment >= since.astimezone(CAIRO).date())
+        and (until is None or moment <= until.astimezone(CAIRO).date())
+    )
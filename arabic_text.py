@@ -0,0 +1,152 @@
+"""
+Shared Arabic text normalization, tokenization and sentence splitting.
+
+Dedup, search, word counts and the extractive summaries all need the same
+view of the text: diacritics (tashkeel) and tatweel removed, alef, yaa and
+taa marbuta variants folded to one letter, Arabic-Indic digits as ASCII,
+and words/sentences cut on Arabic as well as Latin punctuation.
+
+Normalization is one precompiled regex for the marks plus str.replace()
+for the folded characters that actually occur (about five times faster
+than str.translate() with a table on Arabic text). Results are cached by
+a hash of the text, and the *_batch() functions look up a whole list of
+documents at once, so the same article normalized for dedup and again
+for the search index is only processed once.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+# Tashkeel (harakat, tanween, shadda, sukun, superscript alef, Quranic marks) and tatweel
+ARABIC_MARKS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]+')
+LETTER_FOLD = {
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي', 'ؤ': 'و', 'ة': 'ه',
+}
+# Arabic-Indic (٠-٩) and Eastern Arabic-Indic (۰-۹) digits
+DIGIT_FOLD = {chr(base + i): str(i) for base in (0x0660, 0x06F0) for i in range(10)}
+
+FOLD_PAIRS = tuple(LETTER_FOLD.items()) + tuple(DIGIT_FOLD.items())
+
+WORD = re.compile(r'\w+')
+# Sentence ends: Latin . ! ?, Arabic question mark ؟, Urdu full stop ۔ and the Arabic
+# comma ، (Arabic news prose chains clauses with it where English would use a period).
+# A mark only ends a sentence when whitespace follows, so 1.5 and 3.2% stay whole.
+SENTENCE_END = re.compile(r'(?<=[.!?؟۔،])\s+|\n\s*\n')
+
+
+class TextCache:
+    """Bounded LRU cache keyed by (kind, content hash) instead of the text itself"""
+
+    def __init__(self, maxsize=2048):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(kind, text):
+        return kind, hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+
+cache = TextCache()
+
+# Texts shorter than this are normalized directly; hashing them costs about as much
+MIN_CACHED_LENGTH = 256
+
+
+def _normalize(text):
+    text = ARABIC_MARKS.sub('', text)
+    for variant, folded in FOLD_PAIRS:
+        if variant in text:
+            text = text.replace(variant, folded)
+    return text
+
+
+def _words(normalized):
+    return tuple(WORD.findall(normalized.lower()))
+
+
+def _cached(kind, text, func):
+    if len(text) < MIN_CACHED_LENGTH:
+        return func(text)
+    key = cache.key(kind, text)
+    value = cache.get(key)
+    if value is None:
+        value = func(text)
+        cache.put(key, value)
+    return value
+
+
+def normalize(text):
+    """Strip Arabic diacritics/tatweel and fold alef, yaa, taa marbuta and digit variants"""
+    return _cached('normalize', text or '', _normalize)
+
+
+def tokenize(text):
+    """Lower-cased normalized words (tuple)"""
+    return _cached('tokens', text or '', lambda t: _words(_normalize(t)))
+
+
+def word_count(text):
+    """Number of words, ignoring stray punctuation between spaces"""
+    return len(tokenize(text))
+
+
+def split_sentences(text):
+    """Sentences of a text (not normalized), with their closing punctuation"""
+    return _cached('sentences', text or '', lambda t: tuple(
+        sentence.strip() for sentence in SENTENCE_END.split(t) if sentence.strip()
+    ))
+
+
+def _batch(kind, texts, finish):
+    """Cached results for a list of texts; finish() turns a normalized text into the result"""
+    texts = [text or '' for text in texts]
+    results = [None] * len(texts)
+    missing, keys = [], []
+    for i, text in enumerate(texts):
+        key = cache.key(kind, text) if len(text) >= MIN_CACHED_LENGTH else None
+        if key is not None:
+            results[i] = cache.get(key)
+        if results[i] is None:
+            missing.append(i)
+            keys.append(key)
+    for i, key in zip(missing, keys):
+        results[i] = finish(_normalize(texts[i]))
+        if key is not None:
+            cache.put(key, results[i])
+    return results
+
+
+def normalize_batch(texts):
+    """normalize() over a list of texts"""
+    return _batch('normalize', texts, lambda text: text)
+
+
+def tokenize_batch(texts):
+    """tokenize() over a list of texts"""
+    return _batch('tokens', texts, _words)
@@ -0,0 +1,249 @@
+"""
+Compact article record shared by the scrapers and the summarizer.
+
+Article keeps the common fields in __slots__ (no per-article dict) and
+site-specific extras (word_count, section, summary, ...) in a small dict
+that only exists when needed. It still reads and writes like the dicts
+the scripts used to pass around (article['title'], article.get(...),
+article['summary'] = ...) and serializes to the same JSON shape.
+
+enrich() returns a new Article that shares every field with the
+original, so adding summaries or sentiment scores to 100k articles does
+not copy them. With a ContentStore the content text lives on disk and is
+read back only when article.content is used.
+"""
+import json
+import os
+import tempfile
+import threading
+
+FIELDS = ('url', 'title', 'author', 'date', 'category', 'content', 'scraped_at')
+
+# One shared key-order tuple per JSON shape instead of one per article
+_KEY_ORDERS = {}
+
+
+class Article:
+    __slots__ = ('url', 'title', 'author', 'date', 'category', 'scraped_at', 'extra', '_content', '_loader', '_keys')
+
+    def __init__(self, url='', title='', author='', date='', category='', content='', scraped_at='', **extra):
+        self.url = url
+        self.title = title
+        self.author = author
+        self.date = date
+        self.category = category
+        self._content = content
+        self._loader = None
+        self.scraped_at = scraped_at
+        self.extra = extra or None
+        self._keys = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Article from a scraped-article dict, remembering its key order for to_dict()"""
+        article = cls(**data)
+        keys = tuple(data)
+        article._keys = _KEY_ORDERS.setdefault(keys, keys)
+        return article
+
+    @property
+    def content(self):
+        if self._loader is not None:
+            return self._loader()
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        self._content = value
+        self._loader = None
+
+    def spill(self, store):
+        """Move the content text into a ContentStore; it is read back on access"""
+        if self._loader is None and self._content:
+            self._loader = store.put(self._content)
+            self._content = None
+
+    def enrich(self, **fields):
+        """Copy-on-write: a new Article sharing this one's fields, plus/overriding fields"""
+        clone = Article.__new__(Article)
+        for slot in Article.__slots__:
+            setattr(clone, slot, getattr(self, slot))
+        clone.extra = dict(self.extra or {}, **fields) if fields else self.extra and dict(self.extra)
+        for key in fields:
+            if key in FIELDS:
+                clone[key] = clone.extra.pop(key)
+        return clone
+
+    # Mapping-style access, so code written for article dicts keeps working
+
+    def keys(self):
+        present = FIELDS + tuple(self.extra or ())
+        if self._keys is None:
+            return list(present)
+        ordered = [key for key in self._keys if key in present]
+        return ordered + [key for key in present if key not in self._keys]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __contains__(self, key):
+        return key in FIELDS or bool(self.extra) and key in self.extra
+
+    def __getitem__(self, key):
+        if key in FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *default):
+        if key in FIELDS:
+            raise KeyError(f"{key} is a fixed Article field")
+        if self.extra and key in self.extra:
+            return self.extra.pop(key)
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __getstate__(self):
+        # Picklable (process pools) even when the content lives in a ContentStore
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        restored = Article.from_dict(state)
+        for slot in Article.__slots__:
+            setattr(self, slot, getattr(restored, slot))
+
+    def __repr__(self):
+        return f"Article(url={self.url!r}, title={self.title[:40]!r})"
+
+
+def as_article(article):
+    """Article for an Article or a plain article dict"""
+    return article if isinstance(article, Article) else Article.from_dict(article)
+
+
+def as_dict(article):
+    """JSON-ready dict for an Article or an article that is already a dict"""
+    return article.to_dict() if isinstance(article, Article) else article
+
+
+class ContentStore:
+    """Append-only file of article texts; put() returns a loader for one text"""
+
+    def __init__(self, path=None):
+        """path=None uses a temporary file that is deleted by close()"""
+        self.temporary = path is None
+        if path is None:
+            handle, path = tempfile.mkstemp(prefix='articles-', suffix='.txt')
+            os.close(handle)
+        self.path = path
+        self.file = open(path, 'a+b')
+        self.lock = threading.Lock()
+
+    def put(self, text):
+        data = text.encode('utf-8')
+        length = len(data)
+        with self.lock:
+            self.file.seek(0, os.SEEK_END)
+            offset = self.file.tell()
+            self.file.write(data)
+        return lambda: self.read(offset, length)
+
+    def read(self, offset, length):
+        with self.lock:
+            self.file.flush()
+            self.file.seek(offset)
+            return self.file.read(length).decode('utf-8')
+
+    def close(self):
+        self.file.close()
+        if self.temporary:
+            os.remove(self.path)
+
+
+def dump_articles(articles, fp, indent=2):
+    """json.dump(articles, fp) one article at a time, without building all the dicts first"""
+    if not articles:
+        fp.write('[]')
+        return
+    pad = ' ' * indent
+    fp.write('[\n')
+    for i, article in enumerate(articles):
+        if i:
+            fp.write(',\n')
+        text = json.dumps(as_dict(article), ensure_ascii=False, indent=indent)
+        fp.write(pad + text.replace('\n', '\n' + pad))
+    fp.write('\n]')
+
+
+def iter_json_array(fp, chunk_size=1 << 16):
+    """Yield the items of a top-level JSON array from a text file, one at a time"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    while True:
+        chunk = fp.read(chunk_size)
+        buffer += chunk
+        position = 0
+        while True:
+            # Skip whitespace and separators between items
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position >= len(buffer):
+                break
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError("Expected a JSON array")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break  # Item continues in the next chunk
+            yield item
+            position = end
+        buffer = buffer[position:]
+        if not chunk:
+            if buffer.strip():
+                raise ValueError("Truncated JSON array")
+            return
+
+
+def load_articles(path, content_store=None):
+    """Read a scraped-articles JSON file into Articles, streaming item by item
+
+    With a content_store, each article's text goes to disk as it is read,
+    so memory holds only the metadata.
+    """
+    articles = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for data in iter_json_array(f):
+            article = Article.from_dict(data)
+            if content_store is not None:
+                article.spill(content_store)
+            articles.append(article)
+    return articles
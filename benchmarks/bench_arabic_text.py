@@ -0,0 +1,80 @@
+"""
+Arabic normalization/tokenization throughput (MB/s of UTF-8 text) on the fixture article.
+
+Run from the repo root:  python benchmarks/bench_arabic_text.py [documents]
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import arabic_text  # noqa: E402
+from field_extraction import ALBORSA_ARTICLE  # noqa: E402
+from html_parser import make_soup  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# The regex + translate pair near_duplicates used before arabic_text
+OLD_MARKS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+OLD_FOLD = str.maketrans(arabic_text.LETTER_FOLD)
+
+
+def old_tokenize(text):
+    return re.findall(r'\w+', OLD_MARKS.sub('', text).translate(OLD_FOLD).lower())
+
+
+def load_documents(count):
+    """count distinct article texts built from the fixture article's paragraphs"""
+    with open(os.path.join(FIXTURES, 'alborsa_article.html'), 'r', encoding='utf-8') as f:
+        content = ALBORSA_ARTICLE.extract(make_soup(f.read()))['content']
+    paragraphs = [p.get_text(strip=True) for p in content.find_all('p')]
+    paragraphs = [p for p in paragraphs if p] or [content.get_text(' ', strip=True)]
+    documents = []
+    for i in range(count):
+        rotated = paragraphs[i % len(paragraphs):] + paragraphs[:i % len(paragraphs)]
+        documents.append(f"{i} " + '\n\n'.join(rotated * 4))
+    return documents
+
+
+def megabytes_per_second(func, documents, size):
+    start = time.perf_counter()
+    func(documents)
+    return size / (time.perf_counter() - start) / 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    documents = load_documents(count)
+    size = sum(len(document.encode('utf-8')) for document in documents)
+    arabic_text.cache.maxsize = count * 2
+
+    def cold(func):
+        def run(docs):
+            arabic_text.cache.clear()
+            func(docs)
+        return run
+
+    cases = [
+        ("str.split() (no normalization)", lambda docs: [doc.split() for doc in docs]),
+        ("regex sub + translate (old)", lambda docs: [old_tokenize(doc) for doc in docs]),
+        ("normalize() per document", cold(lambda docs: [arabic_text.normalize(doc) for doc in docs])),
+        ("normalize_batch()", cold(arabic_text.normalize_batch)),
+        ("normalize_batch() cached", arabic_text.normalize_batch),
+        ("tokenize() per document", cold(lambda docs: [arabic_text.tokenize(doc) for doc in docs])),
+        ("tokenize_batch()", cold(arabic_text.tokenize_batch)),
+        ("tokenize_batch() cached", arabic_text.tokenize_batch),
+        ("split_sentences() per document", cold(lambda docs: [arabic_text.split_sentences(doc) for doc in docs])),
+    ]
+
+    print("="*60)
+    print(f"ARABIC TEXT BENCHMARK ({count} documents, {size / 1e6:.1f} MB)")
+    print("="*60)
+    for label, func in cases:
+        rate = megabytes_per_second(func, documents, size)
+        print(f"{label:<42} {rate:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Parser backend and field extraction benchmark on the saved fixture pages.
+
+Run from the repo root:  python benchmarks/bench_parsers.py [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from field_extraction import ALBORSA_ARTICLE, MUBASHER_ARTICLE  # noqa: E402
+from html_parser import HEADLINES, LexborHTMLParser, SOUP_BACKENDS, headline_links, make_soup  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def pages_per_second(func, markup, iterations):
+    func(markup)  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(markup)
+    return iterations / (time.perf_counter() - start)
+
+
+def alborsa_find_cascade(soup):
+    """The per-field find() lookups parse_article_content used before the compiled extractor"""
+    soup.find('h1', class_='jeg_post_title') or soup.find('h1')
+    soup.find('div', class_='jeg_meta_author') or soup.find('a', rel='author')
+    soup.find('div', class_='jeg_meta_date') or soup.find('time')
+    category = soup.find('a', rel='category tag') or soup.find('div', class_='jeg_meta_category')
+    if not category:
+        for link in soup.find_all('a', href=True):
+            if '/category/' in link.get('href', ''):
+                break
+    soup.find('div', class_='content-inner') or soup.find('div', class_='entry-content') or soup.find('article')
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    listing = load_fixture('alborsa_listing.html')
+    article = load_fixture('alborsa_article.html')
+
+    cases = []
+    for backend in SOUP_BACKENDS:
+        cases.append((f"listing  {backend:<12} full tree", lambda m, b=backend: make_soup(m, backend=b), listing))
+        cases.append((f"listing  {backend:<12} h2/h3 only", lambda m, b=backend: make_soup(m, HEADLINES, b), listing))
+    if LexborHTMLParser:
+        cases.append((f"listing  {'selectolax':<12} headline links", lambda m: headline_links(m, 'selectolax'), listing))
+    for backend in SOUP_BACKENDS:
+        cases.append((f"article  {backend:<12} full tree", lambda m, b=backend: make_soup(m, backend=b), article))
+        cases.append((f"article  {backend:<12} article parts", lambda m, b=backend: make_soup(m, ALBORSA_ARTICLE.parse_only, b), article))
+    if LexborHTMLParser:
+        cases.append((f"article  {'selectolax':<12} full tree", LexborHTMLParser, article))
+
+    print("="*60)
+    print(f"PARSER BENCHMARK ({iterations} iterations per case)")
+    print("="*60)
+    for label, func, markup in cases:
+        rate = pages_per_second(func, markup, iterations)
+        print(f"{label:<42} {rate:8.1f} pages/sec")
+
+    # Field lookups on an already parsed full tree
+    alborsa_soup = make_soup(article)
+    mubasher_soup = make_soup(load_fixture('mubasher_article.html'))
+    extraction_cases = [
+        ("alborsa   find() cascade", alborsa_find_cascade, alborsa_soup),
+        ("alborsa   compiled single pass", ALBORSA_ARTICLE.extract, alborsa_soup),
+        ("mubasher  compiled single pass", MUBASHER_ARTICLE.extract, mubasher_soup),
+    ]
+
+    print("\n" + "="*60)
+    print("FIELD EXTRACTION (full tree, parse time excluded)")
+    print("="*60)
+    for label, func, soup in extraction_cases:
+        rate = pages_per_second(func, soup, iterations)
+        print(f"{label:<42} {rate:8.1f} pages/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Local stand-in for the OpenAI chat completions and Batch API endpoints, for offline benchmarks.
+
+POST /v1/chat/completions answers with a canned JSON summary in the shape
+ArticleSummarizer asks for ({"summary", "key_points"}), plus a usage block
+with token counts estimated from the prompt, after a configurable latency.
+A fraction of requests can be refused with 429 and Retry-After, like a
+rate-limited account. With --rpm/--tpm it also enforces per-minute
+limits the way the API does (a request costs its prompt plus max_tokens)
+and reports them in x-ratelimit-* headers on every response.
+
+The Batch API is there too: POST /v1/files takes the JSONL upload,
+POST /v1/batches runs it on a background thread for --batch-seconds
+(requests picked by --error-rate land in the error file instead), and
+GET /v1/batches/<id> and /v1/files/<id>/content report the outcome.
+
+Point the summarizer at it with base_url (or OPENAI_BASE_URL):
+    python benchmarks/mock_openai.py --port 8801 --latency 0.3
+    OPENAI_BASE_URL=http://127.0.0.1:8801/v1 OPENAI_API_KEY=mock python AlBorsaArticleSummarizer.py
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TITLE = re.compile(r'العنوان:\s*(.+)')
+FILE_PATH = re.compile(r'^/v1/files/([^/]+)(/content)?$')
+BATCH_PATH = re.compile(r'^/v1/batches/([^/]+)$')
+
+
+def estimate_tokens(text):
+    """Rough token count: about 4 characters per token"""
+    return max(1, len(text) // 4)
+
+
+def canned_summary(messages):
+    """The assistant reply for a summarization prompt"""
+    prompt = messages[-1].get('content', '') if messages else ''
+    match = TITLE.search(prompt)
+    title = match.group(1).strip() if match else 'المقال'
+    return json.dumps({
+        'summary': f"ملخص تجريبي للمقال: {title}. يتناول المقال أبرز التطورات في السوق المصرية.",
+        'key_points': [f"نقطة رئيسية {i} حول {title[:40]}" for i in range(1, 4)],
+    }, ensure_ascii=False)
+
+
+def chat_completion(request, completion_id):
+    """Chat completion response body for a request body"""
+    messages = request.get('messages') or []
+    content = canned_summary(messages)
+    prompt_tokens = sum(estimate_tokens(message.get('content', '')) for message in messages)
+    completion_tokens = estimate_tokens(content)
+    return {
+        'id': completion_id,
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': request.get('model', 'mock'),
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': content},
+            'finish_reason': 'stop',
+        }],
+        'usage': {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def parse_upload(content_type, body):
+    """(fields, (filename, data)) from a multipart/form-data body"""
+    message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode('latin-1') + body)
+    fields, upload = {}, None
+    for part in message.iter_parts():
+        name = part.get_param('name', header='content-disposition')
+        filename = part.get_filename()
+        if filename is not None:
+            upload = (filename, part.get_payload(decode=True))
+        else:
+            fields[name] = part.get_content().strip()
+    return fields, upload
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, status, payload, headers=()):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_bytes(status, data, 'application/json', headers)
+
+    def send_bytes(self, status, data, content_type, headers=()):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def not_found(self):
+        self.send_json(404, {'error': {'message': f"Unknown path {self.path}", 'type': 'invalid_request_error'}})
+
+    def read_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b';')[0], 16)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+                if not size:
+                    return b''.join(chunks)
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length)
+
+    def read_json(self):
+        return json.loads(self.read_body() or b'{}')
+
+    def do_GET(self):
+        server = self.server
+        path = self.path.split('?')[0].rstrip('/')
+        match = FILE_PATH.match(path)
+        if match and match.group(1) in server.files:
+            entry = server.files[match.group(1)]
+            if match.group(2):
+                self.send_bytes(200, entry['data'], 'application/octet-stream')
+            else:
+                self.send_json(200, entry['object'])
+            return
+        match = BATCH_PATH.match(path)
+        if match and match.group(1) in server.batches:
+            with server.stats_lock:
+                batch = dict(server.batches[match.group(1)])
+            self.send_json(200, batch)
+            return
+        self.not_found()
+
+    def do_POST(self):
+        path = self.path.split('?')[0].rstrip('/')
+        if path == '/v1/chat/completions':
+            self.chat_completions()
+        elif path == '/v1/files':
+            fields, upload = parse_upload(self.headers.get('Content-Type', ''), self.read_body())
+            if upload is None:
+                self.send_json(400, {'error': {'message': 'No file uploaded', 'type': 'invalid_request_error'}})
+                return
+            self.send_json(200, self.server.add_file(upload[0], upload[1], fields.get('purpose', 'batch')))
+        elif path == '/v1/batches':
+            request = self.read_json()
+            if request.get('input_file_id') not in self.server.files:
+                self.send_json(404, {'error': {'message': 'No such file', 'type': 'invalid_request_error'}})
+                return
+            self.send_json(200, self.server.create_batch(request))
+        else:
+            self.not_found()
+
+    def chat_completions(self):
+        server = self.server
+        request = self.read_json()
+        server.count('requests')
+        messages = request.get('messages') or []
+        prompt_tokens = sum(estimate_tokens(message.get('content', '')) for message in messages)
+        allowed, limit_headers = server.spend(prompt_tokens + (request.get('max_tokens') or 0))
+
+        if not allowed or (server.error_rate and server.random.random() < server.error_rate):
+            server.count('rate_limited')
+            self.send_json(429, {'error': {'message': 'Rate limit reached (mock)', 'type': 'requests', 'code': 'rate_limit_exceeded'}},
+                           [('Retry-After', str(server.retry_after))] + limit_headers)
+            return
+
+        delay = server.latency + (server.random.uniform(0, server.jitter) if server.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        self.send_json(200, chat_completion(request, f"chatcmpl-mock-{server.stats['requests']}"), limit_headers)
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # The default backlog of 5 drops concurrent connects (1s SYN retries)
+
+    def __init__(self, port=0, latency=0.0, jitter=0.0, error_rate=0.0, retry_after=0, seed=None, rpm=None, tpm=None,
+                 batch_seconds=2.0):
+        """port=0 picks a free port; base_url is what to pass to the OpenAI client
+
+        rpm/tpm: per-minute limits to enforce (None: unlimited, no rate-limit headers)
+        batch_seconds: how long a batch stays in progress
+        """
+        super().__init__(('127.0.0.1', port), MockOpenAIHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}/v1"
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window_start = time.monotonic()
+        self.window_requests = 0
+        self.window_tokens = 0
+        self.batch_seconds = batch_seconds
+        self.files = {}
+        self.batches = {}
+        self.stats = {'requests': 0, 'rate_limited': 0, 'batches': 0, 'batch_requests': 0}
+        self.stats_lock = threading.Lock()
+
+    def add_file(self, filename, data, purpose):
+        """Store an upload (or a batch output); returns its file object"""
+        file_id = f"file-mock-{uuid.uuid4().hex[:12]}"
+        entry = {
+            'id': file_id, 'object': 'file', 'bytes': len(data), 'created_at': int(time.time()),
+            'filename': filename, 'purpose': purpose, 'status': 'processed',
+        }
+        self.files[file_id] = {'object': entry, 'data': data}
+        return entry
+
+    def create_batch(self, request):
+        """Queue a batch of the uploaded JSONL and start processing it"""
+        batch_id = f"batch_mock_{uuid.uuid4().hex[:12]}"
+        lines = [json.loads(line) for line in self.files[request['input_file_id']]['data'].splitlines() if line.strip()]
+        batch = {
+            'id': batch_id, 'object': 'batch', 'endpoint': request.get('endpoint', '/v1/chat/completions'),
+            'errors': None, 'input_file_id': request['input_file_id'],
+            'completion_window': request.get('completion_window', '24h'), 'status': 'validating',
+            'output_file_id': None, 'error_file_id': None, 'created_at': int(time.time()),
+            'in_progress_at': None, 'completed_at': None, 'expires_at': int(time.time()) + 86400,
+            'request_counts': {'total': len(lines), 'completed': 0, 'failed': 0},
+            'metadata': request.get('metadata'),
+        }
+        with self.stats_lock:
+            self.batches[batch_id] = batch
+            self.stats['batches'] += 1
+        threading.Thread(target=self.run_batch, args=(batch_id, lines), daemon=True).start()
+        return dict(batch)
+
+    def run_batch(self, batch_id, lines):
+        """Answer every line after batch_seconds, splitting the results into an output and an error file"""
+        with self.stats_lock:
+            self.batches[batch_id].update(status='in_progress', in_progress_at=int(time.time()))
+        time.sleep(self.batch_seconds)
+        output, errors = [], []
+        for i, line in enumerate(lines):
+            request_id = f"req_mock_{batch_id[-12:]}_{i}"
+            if self.error_rate and self.random.random() < self.error_rate:
+                errors.append({'id': f"batch_req_{i}", 'custom_id': line.get('custom_id'), 'response': None,
+                               'error': {'code': 'rate_limit_exceeded', 'message': 'Rate limit reached (mock)'}})
+                continue
+            body = chat_completion(line.get('body') or {}, f"chatcmpl-mock-{request_id}")
+            output.append({'id': f"batch_req_{i}", 'custom_id': line.get('custom_id'), 'error': None,
+                           'response': {'status_code': 200, 'request_id': request_id, 'body': body}})
+        encode = lambda rows: ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode('utf-8')
+        output_file = self.add_file(f"{batch_id}_output.jsonl", encode(output), 'batch_output') if output else None
+        error_file = self.add_file(f"{batch_id}_error.jsonl", encode(errors), 'batch_output') if errors else None
+        with self.stats_lock:
+            self.stats['batch_requests'] += len(lines)
+            self.batches[batch_id].update(
+                status='completed', completed_at=int(time.time()),
+                output_file_id=output_file and output_file['id'], error_file_id=error_file and error_file['id'],
+                request_counts={'total': len(lines), 'completed': len(output), 'failed': len(errors)},
+            )
+
+    def spend(self, tokens):
+        """Charge one request of tokens to the current minute: (allowed, x-ratelimit-* headers)"""
+        if self.rpm is None and self.tpm is None:
+            return True, []
+        rpm, tpm = self.rpm or 10 ** 9, self.tpm or 10 ** 12
+        with self.stats_lock:
+            now = time.monotonic()
+            if now - self.window_start >= 60:
+                self.window_start, self.window_requests, self.window_tokens = now, 0, 0
+            allowed = self.window_requests < rpm and self.window_tokens + tokens <= tpm
+            if allowed:
+                self.window_requests += 1
+                self.window_tokens += tokens
+            reset = f"{max(0.0, 60 - (now - self.window_start)):.3f}s"
+            headers = [
+                ('x-ratelimit-limit-requests', str(rpm)),
+                ('x-ratelimit-remaining-requests', str(rpm - self.window_requests)),
+                ('x-ratelimit-reset-requests', reset),
+                ('x-ratelimit-limit-tokens', str(tpm)),
+                ('x-ratelimit-remaining-tokens', str(max(0, tpm - self.window_tokens))),
+                ('x-ratelimit-reset-tokens', reset),
+            ]
+        return allowed, headers
+
+    def count(self, name):
+        with self.stats_lock:
+            self.stats[name] += 1
+
+    def start(self):
+        """Serve on a daemon thread and return self"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8801)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds per completion')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Up to this many more seconds, at random')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests refused with 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with a 429')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--rpm', type=int, help='Requests per minute to allow')
+    parser.add_argument('--tpm', type=int, help='Tokens (prompt + max_tokens) per minute to allow')
+    parser.add_argument('--batch-seconds', type=float, default=2.0, help='Seconds a batch stays in progress')
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(args.port, args.latency, args.jitter, args.error_rate, args.retry_after, args.seed,
+                              rpm=args.rpm, tpm=args.tpm, batch_seconds=args.batch_seconds)
+    print(f"🤖 Mock OpenAI API on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n📊 {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Local replay of the Al Borsa and Mubasher sites for offline benchmarks.
+
+Pages come from a recorded corpus (a directory with manifest.json, made
+by the record command) or are built from the saved fixture pages: every listing page /category/<name>/page/N gets its own article
+links, and any /YYYY/MM/DD/<id>/ or /news/<id>/ path serves the fixture
+article. Links to the live sites are rewritten to point back here.
+
+Latency, jitter and error injection (503 with Retry-After by default)
+are configurable, so the same run can be repeated against a slow or
+flaky "site" without touching the real one.
+
+Run from the repo root:
+    python benchmarks/replay_server.py serve [--port 8800] [--latency 0.05] [--error-rate 0.02]
+    python benchmarks/replay_server.py record benchmarks/corpus --pages 3
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urljoin, urlparse
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Origins whose absolute links are rewritten to the replay server
+ORIGINS = ('https://www.alborsaanews.com', 'https://english.mubasher.info')
+ALBORSA_CATEGORY = '/category/%d8%a7%d9%84%d8%a8%d9%88%d8%b1%d8%b5%d8%a9-%d9%88%d8%a7%d9%84%d8%b4%d8%b1%d9%83%d8%a7%d8%aa'
+
+LISTING_PATH = re.compile(r'^/category/[^/]+(?:/page/(\d+))?/?$')
+ARTICLE_PATH = re.compile(r'^/\d{4}/\d{1,2}/\d{1,2}/[^/]+/?$')
+ARTICLE_ID = re.compile(r'(/\d{4}/\d{2}/\d{2}/)(\d+)/')
+MUBASHER_PATH = re.compile(r'^/news/\d+/')
+# Synthetic routes: path pattern -> fixture file
+ROUTES = (
+    (re.compile(r'/feed/?$'), 'alborsa_feed.xml', 'application/rss+xml; charset=utf-8'),
+    (re.compile(r'^/sitemap_index\.xml$'), 'alborsa_sitemap_index.xml', 'application/xml; charset=utf-8'),
+    (re.compile(r'^/post-sitemap\d*\.xml$'), 'alborsa_post_sitemap.xml', 'application/xml; charset=utf-8'),
+    (ARTICLE_PATH, 'alborsa_article.html', 'text/html; charset=utf-8'),
+    (MUBASHER_PATH, 'mubasher_article.html', 'text/html; charset=utf-8'),
+)
+
+
+def page_key(path):
+    """Manifest key for a request path (clients differ in percent-encoding case and trailing slashes)"""
+    return unquote(path.split('?')[0].split('#')[0]).rstrip('/') or '/'
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class Corpus:
+    """Pages by request path: a recorded directory, or synthetic pages from the fixtures"""
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.pages = {}
+        self.origins = ORIGINS
+        self.fixtures = {}
+        if directory:
+            with open(os.path.join(directory, 'manifest.json'), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            self.pages = {page_key(path): entry for path, entry in manifest['pages'].items()}
+            self.origins = tuple(dict.fromkeys(ORIGINS + (manifest['origin'],)))
+
+    def fixture(self, name):
+        if name not in self.fixtures:
+            self.fixtures[name] = load_fixture(name)
+        return self.fixtures[name]
+
+    def lookup(self, path):
+        """(body text, content type) for a request path, or None for a 404
+
+        Recorded pages win; anything the recording lacks (Mubasher pages,
+        feeds) is synthesized from the fixtures.
+        """
+        entry = self.pages.get(page_key(path))
+        if entry is not None:
+            with open(os.path.join(self.directory, entry['file']), 'r', encoding='utf-8') as f:
+                return f.read(), entry['content_type']
+
+        path = path.split('?')[0].split('#')[0]
+        listing = LISTING_PATH.match(path)
+        if listing:
+            # Same layout on every page, but article IDs unique to the page number
+            page = int(listing.group(1) or 1)
+            body = ARTICLE_ID.sub(lambda m: f"{m.group(1)}{page:04d}{m.group(2)[-3:]}/", self.fixture('alborsa_listing.html'))
+            return body, 'text/html; charset=utf-8'
+        for pattern, name, content_type in ROUTES:
+            if pattern.search(path):
+                return self.fixture(name), content_type
+        return None
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real sites
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.count('requests')
+        delay = server.latency + (server.random.uniform(0, server.jitter) if server.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        if server.error_rate and server.random.random() < server.error_rate:
+            server.count('errors')
+            self.send_response(server.error_status)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        page = server.corpus.lookup(self.path)
+        if page is None:
+            server.count('not_found')
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body, content_type = page
+        for origin in server.corpus.origins:
+            body = body.replace(origin, server.base_url)
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # The default backlog of 5 drops concurrent connects (1s SYN retries)
+
+    def __init__(self, port=0, corpus=None, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, seed=None):
+        """port=0 picks a free port; see base_url once created"""
+        super().__init__(('127.0.0.1', port), ReplayHandler)
+        self.corpus = corpus or Corpus()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.stats = {'requests': 0, 'errors': 0, 'not_found': 0}
+        self.stats_lock = threading.Lock()
+
+    def count(self, name):
+        with self.stats_lock:
+            self.stats[name] += 1
+
+    def start(self):
+        """Serve on a daemon thread and return self"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def record(directory, pages=3, articles=None, base_url=ORIGINS[0]):
+    """Save listing pages 1..pages of the default category and their articles into directory"""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from html_parser import headline_links
+    from http_client import FetchClient
+
+    client = FetchClient()
+    os.makedirs(directory, exist_ok=True)
+    saved = {}
+
+    def save(url):
+        response = client.get(url)
+        response.encoding = 'utf-8'
+        path = urlparse(url).path or '/'
+        name = f"{len(saved):05d}.html"
+        with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+            f.write(response.text)
+        saved[path] = {'file': name, 'content_type': response.headers.get('Content-Type', 'text/html; charset=utf-8')}
+        print(f"   💾 {path}")
+        return response.text
+
+    links = []
+    for page in range(1, pages + 1):
+        url = base_url + ALBORSA_CATEGORY + (f"/page/{page}" if page > 1 else '')
+        links += [urljoin(base_url, link) for link in headline_links(save(url)) if link.startswith(base_url)]
+    for link in list(dict.fromkeys(links))[:articles]:
+        if urlparse(link).path not in saved:
+            save(link)
+
+    with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump({'origin': base_url, 'pages': saved}, f, ensure_ascii=False, indent=2)
+    print(f"✅ Recorded {len(saved)} pages into {directory}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help='Replay the corpus (or the fixtures) over HTTP')
+    serve.add_argument('--port', type=int, default=8800)
+    serve.add_argument('--corpus', help='Recorded corpus directory (default: synthetic pages from the fixtures)')
+    serve.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    serve.add_argument('--jitter', type=float, default=0.0, help='Up to this many more seconds, at random')
+    serve.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with --error-status')
+    serve.add_argument('--error-status', type=int, default=503)
+    serve.add_argument('--seed', type=int)
+
+    rec = commands.add_parser('record', help='Save live listing and article pages as a corpus')
+    rec.add_argument('directory')
+    rec.add_argument('--pages', type=int, default=3)
+    rec.add_argument('--articles', type=int, help='At most this many article pages')
+
+    args = parser.parse_args()
+    if args.command == 'record':
+        record(args.directory, pages=args.pages, articles=args.articles)
+        return
+
+    server = ReplayServer(
+        args.port, Corpus(args.corpus), latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, error_status=args.error_status, seed=args.seed
+    )
+    print(f"🔁 Replaying {args.corpus or 'fixture pages'} on {server.base_url}{ALBORSA_CATEGORY}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n📊 {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
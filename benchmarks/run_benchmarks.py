@@ -0,0 +1,379 @@
+"""
+End-to-end throughput benchmarks against a local replay of the sites and a mock LLM.
+
+Starts benchmarks/replay_server.py and benchmarks/mock_openai.py on free
+ports, then runs each stage in its own process (so peak memory is per
+stage) and reports pages/sec or articles/sec, p50/p95 latency and peak
+RSS. Latencies come from the metrics histograms the code already records
+(bucket-interpolated, like Prometheus's histogram_quantile).
+
+The startup stages time fresh interpreters running news_cli.py or
+importing a subcommand's module, so a heavy import that creeps back
+into the startup path shows up as a regression.
+
+Results are saved as JSON under benchmarks/results/; pass an earlier file
+as --baseline to see the change per stage.
+
+Run from the repo root:
+    python benchmarks/run_benchmarks.py [--stages listing,extract] [--latency 0.05] [--error-rate 0.02]
+    python benchmarks/run_benchmarks.py --baseline benchmarks/results/<earlier run>.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from importlib.util import find_spec
+from urllib.parse import quote
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from metrics import EXTRACT_SECONDS, FETCH_SECONDS, LLM_SECONDS, REGISTRY, Histogram  # noqa: E402
+from mock_openai import MockOpenAIServer  # noqa: E402
+from replay_server import ALBORSA_CATEGORY, ARTICLE_PATH, Corpus, ReplayServer, load_fixture  # noqa: E402
+
+try:
+    import resource  # Not on Windows
+except ImportError:
+    resource = None
+
+RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+STAGES = ('startup', 'startup-scrape', 'startup-summarize', 'listing', 'extract', 'extract-async', 'extract-processes',
+          'scrape-pipeline', 'mubasher', 'summarize', 'summarize-async')
+# Startup stages: the module news_cli.py imports for the subcommand (None: just the CLI's --help)
+STARTUP_IMPORTS = {'startup': None, 'startup-scrape': 'AlBorsaNewsScraper', 'startup-summarize': 'AlBorsaArticleSummarizer'}
+
+
+def article_urls(args):
+    """args.articles article URLs: the recorded ones (repeated as needed), or synthetic ones"""
+    recorded = [path for path in Corpus(args.corpus).pages if ARTICLE_PATH.match(path)] if args.corpus else []
+    if recorded:
+        return [args.site + quote(recorded[i % len(recorded)]) for i in range(args.articles)]
+    return [f"{args.site}/2025/10/16/{2500000 + i}/" for i in range(args.articles)]
+
+
+def bench_client():
+    """Pooled client without cache or rate limiter, so every request reaches the replay server"""
+    from http_client import FetchClient
+    return FetchClient(retries=3, backoff=0.01)
+
+
+def new_scraper(args):
+    from AlBorsaNewsScraper import AlBorsaNewsScraper
+    return AlBorsaNewsScraper(client=bench_client(), quiet=True, base_url=args.site)
+
+
+def merged(family):
+    """One histogram holding every labelled child of a metric family"""
+    total = Histogram(family.buckets)
+    for _, child in family.samples():
+        total.counts = [a + b for a, b in zip(total.counts, child.counts)]
+        total.sum += child.sum
+        total.count += child.count
+    return total
+
+
+# Each stage returns (items done, unit, latency histogram, latency metric name)
+
+def stage_startup(args):
+    """Fresh interpreters running the CLI's --help, or importing a subcommand's module"""
+    module = STARTUP_IMPORTS[args.stage]
+    command = [sys.executable, os.path.join(REPO, 'news_cli.py'), '--help'] if module is None else \
+        [sys.executable, '-c', f"import news_cli, {module}"]
+    latency = Histogram()
+    for _ in range(args.startup_runs):
+        with latency.time():
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+    return args.startup_runs, 'starts', latency, 'interpreter start to exit: ' + (module or 'news_cli.py --help')
+
+
+def stage_listing(args):
+    scraper = new_scraper(args)
+    latency = Histogram()
+    for page in range(1, args.pages + 1):
+        with latency.time():
+            scraper.get_article_links_from_page(page)
+    return args.pages, 'pages', latency, 'listing page fetch + link extraction'
+
+
+def stage_extract(args):
+    scraper = new_scraper(args)
+    articles = [scraper.extract_article_content(url) for url in article_urls(args)]
+    return sum(1 for article in articles if article), 'articles', merged(EXTRACT_SECONDS), EXTRACT_SECONDS.name
+
+
+def stage_extract_async(args):
+    articles = new_scraper(args).extract_articles_async(
+        article_urls(args), concurrency=args.concurrency, per_host_concurrency=args.concurrency, per_host_delay=0
+    )
+    return len(articles), 'articles', merged(EXTRACT_SECONDS), EXTRACT_SECONDS.name
+
+
+def stage_extract_processes(args):
+    articles = new_scraper(args).extract_articles_parallel(
+        article_urls(args), fetch_workers=args.concurrency, processes=args.processes
+    )
+    # Fetch and parse overlap in this mode, so only fetch latency is per article
+    return len(articles), 'articles', merged(FETCH_SECONDS), FETCH_SECONDS.name
+
+
+def stage_scrape_pipeline(args):
+    articles = new_scraper(args).scrape_articles(1, args.pages, delay=0, pipeline=True, workers=args.concurrency)
+    return len(articles), 'articles', merged(EXTRACT_SECONDS), EXTRACT_SECONDS.name
+
+
+class ReplayDriver:
+    """The bit of a Selenium driver extract_full_article uses, backed by plain HTTP"""
+
+    def __init__(self, client):
+        self.client = client
+        self.page_source = ''
+
+    def get(self, url):
+        response = self.client.get(url)
+        response.encoding = 'utf-8'
+        self.page_source = response.text
+
+
+def stage_mubasher(args):
+    from Mubasher import extract_full_article
+    driver = ReplayDriver(bench_client())
+    urls = [f"{args.site}/news/{4500000 + i}/Benchmark-article-{i}/" for i in range(args.articles)]
+    articles = [extract_full_article(driver, url, render_wait=0) for url in urls]
+    return sum(1 for article in articles if article), 'articles', merged(EXTRACT_SECONDS), EXTRACT_SECONDS.name
+
+
+def write_bench_articles(args):
+    """args.articles distinct articles built from the fixture, saved for the summarizer to load"""
+    from AlBorsaNewsScraper import AlBorsaNewsScraper
+    from article import dump_articles
+
+    template = AlBorsaNewsScraper.parse_article_content(load_fixture('alborsa_article.html'), f"{args.site}/2025/10/16/1/")
+    paragraphs = template['content'].split('\n\n')
+    articles = []
+    for i in range(args.articles):
+        # Distinct paragraph order per copy, like a day of different stories
+        shift = i % len(paragraphs)
+        articles.append(template.enrich(
+            url=f"{args.site}/2025/10/16/{2600000 + i}/", title=f"{template['title']} ({i})",
+            content='\n\n'.join(paragraphs[shift:] + paragraphs[:shift])
+        ))
+    with open('bench_articles.json', 'w', encoding='utf-8') as f:
+        dump_articles(articles, f)
+
+
+def stage_summarize(args, concurrency=None):
+    from AlBorsaArticleSummarizer import ArticleSummarizer
+
+    write_bench_articles(args)
+    summarizer = ArticleSummarizer('bench_articles.json', api_key='mock', quiet=True, base_url=args.llm)
+    summarizer.load_articles()
+    # Every copy gets its own API call; dedup is not what is measured here
+    summarizer.summarize_all(delay=0, reuse_duplicates=False, concurrency=concurrency, rpm=args.llm_rpm, tpm=args.llm_tpm)
+    done = sum(1 for article in summarizer.summarized_articles if article.get('summary'))
+    return done, 'articles', merged(LLM_SECONDS), LLM_SECONDS.name
+
+
+def stage_summarize_async(args):
+    return stage_summarize(args, concurrency=args.concurrency)
+
+
+STAGE_FUNCTIONS = {
+    'startup': stage_startup,
+    'startup-scrape': stage_startup,
+    'startup-summarize': stage_startup,
+    'listing': stage_listing,
+    'extract': stage_extract,
+    'extract-async': stage_extract_async,
+    'extract-processes': stage_extract_processes,
+    'scrape-pipeline': stage_scrape_pipeline,
+    'mubasher': stage_mubasher,
+    'summarize': stage_summarize,
+    'summarize-async': stage_summarize_async,
+}
+# Optional packages a stage can't run without
+STAGE_REQUIRES = {'extract-async': 'httpx', 'mubasher': 'selenium', 'summarize': 'openai', 'summarize-async': 'openai'}
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process and its largest child, in MB (None without resource)"""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_stage(args):
+    """Child process: run one stage and write its numbers to args.result_file"""
+    REGISTRY.reset()
+    start = time.perf_counter()
+    done, unit, latency, latency_metric = STAGE_FUNCTIONS[args.stage](args)
+    seconds = time.perf_counter() - start
+    result = {
+        'items': done,
+        'unit': unit,
+        'seconds': round(seconds, 3),
+        'rate': round(done / seconds, 2) if seconds else None,
+        'p50': round(latency.quantile(0.5), 6) if latency.count else None,
+        'p95': round(latency.quantile(0.95), 6) if latency.count else None,
+        'latency_metric': latency_metric,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    with open(args.result_file, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def format_ms(seconds):
+    return f"{seconds * 1000:8.1f}" if seconds is not None else f"{'-':>8}"
+
+
+def format_change(value, base, lower_is_better=False):
+    if not value or not base:
+        return ''
+    change = (value - base) / base * 100
+    better = change < 0 if lower_is_better else change > 0
+    return f" ({change:+.0f}%{' ✅' if better and abs(change) >= 5 else ' ⚠️' if abs(change) >= 5 else ''})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stages', default=','.join(STAGES), help=f"Comma-separated, from: {', '.join(STAGES)}")
+    parser.add_argument('--pages', type=int, default=5, help='Listing pages per crawl')
+    parser.add_argument('--articles', type=int, default=60, help='Articles per extraction/summarization stage')
+    parser.add_argument('--concurrency', type=int, default=8, help='Threads / requests in flight for the concurrent stages')
+    parser.add_argument('--processes', type=int, default=2, help='Parser processes for extract-processes')
+    parser.add_argument('--startup-runs', type=int, default=10, help='Interpreter starts per startup stage')
+    parser.add_argument('--latency', type=float, default=0.02, help='Replay server seconds per response')
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of page requests answered 503')
+    parser.add_argument('--llm-latency', type=float, default=0.2, help='Mock LLM seconds per completion')
+    parser.add_argument('--llm-error-rate', type=float, default=0.0, help='Fraction of LLM requests answered 429')
+    parser.add_argument('--llm-rpm', type=int, default=500, help='Mock LLM requests per minute (enforced, and the budget summarize-async starts from)')
+    parser.add_argument('--llm-tpm', type=int, default=2000000, help='Mock LLM tokens per minute, likewise')
+    parser.add_argument('--corpus', help='Recorded corpus directory for the replay server (see replay_server.py record)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--baseline', help='Earlier results JSON to compare with')
+    parser.add_argument('--output', help='Results JSON path (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--verbose', action='store_true', help="Show the stages' own output")
+    # Internal: run a single stage in this process
+    parser.add_argument('--stage', help=argparse.SUPPRESS)
+    parser.add_argument('--site', help=argparse.SUPPRESS)
+    parser.add_argument('--llm', help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        run_stage(args)
+        return
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGE_FUNCTIONS]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+
+    if args.corpus:
+        args.corpus = os.path.abspath(args.corpus)  # Stages run in a scratch directory
+    site = ReplayServer(corpus=Corpus(args.corpus), latency=args.latency, jitter=args.jitter,
+                        error_rate=args.error_rate, seed=args.seed).start()
+    llm = MockOpenAIServer(
+        latency=args.llm_latency, error_rate=args.llm_error_rate, seed=args.seed, rpm=args.llm_rpm, tpm=args.llm_tpm
+    ).start()
+
+    print("="*80)
+    print("BENCHMARKS")
+    print("="*80)
+    print(f"Site: {site.base_url}{ALBORSA_CATEGORY[:20]}... latency {args.latency}s +{args.jitter}s, errors {args.error_rate:.0%}")
+    print(f"LLM:  {llm.base_url} latency {args.llm_latency}s, 429s {args.llm_error_rate:.0%}")
+    print(f"Pages: {args.pages}  Articles: {args.articles}  Concurrency: {args.concurrency}  Processes: {args.processes}")
+
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='bench-')  # Stages write their state files here, not into the repo
+    try:
+        for stage in stages:
+            required = STAGE_REQUIRES.get(stage)
+            if required and find_spec(required) is None:
+                results[stage] = {'skipped': f"{required} not installed"}
+                print(f"\n⏭️  {stage}: skipped ({required} not installed)")
+                continue
+
+            result_file = os.path.join(workdir, f"{stage}.json")
+            requests_before, errors_before = site.stats['requests'] + llm.stats['requests'], site.stats['errors'] + llm.stats['rate_limited']
+            command = [
+                sys.executable, os.path.abspath(__file__), '--stage', stage, '--site', site.base_url, '--llm', llm.base_url,
+                '--result-file', result_file, '--pages', str(args.pages), '--articles', str(args.articles),
+                '--concurrency', str(args.concurrency), '--processes', str(args.processes), '--startup-runs', str(args.startup_runs),
+                '--llm-rpm', str(args.llm_rpm), '--llm-tpm', str(args.llm_tpm),
+            ] + (['--corpus', args.corpus] if args.corpus else [])
+            print(f"\n▶️  {stage}...")
+            completed = subprocess.run(
+                command, cwd=workdir, env=dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (REPO, os.environ.get('PYTHONPATH'))))),
+                stdout=None if args.verbose else subprocess.DEVNULL, stderr=None if args.verbose else subprocess.PIPE, text=True
+            )
+            if completed.returncode != 0 or not os.path.exists(result_file):
+                results[stage] = {'failed': f"exit status {completed.returncode}"}
+                print(f"   ❌ failed (exit status {completed.returncode})")
+                if completed.stderr:
+                    print(completed.stderr.strip()[-2000:])
+                continue
+
+            with open(result_file, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            result['requests'] = site.stats['requests'] + llm.stats['requests'] - requests_before
+            result['injected_errors'] = site.stats['errors'] + llm.stats['rate_limited'] - errors_before
+            results[stage] = result
+            print(f"   ✅ {result['items']} {result['unit']} in {result['seconds']:.2f}s")
+    finally:
+        site.stop()
+        llm.stop()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get('stages', {})
+
+    print(f"\n{'='*80}")
+    print(f"{'stage':<20} {'rate':>18} {'p50 ms':>8} {'p95 ms':>8} {'peak MB':>8}")
+    print("-"*80)
+    for stage, result in results.items():
+        if 'rate' not in result:
+            print(f"{stage:<20} {result.get('skipped') or result.get('failed')}")
+            continue
+        base = baseline.get(stage, {})
+        rate = f"{result['rate']:.1f} {result['unit']}/s"
+        peak = f"{result['peak_rss_mb']:8.1f}" if result['peak_rss_mb'] is not None else f"{'-':>8}"
+        print(f"{stage:<20} {rate:>18} {format_ms(result['p50'])} {format_ms(result['p95'])} {peak}"
+              f"{format_change(result['rate'], base.get('rate'))}{format_change(result['p95'], base.get('p95'), lower_is_better=True)}")
+    print("="*80)
+
+    output = args.output or os.path.join(RESULTS, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'created_at': datetime.now().isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'settings': {name: getattr(args, name) for name in (
+                'pages', 'articles', 'concurrency', 'processes', 'startup_runs', 'latency', 'jitter', 'error_rate',
+                'llm_latency', 'llm_error_rate', 'corpus', 'seed')},
+            'stages': results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"💾 Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Crawl frontier shared by every seed category of a site.
+
+Each category keeps its own priority queue ordered by freshness (page 1
+before page 2, listing order within a page). pop() serves the category
+that has used the least of its weighted share so far, so a request
+budget is split between categories in proportion to their weight, and
+the share of a category that runs out of work goes to the others. One
+dedup set covers all categories, so an article listed under several of
+them is fetched once.
+"""
+import heapq
+import itertools
+import threading
+
+from metrics import QUEUE_DEPTH
+
+
+def page_freshness(page_number, position=0):
+    """Priority of something found on listing page N, at position i on that page"""
+    return 1.0 / page_number - position * 1e-4
+
+
+class CrawlFrontier:
+    def __init__(self, budget=None, seen=None):
+        """
+        budget: total requests (listing pages + articles) to hand out, None for no limit
+        seen: set of already-queued article URLs, shared with the caller if given
+        """
+        self.budget = budget
+        self.seen = seen if seen is not None else set()
+        self.categories = {}  # name -> {'weight', 'heap', 'spent'}
+        self.spent = 0
+        self.in_flight = 0
+        self.counter = itertools.count()  # FIFO tie-break for equal priorities
+        self.condition = threading.Condition()
+        self.depth = QUEUE_DEPTH.labels('frontier')
+
+    def add_category(self, name, weight=1.0):
+        with self.condition:
+            self.categories.setdefault(name, {'weight': float(weight), 'heap': [], 'spent': 0})
+
+    def push(self, category, url, kind='article', freshness=1.0, **info):
+        """Queue a listing page or article; returns False for an article already queued"""
+        with self.condition:
+            if kind == 'article':
+                if url in self.seen:
+                    return False
+                self.seen.add(url)
+            item = dict(info, category=category, url=url, kind=kind, freshness=freshness)
+            heapq.heappush(self.categories[category]['heap'], (-freshness, next(self.counter), item))
+            self.depth.inc()
+            self.condition.notify()
+            return True
+
+    def exhausted(self):
+        return self.budget is not None and self.spent >= self.budget
+
+    def _next_category(self):
+        """Non-empty category furthest below its weighted share (freshest head breaks ties)"""
+        best, best_key = None, None
+        for state in self.categories.values():
+            if not state['heap']:
+                continue
+            key = (state['spent'] / state['weight'], state['heap'][0][0])
+            if best_key is None or key < best_key:
+                best, best_key = state, key
+        return best
+
+    def pop(self, block=True):
+        """Next item to fetch, or None once the budget is spent or all work is done
+
+        With block=True, waits while the queues are empty but items handed
+        out earlier (which may still queue more work) are not task_done() yet.
+        """
+        with self.condition:
+            while True:
+                if self.exhausted():
+                    return None
+                state = self._next_category()
+                if state is not None:
+                    _, _, item = heapq.heappop(state['heap'])
+                    self.depth.dec()
+                    state['spent'] += 1
+                    self.spent += 1
+                    self.in_flight += 1
+                    return item
+                if not block or self.in_flight == 0:
+                    return None
+                self.condition.wait()
+
+    def task_done(self):
+        """Mark an item from pop() as processed"""
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def stats(self):
+        """Requests spent and items still queued per category"""
+        with self.condition:
+            total_weight = sum(state['weight'] for state in self.categories.values()) or 1.0
+            return {
+                name: {
+                    'weight': state['weight'],
+                    'share': round(state['weight'] / total_weight, 3),
+                    'spent': state['spent'],
+                    'queued': len(state['heap']),
+                }
+                for name, state in self.categories.items()
+            }
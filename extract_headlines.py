@@ -1,84 +1,99 @@
 #**Getting the headlines of articles in the website
 # Import libraries
-import requests
-from bs4 import BeautifulSoup
+from http_client import get_client
+from html_parser import ParseOnly, make_soup
 import pandas as pd
 
 # URL of the news website
 news_page_url = "https://www.alborsaanews.com/category/%D8%A7%D9%84%D8%A8%D9%88%D8%B1%D8%B5%D8%A9-%D9%88%D8%A7%D9%84%D8%B4%D8%B1%D9%83%D8%A7%D8%AA"
 
-# Send HTTP GET request
-response = requests.get(news_page_url)
-response.encoding = 'utf-8'
 
-# Check if the request was successful
-print("Status code:", response.status_code)
+def save_headlines(client, url=news_page_url, count=5, output="headlines.xlsx"):
+    """The first count <h2> headlines of a page, saved to output"""
+    # Send HTTP GET request
+    response = client.get(url)
+    response.encoding = 'utf-8'
 
-# Parse HTML
-soup = BeautifulSoup(response.text, "html.parser")
+    # Check if the request was successful
+    print("Status code:", response.status_code)
 
-# Find all <h2> tags (headlines)
-headline_tags = soup.find_all("h2")
+    # Parse HTML - only the headline tags
+    soup = make_soup(response.text, parse_only=ParseOnly(("h2", {})))
 
-# Extract the text of the first 5 headlines
-headlines = [tag.get_text(strip=True) for tag in headline_tags[:5]]
+    # Find all <h2> tags (headlines)
+    headline_tags = soup.find_all("h2")
 
-# Print the headlines
-for i, headline in enumerate(headlines, start=1):
-    print(i, headline)
+    # Extract the text of the first headlines
+    headlines = [tag.get_text(strip=True) for tag in headline_tags[:count]]
 
-# Save headlines to Excel (no encoding needed)
-df = pd.DataFrame(headlines, columns=["Headline"])
-df.to_excel("headlines.xlsx", index=False)
+    # Print the headlines
+    for i, headline in enumerate(headlines, start=1):
+        print(i, headline)
 
-print("Headlines saved to headlines.xlsx successfully!")
+    # Save headlines to Excel (no encoding needed)
+    df = pd.DataFrame(headlines, columns=["Headline"])
+    df.to_excel(output, index=False)
 
-# URL of the news website
-url = "https://www.alborsaanews.com/category/%D8%A7%D9%84%D8%A8%D9%88%D8%B1%D8%B5%D8%A9-%D9%88%D8%A7%D9%84%D8%B4%D8%B1%D9%83%D8%A7%D8%AA"
+    print(f"Headlines saved to {output} successfully!")
+    return headlines
+
+
+def save_all_titles(client, url=news_page_url, output="all_titles.xlsx"):
+    """Every heading and titled link on a page, saved to output"""
+    # Send HTTP GET request
+    response = client.get(url)
+    response.encoding = 'utf-8'
+
+    # Check if the request was successful
+    print("Status code:", response.status_code)
+
+    # Parse HTML - only headings and links
+    soup = make_soup(response.text, parse_only=ParseOnly(("h1", {}), ("h2", {}), ("h3", {}), ("h4", {}), ("a", {"title": True})))
+
+    #**Titles in homepage**
+    titles = []
 
-# Send HTTP GET request
-response = requests.get(url)
-response.encoding = 'utf-8'
+    # Titles in <h2>
+    for tag in soup.find_all("h2"):
+        title = tag.get_text(strip=True)
+        if title:
+            titles.append(title)
 
-# Check if the request was successful
-print("Status code:", response.status_code)
+    # Titles in <h1>, <h3>, <h4>
+    for tag in soup.find_all(["h1", "h3", "h4"]):
+        title = tag.get_text(strip=True)
+        if title:
+            titles.append(title)
 
-# Parse HTML
-soup = BeautifulSoup(response.text, "html.parser")
+    # Titles in <a> tags with a title attribute
+    for tag in soup.find_all("a", title=True):
+        title = tag.get("title").strip()
+        if title and title not in titles:
+            titles.append(title)
 
-#**Titles in homepage**
-titles = []
+    # Remove duplicates
+    titles = list(dict.fromkeys(titles))
 
-# Titles in <h2>
-for tag in soup.find_all("h2"):
-    title = tag.get_text(strip=True)
-    if title:
-        titles.append(title)
+    # Remove the last 5 titles
+    titles = titles[:-5] if len(titles) > 5 else []
 
-# Titles in <h1>, <h3>, <h4>
-for tag in soup.find_all(["h1", "h3", "h4"]):
-    title = tag.get_text(strip=True)
-    if title:
-        titles.append(title)
+    # Print titles
+    for i, title in enumerate(titles, start=1):
+        print(i, title)
 
-# Titles in <a> tags with a title attribute
-for tag in soup.find_all("a", title=True):
-    title = tag.get("title").strip()
-    if title and title not in titles:
-        titles.append(title)
+    # Save to Excel
+    df = pd.DataFrame(titles, columns=["Title"])
+    df.to_excel(output, index=False)
 
-# Remove duplicates
-titles = list(dict.fromkeys(titles))
+    print(f"{len(titles)} titles saved to {output} successfully!")
+    return titles
 
-# Remove the last 5 titles
-titles = titles[:-5] if len(titles) > 5 else []
 
-# Print titles
-for i, title in enumerate(titles, start=1):
-    print(i, title)
+def main(url=news_page_url, count=5):
+    client = get_client()  # Shared pooled session with retries
+    save_headlines(client, url, count)
+    save_all_titles(client, url)
 
-# Save to Excel
-df = pd.DataFrame(titles, columns=["Title"])
-df.to_excel("all_titles.xlsx", index=False)
 
-print(f"{len(titles)} titles saved to all_titles.xlsx successfully!")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
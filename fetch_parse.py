@@ -0,0 +1,76 @@
+"""
+Fetch/parse split: I/O threads download raw bytes, a process pool parses them.
+
+BeautifulSoup, TextBlob and VADER are CPU-bound and serialize on the GIL
+when run inside fetch threads. Here downloads stay on threads while the
+parsing/extraction function runs in worker processes, one per core, so
+throughput scales with the cores on the box.
+
+parse_func must be a module-level function (so it can be pickled) taking
+(raw_bytes, url, *parse_args) and returning a result or None.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from http_client import get_client
+from metrics import PARSE_SECONDS, QUEUE_DEPTH
+
+
+def timed_parse(parse_func, raw, url, *parse_args):
+    """Worker-side wrapper: (result, seconds), since metrics recorded in a worker process are lost"""
+    start = time.perf_counter()
+    result = parse_func(raw, url, *parse_args)
+    return result, time.perf_counter() - start
+
+
+class FetchParsePool:
+    def __init__(self, parse_func, parse_args=(), fetch_workers=10, processes=None, client=None, headers=None):
+        self.parse_func = parse_func
+        self.parse_args = tuple(parse_args)
+        self.fetch_workers = fetch_workers
+        self.processes = processes or os.cpu_count() or 1
+        self.client = client or get_client()
+        self.headers = headers
+
+    def fetch(self, url):
+        """Download raw bytes on an I/O thread (None on failure)"""
+        try:
+            return self.client.get(url, headers=self.headers).content
+        except Exception as e:
+            print(f"   ❌ Error fetching {url}: {e}")
+            return None
+
+    def run(self, urls):
+        """Fetch and parse every URL. Results come back in input order, None for failures"""
+        urls = list(urls)
+        results = [None] * len(urls)
+
+        # spawn, not fork: forking while fetch threads hold locks can deadlock the children
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.processes, mp_context=context) as cpu_pool, \
+                ThreadPoolExecutor(max_workers=self.fetch_workers) as io_pool:
+            downloads = {io_pool.submit(self.fetch, url): i for i, url in enumerate(urls)}
+
+            # Hand each page to the process pool as soon as it arrives
+            parses = {}
+            pending = QUEUE_DEPTH.labels('parse_pool')
+            parse_seconds = PARSE_SECONDS.labels(self.parse_func.__name__)
+            for future in as_completed(downloads):
+                i = downloads[future]
+                raw = future.result()
+                if raw is not None:
+                    parses[cpu_pool.submit(timed_parse, self.parse_func, raw, urls[i], *self.parse_args)] = i
+                    pending.inc()
+
+            for future in as_completed(parses):
+                i = parses[future]
+                pending.dec()
+                try:
+                    results[i], seconds = future.result()
+                    parse_seconds.observe(seconds)
+                except Exception as e:
+                    print(f"   ❌ Error parsing {urls[i]}: {e}")
+
+        return results
@@ -0,0 +1,179 @@
+"""
+Declarative per-site field specs, compiled into a single-pass extractor.
+
+A spec maps each field to its lookup rules in fallback order, e.g.
+title = first(Rule('h1', class_='jeg_post_title'), Rule('h1')) behaves
+like soup.find('h1', class_='jeg_post_title') or soup.find('h1'). The
+compiled extractor finds every field, fallbacks included, in one walk
+over the tree instead of one find() traversal per rule.
+"""
+from bs4 import Tag
+
+from html_parser import ParseOnly, attr_matches
+
+
+class Rule:
+    def __init__(self, name=None, attrs=None, test=None, **kwargs):
+        """Match like soup.find(name, attrs, **kwargs); test is an extra check on the Tag itself"""
+        self.name = name
+        self.test = test
+        self.attrs = dict(attrs or {})
+        # class_ is spelled that way for the same reason as in BeautifulSoup
+        for key, value in kwargs.items():
+            self.attrs['class' if key == 'class_' else key] = value
+
+    def matches(self, tag):
+        if self.name is not None and tag.name != self.name:
+            return False
+        for attr, expected in self.attrs.items():
+            if not attr_matches(tag.attrs.get(attr), expected):
+                return False
+        return self.test is None or self.test(tag)
+
+    def class_tokens(self):
+        """Class names that must be present for this rule to match, if it only filters on class"""
+        if self.name is not None or self.test is not None or list(self.attrs) != ['class']:
+            return None
+        expected = self.attrs['class']
+        if isinstance(expected, str) and ' ' not in expected:
+            return [expected]
+        if isinstance(expected, (list, tuple)) and all(isinstance(e, str) and ' ' not in e for e in expected):
+            return list(expected)
+        return None
+
+
+def first(*rules):
+    """Field resolving to the first match of the highest-priority rule that matches"""
+    return ('first', rules, None)
+
+
+def collect(rule, limit=None):
+    """Field resolving to a list of matches in document order (like find_all(limit=...))"""
+    return ('collect', (rule,), limit)
+
+
+class FieldExtractor:
+    def __init__(self, spec):
+        """Compile {field: first(...) | collect(...)} into lookup tables keyed by tag name and class"""
+        self.spec = spec
+        self.by_name = {}   # tag name -> [(field, priority, rule)]
+        self.by_class = {}  # class token -> [(field, priority, rule)]
+        self.anywhere = []  # rules that have to be tried on every tag
+
+        for field, (kind, rules, _) in spec.items():
+            for priority, rule in enumerate(rules):
+                entry = (field, priority, rule)
+                tokens = rule.class_tokens()
+                if rule.name is not None:
+                    self.by_name.setdefault(rule.name, []).append(entry)
+                elif tokens:
+                    for token in tokens:
+                        self.by_class.setdefault(token, []).append(entry)
+                else:
+                    self.anywhere.append(entry)
+
+        self.parse_only = ParseOnly(*[
+            (rule.name, rule.attrs) for _, rules, _ in spec.values() for rule in rules
+        ])
+
+    def extract(self, soup):
+        """Walk the tree once and return {field: Tag or None} ({field: [Tag]} for collect fields)"""
+        best = {}  # first-fields: field -> (priority, tag)
+        collected = {field: [] for field, (kind, _, _) in self.spec.items() if kind == 'collect'}
+        pending = len(self.spec)  # fields that could still improve
+
+        for node in soup.descendants:
+            if not isinstance(node, Tag):
+                continue
+
+            candidates = self.by_name.get(node.name, ())
+            classes = node.attrs.get('class')
+            if classes and self.by_class:
+                for token in classes:
+                    extra = self.by_class.get(token)
+                    if extra:
+                        candidates = list(candidates) + extra
+            if self.anywhere:
+                candidates = list(candidates) + self.anywhere
+
+            for field, priority, rule in candidates:
+                if field in collected:
+                    limit = self.spec[field][2]
+                    if limit is not None and len(collected[field]) >= limit:
+                        continue
+                    if rule.matches(node):
+                        collected[field].append(node)
+                        if limit is not None and len(collected[field]) >= limit:
+                            pending -= 1
+                    continue
+
+                current = best.get(field)
+                if current is not None and current[0] <= priority:
+                    continue
+                if rule.matches(node):
+                    best[field] = (priority, node)
+                    if priority == 0:
+                        pending -= 1
+
+            # Every field already has its top-priority match
+            if pending == 0:
+                break
+
+        result = {field: tag for field, (_, tag) in best.items()}
+        for field in self.spec:
+            if field in collected:
+                result[field] = collected[field]
+            else:
+                result.setdefault(field, None)
+        return result
+
+
+ALBORSA_ARTICLE = FieldExtractor({
+    'title': first(Rule('h1', class_='jeg_post_title'), Rule('h1')),
+    'author': first(Rule('div', class_='jeg_meta_author'), Rule('a', rel='author')),
+    'date': first(Rule('div', class_='jeg_meta_date'), Rule('time')),
+    'category': first(
+        Rule('a', rel='category tag'),
+        Rule('div', class_='jeg_meta_category'),
+        Rule('a', href=lambda href: '/category/' in href)
+    ),
+    'content': first(
+        Rule('div', class_='content-inner'),
+        Rule('div', class_='entry-content'),
+        Rule('article')
+    ),
+})
+
+
+def _class_contains(text):
+    return lambda value: bool(value) and text in str(value).lower()
+
+
+def _usable_image(tag):
+    # Skip tracking pixels and tiny images
+    src = tag.get('src', '')
+    return 'facebook.com' not in src and 'pixel' not in src and '1x1' not in src
+
+
+MUBASHER_ARTICLE = FieldExtractor({
+    'title': first(Rule('h1')),
+    'date': first(Rule('time'), Rule(class_=['date', 'published', 'post-date', 'article-date'])),
+    'author': first(Rule(class_=['author', 'byline', 'writer', 'article-author', 'post-author'])),
+    'author_meta': first(Rule('meta', {'name': 'author'}), Rule('meta', property='article:author')),
+    'lead_paragraphs': collect(Rule('p'), limit=3),
+    'breadcrumb': first(Rule(class_=['breadcrumb', 'breadcrumbs'])),
+    'category': first(Rule(class_=['category', 'tag', 'section', 'article-category', 'post-category', 'news-category'])),
+    'category_meta': first(Rule('meta', property='article:section'), Rule('meta', {'name': 'category'})),
+    'content': first(
+        Rule('div', class_=_class_contains('article-body')),
+        Rule('div', class_=_class_contains('article-content')),
+        Rule('div', class_=_class_contains('story-body')),
+        Rule('div', class_=_class_contains('news-body')),
+        Rule('div', id=_class_contains('article')),
+        Rule('article')
+    ),
+    'featured_image': first(Rule('img', class_=lambda value: bool(value) and (
+        'featured' in str(value).lower() or 'main' in str(value).lower()
+    ))),
+    'first_image': first(Rule('img', test=_usable_image)),
+})
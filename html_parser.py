@@ -0,0 +1,112 @@
+"""
+Pluggable HTML parsing backends for the scrapers.
+
+make_soup() builds a BeautifulSoup tree with the fastest installed
+builder (lxml, falling back to the pure-Python html.parser), optionally
+keeping only the parts of the page we read (see ParseOnly). The
+selectolax backend is used for plain link discovery, where no
+BeautifulSoup tree is needed at all.
+"""
+from bs4 import BeautifulSoup
+from bs4.filter import ElementFilter
+
+try:
+    import lxml  # noqa: F401
+    HAVE_LXML = True
+except ImportError:
+    HAVE_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# BeautifulSoup builders, fastest first
+SOUP_BACKENDS = (['lxml'] if HAVE_LXML else []) + ['html.parser']
+DEFAULT_BACKEND = SOUP_BACKENDS[0]
+LINK_BACKEND = 'selectolax' if LexborHTMLParser else DEFAULT_BACKEND
+
+
+class ParseOnly(ElementFilter):
+    """SoupStrainer-like filter that keeps every subtree whose root matches one of the rules
+
+    A rule is (tag_name, attrs). tag_name None matches any tag. Each attrs value is
+    True (attribute present), a string (exact value, or one token of a
+    multi-valued attribute like class/rel), a list of such strings (any of
+    them), or a function of the value.
+    """
+
+    def __init__(self, *rules):
+        super().__init__()
+        self.rules = rules
+
+    @property
+    def includes_everything(self):
+        return False
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        attrs = attrs or {}
+        for tag_name, wanted in self.rules:
+            if tag_name is not None and tag_name != name:
+                continue
+            if all(attr_matches(attrs.get(attr), expected) for attr, expected in wanted.items()):
+                return True
+        return False
+
+    def allow_string_creation(self, string):
+        # Text outside the kept subtrees is never needed
+        return False
+
+    def match(self, element, _known_rules=False):
+        if getattr(element, 'name', None) is None:
+            return False
+        return self.allow_tag_creation(None, element.name, element.attrs)
+
+
+def attr_matches(value, expected):
+    """Match one attribute value the way BeautifulSoup's find() does"""
+    if value is None:
+        return False
+    if expected is True:
+        return True
+    if isinstance(expected, (list, tuple)):
+        return any(attr_matches(value, option) for option in expected)
+
+    tokens = value if isinstance(value, list) else value.split()
+    joined = ' '.join(tokens) if isinstance(value, list) else value
+    if callable(expected):
+        return any(expected(token) for token in tokens) or expected(joined)
+    return expected == joined or expected in tokens
+
+
+def make_soup(markup, parse_only=None, backend=None):
+    """Parse markup with the given (or fastest available) BeautifulSoup builder"""
+    return BeautifulSoup(markup, backend or DEFAULT_BACKEND, parse_only=parse_only)
+
+
+# Headline tags on listing pages
+HEADLINES = ParseOnly(('h2', {}), ('h3', {}))
+
+# Links only, for link discovery on listing pages
+LINKS = ParseOnly(('a', {'href': True}))
+
+
+def headline_links(markup, backend=None):
+    """hrefs of the first link inside each h2/h3 headline, in document order"""
+    backend = backend or LINK_BACKEND
+
+    if backend == 'selectolax':
+        links = []
+        for heading in LexborHTMLParser(markup).css('h2, h3'):
+            link = heading.css_first('a[href]')
+            if link is not None and link.attributes.get('href'):
+                links.append(link.attributes['href'])
+        return links
+
+    links = []
+    soup = make_soup(markup, parse_only=HEADLINES, backend=backend)
+    for headline in soup.find_all(['h2', 'h3']):
+        link = headline.find('a', href=True)
+        if link and link.get('href'):
+            links.append(link.get('href'))
+    return links
@@ -0,0 +1,201 @@
+"""
+Persistent on-disk HTTP cache with conditional GET revalidation.
+
+Each response is stored as a body file plus a small JSON metadata file
+holding its ETag / Last-Modified validators. Entries are evicted when
+they get older than max_age or when the cache grows past max_bytes.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Response headers worth keeping with a cached body
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+
+class HttpCache:
+    def __init__(self, cache_dir='.http_cache', max_bytes=200 * 1024 * 1024, max_age=7 * 24 * 3600, fresh_for=120):
+        """
+        cache_dir: where bodies and metadata are stored
+        max_bytes: total body size before least recently used entries are evicted
+        max_age: seconds after which an entry is dropped instead of revalidated
+        fresh_for: seconds during which an entry is served without asking the server
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.fresh_for = fresh_for
+        self.lock = threading.Lock()
+        self.index = None  # key -> {'size', 'used_at', 'stored_at'}, loaded lazily
+        self.total_bytes = 0
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'evictions': 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _key(self, url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + '.json', base + '.body'
+
+    def _load_index(self):
+        if self.index is not None:
+            return
+        self.index = {}
+        self.total_bytes = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            key = name[:-5]
+            meta = self._read_meta(key)
+            if meta is None:
+                continue
+            self.index[key] = {'size': meta['size'], 'used_at': meta['used_at'], 'stored_at': meta['stored_at']}
+            self.total_bytes += meta['size']
+
+    def _read_meta(self, key):
+        meta_path, _ = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, key, meta):
+        meta_path, _ = self._paths(key)
+        tmp_path = meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def _remove(self, key):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        entry = self.index.pop(key, None)
+        if entry:
+            self.total_bytes -= entry['size']
+
+    def lookup(self, url):
+        """Return the cached entry for a URL, or None if missing or expired"""
+        key = self._key(url)
+        with self.lock:
+            self._load_index()
+            if key not in self.index:
+                return None
+            meta = self._read_meta(key)
+            if meta is None or time.time() - meta['stored_at'] > self.max_age:
+                self._remove(key)
+                return None
+            return meta
+
+    def is_fresh(self, entry):
+        return time.time() - entry['stored_at'] <= self.fresh_for
+
+    def conditional_headers(self, entry):
+        """Validators to send so the server can answer 304 Not Modified"""
+        headers = {}
+        if entry['headers'].get('ETag'):
+            headers['If-None-Match'] = entry['headers']['ETag']
+        if entry['headers'].get('Last-Modified'):
+            headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+        return headers
+
+    def store(self, url, response):
+        """Save a 200 response unless the server asked us not to"""
+        if response.status_code != 200 or 'no-store' in response.headers.get('Cache-Control', ''):
+            return
+
+        key = self._key(url)
+        _, body_path = self._paths(key)
+        body = response.content
+        now = time.time()
+        meta = {
+            'url': url,
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+            'size': len(body),
+            'stored_at': now,
+            'used_at': now
+        }
+
+        with self.lock:
+            self._load_index()
+            if key in self.index:
+                self._remove(key)
+            tmp_path = body_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, body_path)
+            self._write_meta(key, meta)
+            self.index[key] = {'size': meta['size'], 'used_at': now, 'stored_at': now}
+            self.total_bytes += meta['size']
+            self._evict()
+        self.stats['misses'] += 1
+
+    def build_response(self, entry, revalidated=False):
+        """Rebuild a requests.Response from a cached entry and mark it as used
+
+        Returns None if the body is gone (replaced or evicted by another
+        thread since lookup()); the caller should fetch the URL again.
+        """
+        key = self._key(entry['url'])
+        _, body_path = self._paths(key)
+        now = time.time()
+        with self.lock:
+            # Under the lock, so a concurrent store() or _evict() can't delete it halfway
+            try:
+                with open(body_path, 'rb') as f:
+                    body = f.read()
+            except FileNotFoundError:
+                self._remove(key)
+                return None
+
+            entry['used_at'] = now
+            if revalidated:
+                # A 304 confirms the body is still current
+                entry['stored_at'] = now
+            self._write_meta(key, entry)
+            if key in self.index:
+                self.index[key]['used_at'] = now
+                self.index[key]['stored_at'] = entry['stored_at']
+
+        self.stats['revalidated' if revalidated else 'hits'] += 1
+
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.url = entry['url']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = body
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+    def _evict(self):
+        # Age first, then least recently used until under the size budget
+        now = time.time()
+        for key, entry in list(self.index.items()):
+            if now - entry['stored_at'] > self.max_age:
+                self._remove(key)
+                self.stats['evictions'] += 1
+
+        if self.total_bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(self.index.items(), key=lambda item: item[1]['used_at']):
+            if self.total_bytes <= self.max_bytes:
+                break
+            self._remove(key)
+            self.stats['evictions'] += 1
+
+    def clear(self):
+        with self.lock:
+            self._load_index()
+            for key in list(self.index):
+                self._remove(key)
@@ -0,0 +1,313 @@
+"""
+Shared HTTP client used by every scraper in this repo.
+
+One pooled keep-alive session per process, gzip/brotli negotiation,
+retries with backoff for transient errors, and per-request timing.
+"""
+import asyncio
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from http_cache import HttpCache
+from metrics import FETCH_BYTES, FETCH_FIRST_BYTE_SECONDS, FETCH_RESPONSES, FETCH_RETRIES, FETCH_SECONDS, SLEEP_SECONDS
+from rate_limiter import BACKOFF_STATUSES, AdaptiveRateLimiter, parse_retry_after
+
+httpx = None  # Only needed for the async client, so imported when one is created
+
+# urllib3/httpx decode brotli only when one of these packages is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept-Encoding': ACCEPT_ENCODING,
+}
+
+# Status codes worth retrying - everything else is returned to the caller
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class FetchClient:
+    def __init__(self, headers=None, timeout=10, retries=3, backoff=0.5, pool_size=20, cache=None, rate_limiter=None):
+        """Create a pooled session with retries and compression
+
+        cache: optional HttpCache for conditional GETs
+        rate_limiter: optional AdaptiveRateLimiter that paces requests per host
+        """
+        self.timeout = timeout
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.headers = dict(DEFAULT_HEADERS)
+        if headers:
+            self.headers.update(headers)
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # Aggregate timing for every request made through this client
+        self.stats = {'requests': 0, 'retries': 0, 'errors': 0, 'bytes': 0, 'seconds': 0.0}
+
+    def get(self, url, headers=None, timeout=None, raise_for_status=True, **kwargs):
+        """GET a URL, retrying transient failures. Timing is stored on response.fetch_seconds"""
+        start = time.perf_counter()
+
+        # Only plain GETs are cacheable
+        cached = None
+        if self.cache and not kwargs:
+            cached = self.cache.lookup(url)
+            if cached and self.cache.is_fresh(cached):
+                response = self.cache.build_response(cached)
+                if response is not None:
+                    response.fetch_seconds = time.perf_counter() - start
+                    FETCH_RESPONSES.labels(urlparse(url).netloc, 'cache').inc()
+                    return response
+                cached = None  # Body removed by another thread: fetch it unconditionally
+            if cached:
+                request_headers = headers
+                headers = dict(headers or {}, **self.cache.conditional_headers(cached))
+
+        host = urlparse(url).netloc
+        if self.rate_limiter:
+            self.rate_limiter.acquire(host)
+        request_start = time.perf_counter()
+        if self.rate_limiter:
+            SLEEP_SECONDS.labels('rate_limit').inc(request_start - start)
+
+        response = None
+        try:
+            response = self.session.get(url, headers=headers, timeout=timeout or self.timeout, **kwargs)
+        except requests.RequestException:
+            self.stats['errors'] += 1
+            FETCH_RESPONSES.labels(host, 'error').inc()
+            raise
+        finally:
+            request_seconds = time.perf_counter() - request_start
+            self.stats['requests'] += 1
+            self.stats['seconds'] += time.perf_counter() - start
+            FETCH_SECONDS.labels(host).observe(request_seconds)
+            if self.rate_limiter:
+                self._report(host, response, request_seconds)
+
+        self.stats['bytes'] += len(response.content)
+        FETCH_BYTES.labels(host).inc(len(response.content))
+        FETCH_RESPONSES.labels(host, str(response.status_code)).inc()
+        # elapsed stops at the response headers; the rest of the time was the body
+        FETCH_FIRST_BYTE_SECONDS.labels(host).observe(response.elapsed.total_seconds())
+        retry_state = getattr(response.raw, 'retries', None)
+        if retry_state is not None:
+            self.stats['retries'] += len(retry_state.history)
+            if retry_state.history:
+                FETCH_RETRIES.labels(host).inc(len(retry_state.history))
+
+        if cached and response.status_code == 304:
+            revalidated = self.cache.build_response(cached, revalidated=True)
+            if revalidated is None:
+                # The body went away while we revalidated it: ask again without validators
+                return self.get(url, headers=request_headers, timeout=timeout, raise_for_status=raise_for_status)
+            response = revalidated
+        elif self.cache and not kwargs:
+            self.cache.store(url, response)
+
+        response.fetch_seconds = time.perf_counter() - start
+
+        if raise_for_status:
+            response.raise_for_status()
+        return response
+
+    def _report(self, host, response, latency):
+        """Tell the rate limiter how the request went, including any 429/503 urllib3 retried"""
+        if response is None:
+            self.rate_limiter.release(host, status=None, latency=latency)
+            return
+
+        status = response.status_code
+        retry_state = getattr(response.raw, 'retries', None)
+        if retry_state is not None and any(attempt.status in BACKOFF_STATUSES for attempt in retry_state.history):
+            status = BACKOFF_STATUSES[0]
+        retry_after = None
+        if response.status_code in BACKOFF_STATUSES:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        self.rate_limiter.release(host, status=status, latency=latency, retry_after=retry_after)
+
+    def get_text(self, url, encoding='utf-8', **kwargs):
+        """GET a URL and return its decoded body"""
+        response = self.get(url, **kwargs)
+        response.encoding = encoding
+        return response.text
+
+    def close(self):
+        self.session.close()
+
+
+def _load_httpx():
+    global httpx
+    if httpx is None:
+        try:
+            import httpx as module
+        except ImportError:
+            raise ImportError("The async client needs httpx. Install it with: pip install httpx") from None
+        httpx = module
+
+
+class AsyncFetchClient:
+    def __init__(self, headers=None, timeout=10, retries=3, backoff=0.5, max_connections=20, cache=None, rate_limiter=None):
+        """httpx-based counterpart of FetchClient for asyncio code
+
+        cache: optional HttpCache for conditional GETs (may be shared with a FetchClient);
+        cached and revalidated responses come back as requests.Response objects
+        rate_limiter: optional AdaptiveRateLimiter that paces requests per host
+        """
+        _load_httpx()
+
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.headers = dict(DEFAULT_HEADERS)
+        if headers:
+            self.headers.update(headers)
+
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=timeout,
+            limits=limits,
+            follow_redirects=True
+        )
+        self.stats = {'requests': 0, 'retries': 0, 'errors': 0, 'bytes': 0, 'seconds': 0.0}
+
+    async def get(self, url, headers=None, raise_for_status=True, **kwargs):
+        """GET a URL, retrying retryable statuses with exponential backoff"""
+        start = time.perf_counter()
+        host = urlparse(url).netloc
+
+        # Only plain GETs are cacheable
+        cached = None
+        if self.cache and not kwargs:
+            cached = self.cache.lookup(url)
+            if cached and self.cache.is_fresh(cached):
+                response = self.cache.build_response(cached)
+                if response is not None:
+                    response.fetch_seconds = time.perf_counter() - start
+                    FETCH_RESPONSES.labels(host, 'cache').inc()
+                    return response
+                cached = None  # Body removed by another thread: fetch it unconditionally
+            if cached:
+                request_headers = headers
+                headers = dict(headers or {}, **self.cache.conditional_headers(cached))
+
+        attempt = 0
+        try:
+            while True:
+                if self.rate_limiter:
+                    wait_start = time.perf_counter()
+                    await self.rate_limiter.acquire_async(host)
+                    SLEEP_SECONDS.labels('rate_limit').inc(time.perf_counter() - wait_start)
+                attempt_start = time.perf_counter()
+                response = None
+                try:
+                    response = await self.client.get(url, headers=headers, **kwargs)
+                except httpx.TransportError:
+                    if attempt >= self.retries:
+                        self.stats['errors'] += 1
+                        FETCH_RESPONSES.labels(host, 'error').inc()
+                        raise
+                finally:
+                    # Exactly one release per acquire, whatever was raised (redirect loops, cancellation...)
+                    latency = time.perf_counter() - attempt_start
+                    FETCH_SECONDS.labels(host).observe(latency)
+                    if self.rate_limiter:
+                        status = response.status_code if response is not None else None
+                        retry_after = None
+                        if status in BACKOFF_STATUSES:
+                            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                        self.rate_limiter.release(host, status=status, latency=latency, retry_after=retry_after)
+
+                if response is not None and (response.status_code not in RETRY_STATUSES or attempt >= self.retries):
+                    break
+
+                backoff = retry_delay(response, self.backoff, attempt)
+                SLEEP_SECONDS.labels('retry_backoff').inc(backoff)
+                await asyncio.sleep(backoff)
+                attempt += 1
+                self.stats['retries'] += 1
+                FETCH_RETRIES.labels(host).inc()
+        finally:
+            self.stats['requests'] += 1
+            self.stats['seconds'] += time.perf_counter() - start
+
+        self.stats['bytes'] += len(response.content)
+        FETCH_BYTES.labels(host).inc(len(response.content))
+        FETCH_RESPONSES.labels(host, str(response.status_code)).inc()
+
+        if cached and response.status_code == 304:
+            revalidated = self.cache.build_response(cached, revalidated=True)
+            if revalidated is None:
+                # The body went away while we revalidated it: ask again without validators
+                return await self.get(url, headers=request_headers, raise_for_status=raise_for_status)
+            response = revalidated
+        elif self.cache and not kwargs:
+            self.cache.store(url, response)
+
+        response.fetch_seconds = time.perf_counter() - start
+        if raise_for_status:
+            response.raise_for_status()
+        return response
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+def retry_delay(response, backoff, attempt):
+    """Seconds to wait before the next attempt, honouring Retry-After"""
+    if response is not None:
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        if retry_after is not None:
+            return retry_after
+    return backoff * (2 ** attempt)
+
+
+_shared_client = None
+
+
+def get_client(use_cache=True):
+    """Return the process-wide FetchClient, creating it on first use"""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = FetchClient(
+            cache=HttpCache() if use_cache else None,
+            rate_limiter=AdaptiveRateLimiter()
+        )
+    return _shared_client
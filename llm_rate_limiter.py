@@ -0,0 +1,154 @@
+"""
+Requests-per-minute and tokens-per-minute budget for LLM API calls.
+
+OpenAI limits an account on two axes at once: requests per minute and
+tokens per minute, where a request's tokens are counted up front as its
+prompt plus max_tokens. Each axis gets a token bucket here; acquire()
+waits until both can pay for a request, in arrival order, so a long
+prompt isn't starved by short ones. The budgets follow the server:
+x-ratelimit-limit-* headers replace the configured limits, and
+x-ratelimit-remaining-* can only lower the local estimate (other
+clients may share the key), down to waiting for x-ratelimit-reset-*
+when nothing is left. A 429 blocks every caller until its
+Retry-After and cuts both rates, which the next headers restore.
+
+Single event loop only (asyncio), like AsyncFetchClient.
+"""
+import asyncio
+import re
+import time
+
+from metrics import SLEEP_SECONDS
+
+DURATION = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def estimate_tokens(text):
+    """Rough token count of a prompt, on the high side for Arabic (about 2 characters per token)"""
+    return max(1, len(text.encode('utf-8')) // 4)
+
+
+def parse_duration(value):
+    """Seconds in an x-ratelimit-reset-* value ('1s', '6m0s', '20ms'), None if unreadable"""
+    parts = DURATION.findall(value or '')
+    if not parts:
+        return None
+    return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+
+def retry_after(headers):
+    """Seconds from retry-after-ms or Retry-After (in seconds), None if absent"""
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except ValueError:
+        pass
+    return None
+
+
+class Budget:
+    """One token bucket, refilled at limit per minute, holding at most burst seconds of it"""
+
+    def __init__(self, limit, burst):
+        self.limit = limit
+        self.burst = burst
+        self.available = self.capacity
+        self.last_refill = time.monotonic()
+
+    @property
+    def capacity(self):
+        return max(1.0, self.limit * self.burst / 60)
+
+    def refill(self, now):
+        self.available = min(self.capacity, self.available + (now - self.last_refill) * self.limit / 60)
+        self.last_refill = now
+
+    def wait(self, amount):
+        """Seconds until amount can be paid (amount is capped at the capacity)"""
+        missing = min(amount, self.capacity) - self.available
+        return max(0.0, missing * 60 / self.limit)
+
+
+class LLMRateLimiter:
+    def __init__(self, rpm=500, tpm=200000, burst=5, headroom=0.9, decrease=0.5, cooldown=5.0, backoff=2.0):
+        """
+        rpm, tpm: account limits, until response headers say otherwise
+        burst: seconds of budget that can be spent at once
+        headroom: fraction of each limit actually used
+        decrease: factor applied to both rates on a 429, at most once per cooldown seconds
+        backoff: seconds to block on a 429 without Retry-After
+        """
+        self.headroom = headroom
+        self.requests = Budget(rpm * headroom, burst)
+        self.tokens = Budget(tpm * headroom, burst)
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.backoff_seconds = backoff
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.rate_limited = 0
+        self.lock = None  # Created on first use, inside the running loop
+
+    async def acquire(self, tokens):
+        """Wait for one request and tokens worth of budget, then spend them"""
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.requests.refill(now)
+                self.tokens.refill(now)
+                wait = max(self.blocked_until - now, self.requests.wait(1), self.tokens.wait(tokens))
+                if wait <= 0:
+                    self.requests.available -= 1
+                    self.tokens.available -= min(tokens, self.tokens.capacity)
+                    return
+                SLEEP_SECONDS.labels('llm_rate_limit').inc(wait)
+                await asyncio.sleep(wait)
+
+    def settle(self, reserved, used):
+        """Refund tokens reserved for a request beyond what it used (max_tokens is rarely all used)"""
+        if used is not None and used < reserved:
+            self.tokens.available = min(self.tokens.capacity, self.tokens.available + reserved - used)
+
+    def update(self, headers):
+        """Adopt the limits and remaining budget reported in x-ratelimit-* response headers"""
+        for budget, kind in ((self.requests, 'requests'), (self.tokens, 'tokens')):
+            try:
+                limit = float(headers.get(f'x-ratelimit-limit-{kind}') or 0)
+                remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+                remaining = float(remaining) if remaining is not None else None
+            except ValueError:
+                continue
+            if limit:
+                budget.limit = limit * self.headroom
+            if remaining is not None:
+                now = time.monotonic()
+                budget.refill(now)
+                budget.available = min(budget.available, remaining)
+                reset = parse_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+                if remaining < 1 and reset:
+                    # Nothing left until the server's window resets
+                    self.blocked_until = max(self.blocked_until, now + reset)
+
+    def backoff(self, retry_after=None):
+        """A 429: block all requests for retry_after seconds and slow both rates down"""
+        now = time.monotonic()
+        self.rate_limited += 1
+        self.blocked_until = max(self.blocked_until, now + (retry_after if retry_after is not None else self.backoff_seconds))
+        if now - self.last_decrease >= self.cooldown:
+            self.last_decrease = now
+            for budget in (self.requests, self.tokens):
+                budget.refill(now)
+                budget.limit *= self.decrease
+                budget.available = min(budget.available, 0.0)
+
+    def metrics(self):
+        return {
+            'rpm': round(self.requests.limit, 1),
+            'tpm': round(self.tokens.limit),
+            'rate_limited': self.rate_limited,
+        }
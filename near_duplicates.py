@@ -0,0 +1,121 @@
+"""
+Near-duplicate article detection with MinHash-LSH.
+
+Wire stories are republished with small edits under new URLs. Each
+article's content is tokenized by arabic_text (Arabic diacritics, letter
+variants and digits folded) and cut into overlapping word shingles. A MinHash
+signature estimates the Jaccard similarity of two shingle sets, and
+banding the signature (LSH) means candidates are found by dict lookup
+instead of comparing against every stored article.
+"""
+import hashlib
+import random
+
+from arabic_text import tokenize, tokenize_batch
+
+MIN_WORDS = 20  # Shorter texts are too small to fingerprint reliably
+BATCH_SIZE = 256  # Articles tokenized per arabic_text batch in link_duplicates
+
+
+def shingles(words, size=3):
+    """Overlapping word n-grams"""
+    if len(words) < size:
+        return [' '.join(words)] if words else []
+    return [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+# Universal hashing modulo a Mersenne prime stands in for random permutations
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+def make_permutations(num_perm, seed=1):
+    rng = random.Random(seed)
+    return [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME)) for _ in range(num_perm)]
+
+
+PERMUTATIONS = make_permutations(64)
+
+
+def minhash(text, permutations=PERMUTATIONS, shingle_size=3, words=None):
+    """MinHash signature (tuple of ints) of a text, or None if it is too short
+
+    words: the text's arabic_text tokens, when already computed.
+    """
+    if words is None:
+        words = tokenize(text)
+    if len(words) < MIN_WORDS:
+        return None
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest(), 'big')
+        for shingle in set(shingles(words, shingle_size))
+    ]
+    return tuple(
+        min((a * h + b) % MERSENNE_PRIME for h in hashes) & MAX_HASH
+        for a, b in permutations
+    )
+
+
+def similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of the shingle sets behind two signatures"""
+    same = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+    return same / len(signature_a)
+
+
+class NearDuplicateIndex:
+    def __init__(self, threshold=0.7, bands=16):
+        """threshold: estimated Jaccard similarity at which two texts are the same story
+
+        With 64 hashes in 16 bands of 4, pairs at 0.7 similarity collide in
+        some band ~98% of the time and pairs at 0.3 only ~12%.
+        """
+        self.threshold = threshold
+        self.bands = bands
+        self.tables = [{} for _ in range(bands)]
+        self.signatures = {}  # key -> signature
+
+    def _band_keys(self, signature):
+        rows = len(signature) // self.bands
+        return [signature[band * rows:(band + 1) * rows] for band in range(self.bands)]
+
+    def find(self, signature):
+        """Key of the most similar stored text at or above threshold, or None"""
+        best, best_score = None, self.threshold
+        checked = set()
+        for table, band_key in zip(self.tables, self._band_keys(signature)):
+            for key in table.get(band_key, ()):
+                if key in checked:
+                    continue
+                checked.add(key)
+                score = similarity(signature, self.signatures[key])
+                if score >= best_score:
+                    best, best_score = key, score
+        return best
+
+    def add(self, key, signature):
+        self.signatures[key] = signature
+        for table, band_key in zip(self.tables, self._band_keys(signature)):
+            table.setdefault(band_key, []).append(key)
+
+
+def link_duplicates(articles, threshold=0.7, key='url'):
+    """Set article['duplicate_of'] to the first article (by list order) each one copies
+
+    Returns the number of duplicates found.
+    """
+    index = NearDuplicateIndex(threshold=threshold)
+    duplicates = 0
+    for start in range(0, len(articles), BATCH_SIZE):
+        batch = articles[start:start + BATCH_SIZE]
+        for article, words in zip(batch, tokenize_batch([article.get('content', '') for article in batch])):
+            article.pop('duplicate_of', None)
+            signature = minhash(None, words=words)
+            if signature is None:
+                continue
+            canonical = index.find(signature)
+            if canonical is not None and canonical != article.get(key):
+                article['duplicate_of'] = canonical
+                duplicates += 1
+            else:
+                index.add(article.get(key), signature)
+    return duplicates
@@ -0,0 +1,243 @@
+"""
+One command-line entry point for the scrapers, the summarizer and the reports.
+
+    python news_cli.py scrape alborsa --pages 3 --pipeline --incremental
+    python news_cli.py scrape mubasher --since 2025-10-01 --headless
+    python news_cli.py queue seed --pages 500 && python news_cli.py worker  # in N processes/shells
+    python news_cli.py queue export --output AlBorsaNewsScraped.json
+    python news_cli.py summarize --model gpt-4o-mini --concurrency 16
+    python news_cli.py summarize --batch  # nightly backfills
+    python news_cli.py sentiment --processes 4
+    python news_cli.py headlines
+    python news_cli.py report
+
+Each subcommand imports its module (and with it selenium, openai, pandas,
+TextBlob/VADER...) only when it runs, so the CLI itself starts in a few
+tens of milliseconds and a cron job pays only for the stack it uses.
+Nothing prompts for input: the API key comes from --api-key or
+OPENAI_API_KEY and the model from --model.
+
+Exit status is 0 on success, 1 when the command failed or found nothing.
+"""
+import argparse
+import sys
+
+
+def scrape_alborsa(args):
+    from AlBorsaNewsScraper import main
+    articles = main(
+        start_page=args.start_page, end_page=args.pages, delay=args.delay, output=args.output,
+        append=args.incremental, parquet=args.parquet, metrics_file=args.metrics, quiet=args.quiet,
+        verbose=args.verbose, concurrency=args.concurrency, incremental=args.incremental,
+        pipeline=args.pipeline, workers=args.workers, processes=args.processes,
+        use_feeds=args.feeds, since=args.since, until=args.until
+    )
+    return 0 if articles else 1
+
+
+def scrape_mubasher(args):
+    from Mubasher import main
+    ok = main(since=args.since, until=args.until, interactive=False, headless=args.headless, output=args.output)
+    return 0 if ok else 1
+
+
+def queue_seed(args):
+    from AlBorsaNewsScraper import AlBorsaNewsScraper
+    from work_queue import open_work_queue
+    work_queue = open_work_queue(args.queue)
+    scraper = AlBorsaNewsScraper()
+    categories = scraper.discover_categories() if args.all_categories else None
+    scraper.seed_work_queue(work_queue, args.start_page, args.pages, categories=categories, walk=args.walk)
+    return 0
+
+
+def queue_status(args):
+    from work_queue import open_work_queue
+    work_queue = open_work_queue(args.queue)
+    stats = work_queue.stats()
+    for kind, states in sorted(stats.items()):
+        print(f"📊 {kind}: " + ', '.join(f"{state} {count}" for state, count in sorted(states.items())))
+    if not stats:
+        print("📭 The queue is empty")
+    if args.retry_failed:
+        print(f"🔁 Requeued {work_queue.requeue_failed()} failed jobs")
+    return 0
+
+
+def queue_export(args):
+    from AlBorsaNewsScraper import AlBorsaNewsScraper
+    from work_queue import open_work_queue
+    articles = AlBorsaNewsScraper().export_work_queue(open_work_queue(args.queue), args.output, append=args.append)
+    return 0 if articles else 1
+
+
+def worker(args):
+    from AlBorsaNewsScraper import AlBorsaNewsScraper
+    from metrics import REGISTRY
+    from work_queue import open_work_queue
+    scraper = AlBorsaNewsScraper(quiet=args.quiet)
+    scraper.run_worker(
+        open_work_queue(args.queue), worker_id=args.worker_id, threads=args.threads, delay=args.delay,
+        visibility_timeout=args.visibility_timeout, incremental=args.incremental, since=args.since, until=args.until
+    )
+    if args.metrics:
+        REGISTRY.write(args.metrics)
+    return 0
+
+
+def summarize(args):
+    from AlBorsaArticleSummarizer import main
+    ok = main(
+        input_file=args.input, output_file=args.output, model=args.model, delay=args.delay,
+        api_key=args.api_key, base_url=args.base_url, interactive=False,
+        reports=not args.no_reports, metrics_file=args.metrics, concurrency=args.concurrency,
+        rpm=args.rpm, tpm=args.tpm, batch=args.batch, batch_file=args.batch_file, poll_interval=args.poll_interval
+    )
+    return 0 if ok else 1
+
+
+def sentiment(args):
+    from sentiment_analysis import main
+    main(processes=args.processes)
+    return 0
+
+
+def headlines(args):
+    from extract_headlines import main, news_page_url
+    main(url=args.url or news_page_url, count=args.count)
+    return 0
+
+
+def report(args):
+    from AlBorsaArticleSummarizer import create_reports
+    return 0 if create_reports(args.input, args.text, args.html) else 1
+
+
+def date_option(value):
+    """argparse type for --since/--until: rejects what arabic_dates can't read, keeps the string"""
+    from arabic_dates import as_datetime
+    try:
+        as_datetime(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"unrecognized date: {value!r} (e.g. 2025-10-01)") from None
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='news_cli.py', description="Al Borsa / Mubasher news scraping, summarization and reports"
+    )
+    commands = parser.add_subparsers(dest='command', metavar='command', required=True)
+
+    scrape = commands.add_parser('scrape', help='Scrape articles from a site')
+    sites = scrape.add_subparsers(dest='site', metavar='site', required=True)
+
+    alborsa = sites.add_parser('alborsa', help='Al Borsa News listing pages (or feeds) and articles')
+    alborsa.add_argument('--pages', type=int, default=3, help='Last listing page (default: 3)')
+    alborsa.add_argument('--start-page', type=int, default=1)
+    alborsa.add_argument('--delay', type=float, default=2, help='Seconds between requests (starting rate when rate-limited)')
+    alborsa.add_argument('--output', default='AlBorsaNewsScraped.json')
+    alborsa.add_argument('--incremental', action='store_true', help='Skip known articles and merge into --output')
+    alborsa.add_argument('--pipeline', action='store_true', help='Extract articles while listing pages are walked')
+    alborsa.add_argument('--workers', type=int, default=4, help='Extraction threads with --pipeline')
+    alborsa.add_argument('--concurrency', type=int, help='Extract with this many async requests in flight')
+    alborsa.add_argument('--processes', type=int, help='Parse articles on this many processes')
+    alborsa.add_argument('--feeds', action='store_true', help='Discover articles from the RSS feed/sitemaps')
+    alborsa.add_argument('--since', type=date_option, help='Only articles published on or after this date')
+    alborsa.add_argument('--until', type=date_option, help='Only articles published on or before this date')
+    alborsa.add_argument('--parquet', action='store_true', help='Also append to the Parquet corpus (needs pyarrow)')
+    alborsa.add_argument('--metrics', default='AlBorsaMetrics.prom', help="Metrics file ('' for none)")
+    alborsa.add_argument('--quiet', action='store_true', help='No per-article output')
+    alborsa.add_argument('--verbose', action='store_true', help='Show every extracted field')
+    alborsa.set_defaults(func=scrape_alborsa)
+
+    mubasher = sites.add_parser('mubasher', help='Mubasher Egypt sections, through Chrome (no login)')
+    mubasher.add_argument('--since', type=date_option, help='Only articles published on or after this date')
+    mubasher.add_argument('--until', type=date_option, help='Only articles published on or before this date')
+    mubasher.add_argument('--headless', action='store_true', help='Run Chrome without a window')
+    mubasher.add_argument('--output', default='mubasher_articles.json')
+    mubasher.set_defaults(func=scrape_mubasher)
+
+    queue_location = dict(default='AlBorsaWorkQueue.db', help='SQLite file, or scheme://... of a registered backend')
+    work_queue = commands.add_parser('queue', help='Shared work queue for distributed Al Borsa crawls')
+    queue_commands = work_queue.add_subparsers(dest='action', metavar='action', required=True)
+
+    seed = queue_commands.add_parser('seed', help='Queue listing pages for workers to crawl')
+    seed.add_argument('--queue', **queue_location)
+    seed.add_argument('--pages', type=int, default=3, help='Last listing page (default: 3)')
+    seed.add_argument('--start-page', type=int, default=1)
+    seed.add_argument('--all-categories', action='store_true', help='Every category linked from the home page')
+    seed.add_argument('--walk', action='store_true', help='Queue only the first page; each page queues the next')
+    seed.set_defaults(func=queue_seed)
+
+    status = queue_commands.add_parser('status', help='Jobs by kind and state')
+    status.add_argument('--queue', **queue_location)
+    status.add_argument('--retry-failed', action='store_true', help='Give failed jobs another round of attempts')
+    status.set_defaults(func=queue_status)
+
+    export = queue_commands.add_parser('export', help='Save the articles collected so far to JSON')
+    export.add_argument('--queue', **queue_location)
+    export.add_argument('--output', default='AlBorsaNewsScraped.json')
+    export.add_argument('--append', action='store_true', help='Merge into --output')
+    export.set_defaults(func=queue_export)
+
+    crawl_worker = commands.add_parser('worker', help='Crawl jobs from the shared work queue until it is drained')
+    crawl_worker.add_argument('--queue', **queue_location)
+    crawl_worker.add_argument('--worker-id', help='Name in the lease records (default: host-pid)')
+    crawl_worker.add_argument('--threads', type=int, default=1, help='Jobs in flight in this process')
+    crawl_worker.add_argument('--delay', type=float, default=1, help='Seconds between requests of each thread')
+    crawl_worker.add_argument('--visibility-timeout', type=float, default=120,
+                              help='Seconds before an unfinished job goes to another worker')
+    crawl_worker.add_argument('--incremental', action='store_true', help='Skip articles in the URL index')
+    crawl_worker.add_argument('--since', type=date_option, help='Only articles published on or after this date')
+    crawl_worker.add_argument('--until', type=date_option, help='Only articles published on or before this date')
+    crawl_worker.add_argument('--metrics', default='', help="Metrics file ('' for none)")
+    crawl_worker.add_argument('--quiet', action='store_true', help='No per-article output')
+    crawl_worker.set_defaults(func=worker)
+
+    summarizer = commands.add_parser('summarize', help='Summarize scraped articles with OpenAI')
+    summarizer.add_argument('--input', default='AlBorsaNewsScraped.json')
+    summarizer.add_argument('--output', default='AlBorsaArticlesSummarized.json')
+    summarizer.add_argument('--model', default='gpt-4o-mini')
+    summarizer.add_argument('--delay', type=float, default=1, help='Seconds between API calls')
+    summarizer.add_argument('--concurrency', type=int, help='Send this many API calls at once, within --rpm/--tpm')
+    summarizer.add_argument('--rpm', type=int, default=500, help='Requests per minute allowed (until the API reports it)')
+    summarizer.add_argument('--tpm', type=int, default=200000, help='Tokens per minute allowed (until the API reports it)')
+    summarizer.add_argument('--batch', action='store_true', help='Use the Batch API (results within 24h, at a lower price)')
+    summarizer.add_argument('--batch-file', default='AlBorsaSummaryBatch.jsonl', help='JSONL file of the batch requests')
+    summarizer.add_argument('--poll-interval', type=float, default=10, help='Seconds between the first batch status checks')
+    summarizer.add_argument('--api-key', default='', help='Default: OPENAI_API_KEY')
+    summarizer.add_argument('--base-url', help='OpenAI-compatible endpoint (default: OPENAI_BASE_URL or api.openai.com)')
+    summarizer.add_argument('--no-reports', action='store_true', help='Skip the text and HTML reports')
+    summarizer.add_argument('--metrics', default='AlBorsaSummarizerMetrics.prom', help="Metrics file ('' for none)")
+    summarizer.set_defaults(func=summarize)
+
+    sentiments = commands.add_parser('sentiment', help='TextBlob/VADER sentiment of the front-page articles')
+    sentiments.add_argument('--processes', type=int, help='Worker processes (default: one per core)')
+    sentiments.set_defaults(func=sentiment)
+
+    headline = commands.add_parser('headlines', help='Save the headlines and titles of a listing page to Excel')
+    headline.add_argument('--url', help='Page to read (default: the stock market category)')
+    headline.add_argument('--count', type=int, default=5, help='Headlines in headlines.xlsx')
+    headline.set_defaults(func=headlines)
+
+    reports = commands.add_parser('report', help='Rebuild the text/HTML reports from saved summaries')
+    reports.add_argument('--input', default='AlBorsaArticlesSummarized.json')
+    reports.add_argument('--text', default='Summary_Report.txt')
+    reports.add_argument('--html', default='Summary_Report.html')
+    reports.set_defaults(func=report)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted")
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
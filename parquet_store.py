@@ -0,0 +1,147 @@
+"""
+Columnar article storage: Parquet files partitioned by month and category.
+
+Articles, summaries and sentiment scores each get their own dataset under
+one root directory (root/articles, root/summaries, root/sentiment), laid
+out as month=YYYY-MM/category=.../part-*.parquet. Writes only add files,
+and readers pick the columns and partitions they need, so a month of
+headlines is read without touching any article text.
+
+Requires pyarrow (pip install pyarrow); HAVE_ARROW says whether it is installed.
+"""
+import uuid
+from datetime import date, datetime
+from importlib.util import find_spec
+
+from arabic_dates import url_date
+from article import as_dict
+
+# pyarrow takes longer to import than the rest of a scraper together, so it is
+# only loaded once a ParquetStore is created
+HAVE_ARROW = find_spec('pyarrow') is not None
+pa = ds = pq = None
+
+PARTITION_COLUMNS = ['month', 'category']
+UNCATEGORIZED = 'uncategorized'
+
+# Columns a summaries dataset keeps; the article text stays in the articles dataset
+SUMMARY_COLUMNS = ('url', 'title', 'summary', 'key_points', 'summarized_at', 'summarization_model', 'duplicate_of')
+
+
+def _load_arrow():
+    global pa, ds, pq
+    if pa is None:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+        pa, ds, pq = pyarrow, pyarrow.dataset, pyarrow.parquet
+
+
+def publish_date(record):
+    """Best guess at a record's publish date: published_at, the URL's /Y/M/D/, or scraped_at"""
+    published = record.get('published_at')
+    if published:
+        if not isinstance(published, date):
+            published = datetime.fromisoformat(str(published))
+        return published.date() if isinstance(published, datetime) else published
+    from_url = url_date(record.get('url') or record.get('URL'))
+    if from_url:
+        return from_url
+    scraped = record.get('scraped_at')
+    if scraped:
+        try:
+            return datetime.fromisoformat(scraped).date()
+        except ValueError:
+            pass
+    return None
+
+
+class ParquetStore:
+    def __init__(self, root='AlBorsaCorpus'):
+        if not HAVE_ARROW:
+            raise ImportError("ParquetStore needs pyarrow: pip install pyarrow")
+        _load_arrow()
+        self.root = root
+
+    def path(self, kind):
+        return f"{self.root}/{kind}"
+
+    def _rows(self, records, columns=None):
+        """Flatten records (Articles or dicts) into rows with partition values"""
+        rows = []
+        for record in records:
+            data = as_dict(record)
+            row = dict(data) if columns is None else {key: data.get(key) for key in columns}
+            published = publish_date(data)
+            row['published'] = published
+            row['month'] = published.strftime('%Y-%m') if published else 'unknown'
+            row['category'] = (data.get('category') or '').strip() or UNCATEGORIZED
+            rows.append(row)
+        return rows
+
+    def write(self, records, kind='articles', columns=None):
+        """Append records to the `kind` dataset (columns limits which fields are stored)"""
+        rows = self._rows(records, columns)
+        if not rows:
+            return 0
+        # from_pylist takes its columns from the first row, so list them all
+        names = list(dict.fromkeys(key for row in rows for key in row))
+        table = pa.Table.from_pydict({name: [row.get(name) for row in rows] for name in names})
+        pq.write_to_dataset(
+            table, self.path(kind), partition_cols=PARTITION_COLUMNS,
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore'
+        )
+        return len(rows)
+
+    def write_articles(self, articles):
+        return self.write(articles, 'articles')
+
+    def write_summaries(self, summarized_articles):
+        return self.write(summarized_articles, 'summaries', columns=SUMMARY_COLUMNS)
+
+    def write_sentiment(self, results):
+        return self.write(results, 'sentiment')
+
+    def dataset(self, kind='articles'):
+        """The `kind` dataset, with one schema covering columns added by later writes"""
+        partitioning = ds.partitioning(
+            pa.schema([(name, pa.string()) for name in PARTITION_COLUMNS]), flavor='hive'
+        )
+        dataset = ds.dataset(self.path(kind), format='parquet', partitioning=partitioning)
+        schemas = [fragment.physical_schema for fragment in dataset.get_fragments()]
+        if len(schemas) > 1:
+            schema = pa.unify_schemas(schemas, promote_options='permissive')
+            for name in PARTITION_COLUMNS:
+                schema = schema.append(pa.field(name, pa.string()))
+            dataset = ds.dataset(self.path(kind), format='parquet', partitioning=partitioning, schema=schema)
+        return dataset
+
+    def read(self, kind='articles', columns=None, months=None, categories=None, since=None, until=None):
+        """Read a pyarrow Table, loading only the requested columns and partitions
+
+        months: ['2025-10', ...] and categories: [...] prune whole directories;
+        since/until (dates) filter on the published column.
+        """
+        dataset = self.dataset(kind)
+        conditions = []
+        if months:
+            conditions.append(ds.field('month').isin(list(months)))
+        if categories:
+            conditions.append(ds.field('category').isin(list(categories)))
+        if since is not None:
+            conditions.append(ds.field('published') >= pa.scalar(since, pa.date32()))
+        if until is not None:
+            conditions.append(ds.field('published') <= pa.scalar(until, pa.date32()))
+
+        condition = None
+        for part in conditions:
+            condition = part if condition is None else condition & part
+        return dataset.to_table(columns=columns, filter=condition)
+
+    def headlines(self, month, categories=None):
+        """Title, URL, date and category of every article published in a month ('YYYY-MM')"""
+        return self.read(
+            'articles', columns=['published', 'title', 'url', 'category'],
+            months=[month], categories=categories
+        ).sort_by([('published', 'descending')])
@@ -0,0 +1,198 @@
+"""
+Adaptive per-host rate limiter.
+
+Each host gets a token bucket (requests per second) plus a concurrency
+limit, both tuned with AIMD: they grow slowly while responses are healthy
+and are cut multiplicatively on 429/503, on a Retry-After, or when
+latency climbs well above its usual level. Retry-After blocks the host
+until the given time. metrics() returns the current numbers, which are
+also kept in the metrics REGISTRY gauges for export.
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from metrics import RATE_LIMIT_BACKOFFS, RATE_LIMIT_CONCURRENCY, RATE_LIMIT_RATE
+
+# Responses that mean "slow down"
+BACKOFF_STATUSES = (429, 503)
+
+
+class HostState:
+    def __init__(self, rate, concurrency, burst):
+        self.rate = rate                # tokens per second
+        self.concurrency = concurrency  # allowed requests in flight (float, floored when used)
+        self.burst = burst
+        self.tokens = burst
+        self.last_refill = time.monotonic()
+        self.in_flight = 0
+        self.blocked_until = 0.0        # set from Retry-After
+        self.last_decrease = 0.0
+        self.latency = None             # fast EWMA of response time
+        self.baseline = None            # slow-moving "healthy" latency
+        self.requests = 0
+        self.backoffs = 0
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, initial_rate=1.0, min_rate=0.1, max_rate=20.0, initial_concurrency=4,
+                 max_concurrency=32, burst=1, increase=0.05, decrease=0.5, latency_factor=2.0, cooldown=2.0):
+        """
+        initial_rate: requests/second a new host starts at
+        increase: rate added per healthy response (additive increase)
+        decrease: factor applied to rate and concurrency on back-off (multiplicative decrease)
+        latency_factor: latency above baseline * factor counts as congestion
+        cooldown: minimum seconds between two decreases, so one burst of errors halves once
+        """
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+        self.hosts = {}
+        self.condition = threading.Condition()
+
+    def _state(self, host):
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = HostState(self.initial_rate, self.initial_concurrency, self.burst)
+            self._publish(host, state)
+        return state
+
+    @staticmethod
+    def _publish(host, state):
+        """Mirror a host's rate and concurrency in the exported gauges"""
+        RATE_LIMIT_RATE.labels(host).set(round(state.rate, 3))
+        RATE_LIMIT_CONCURRENCY.labels(host).set(int(state.concurrency))
+
+    def configure(self, host, rate=None, concurrency=None):
+        """Set a host's starting rate/concurrency (e.g. from a user-supplied delay)"""
+        with self.condition:
+            state = self._state(host)
+            if rate is not None:
+                state.rate = min(self.max_rate, max(self.min_rate, rate))
+            if concurrency is not None:
+                state.concurrency = concurrency
+            self._publish(host, state)
+
+    def _try_acquire(self, host):
+        """Take a token and a slot, returning 0, or return how long to wait first"""
+        state = self._state(host)
+        now = time.monotonic()
+        if now < state.blocked_until:
+            return state.blocked_until - now
+        if state.in_flight >= max(1, int(state.concurrency)):
+            return 0.05  # woken early by release() when waiting on the condition
+        state.refill(now)
+        if state.tokens < 1:
+            return (1 - state.tokens) / state.rate
+        state.tokens -= 1
+        state.in_flight += 1
+        state.requests += 1
+        return 0
+
+    def acquire(self, host):
+        """Block until a request to host is allowed"""
+        with self.condition:
+            while True:
+                wait = self._try_acquire(host)
+                if not wait:
+                    return
+                self.condition.wait(timeout=wait)
+
+    async def acquire_async(self, host):
+        """asyncio version of acquire()"""
+        while True:
+            with self.condition:
+                wait = self._try_acquire(host)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, host, status=None, latency=None, retry_after=None):
+        """Report how a request went; adjusts the host's rate and concurrency
+
+        status=None means no response at all (connection error, timeout),
+        which backs off like a 429 rather than counting as a success.
+        """
+        with self.condition:
+            state = self._state(host)
+            state.in_flight = max(0, state.in_flight - 1)
+            now = time.monotonic()
+
+            congested = status is None or status in BACKOFF_STATUSES or retry_after is not None
+            if latency is not None:
+                state.latency = latency if state.latency is None else 0.7 * state.latency + 0.3 * latency
+                if state.baseline is None or state.latency < state.baseline:
+                    state.baseline = state.latency
+                else:
+                    # Let the baseline drift up slowly if the site is just slower now
+                    state.baseline += 0.01 * (state.latency - state.baseline)
+                if state.latency > self.latency_factor * state.baseline and state.latency > 0.2:
+                    congested = True
+
+            if retry_after is not None:
+                state.blocked_until = max(state.blocked_until, now + retry_after)
+
+            if congested:
+                if now - state.last_decrease >= self.cooldown:
+                    state.rate = max(self.min_rate, state.rate * self.decrease)
+                    state.concurrency = max(1.0, state.concurrency * self.decrease)
+                    state.tokens = min(state.tokens, 0)
+                    state.last_decrease = now
+                    state.backoffs += 1
+                    RATE_LIMIT_BACKOFFS.labels(host).inc()
+            elif status < 400:
+                # Probe upward: +increase req/s and about +1 slot per window of successes
+                state.rate = min(self.max_rate, state.rate + self.increase)
+                state.concurrency = min(self.max_concurrency, state.concurrency + 1.0 / state.concurrency)
+            self._publish(host, state)
+
+            self.condition.notify_all()
+
+    def current_rate(self, host):
+        with self.condition:
+            return self._state(host).rate
+
+    def metrics(self):
+        """Snapshot of every host's limiter state"""
+        with self.condition:
+            return {
+                host: {
+                    'rate': round(state.rate, 3),
+                    'concurrency': int(state.concurrency),
+                    'in_flight': state.in_flight,
+                    'latency': round(state.latency, 4) if state.latency is not None else None,
+                    'baseline_latency': round(state.baseline, 4) if state.baseline is not None else None,
+                    'requests': state.requests,
+                    'backoffs': state.backoffs,
+                }
+                for host, state in self.hosts.items()
+            }
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
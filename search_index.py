@@ -0,0 +1,203 @@
+"""
+Full-text search over the scraped corpus (SQLite FTS5, BM25 ranking).
+
+Title, content, summary and key points are indexed after the shared
+arabic_text normalization (no diacritics or tatweel; one form of
+alef, yaa and taa marbuta; ASCII digits), and queries are normalized the
+same way, so أسهم / اسهم or البورصة with harakat all match. Articles are
+upserted by URL as they are scraped or summarized; nothing is rebuilt.
+
+The original text is kept next to the index, and snippets are cut from
+it (matched words in [brackets]), so results read as published rather
+than in the folded spelling the index searches.
+"""
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+
+from arabic_text import WORD, normalize, normalize_batch, tokenize
+from parquet_store import publish_date
+
+# bm25() column weights: title, content, summary, key_points
+BM25_WEIGHTS = (10.0, 1.0, 5.0, 3.0)
+# Original text kept in documents for snippets (added to older databases on open)
+TEXT_COLUMNS = ('content', 'summary', 'key_points')
+SNIPPET_WORDS = 12
+QUERY_TERM = re.compile(r'(\w+)(\*?)')
+FTS_OPERATORS = {'AND', 'OR', 'NOT', 'NEAR'}
+
+
+def fts_query(text):
+    """FTS5 query matching every word of free text (quoted, so no operator surprises)"""
+    words = WORD.findall(normalize(text))
+    return ' '.join(f'"{word}"' for word in words)
+
+
+def day(value):
+    """'YYYY-MM-DD' of a date, datetime or ISO string, as publish dates are stored"""
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)[:10]
+
+
+def query_terms(match):
+    """(words, prefixes) a normalized FTS5 query looks for, lower-cased"""
+    words, prefixes = set(), set()
+    for word, star in QUERY_TERM.findall(match):
+        if word not in FTS_OPERATORS:
+            (prefixes if star else words).add(word.lower())
+    return words, tuple(prefixes)
+
+
+def highlight(texts, terms, size=SNIPPET_WORDS):
+    """The size-word window of the original texts with the most query words, those in [brackets]
+
+    None if no word matches (a row indexed before the originals were kept).
+    """
+    words, prefixes = terms
+    best, best_hits = None, 0
+    for text in texts:
+        tokens = (text or '').split()
+        hits = [
+            any(word in words or word.startswith(prefixes) for word in tokenize(token))
+            for token in tokens
+        ]
+        count = sum(hits[:size])
+        start, top = 0, count
+        for i in range(size, len(tokens)):
+            count += hits[i] - hits[i - size]
+            if count > top:
+                start, top = i - size + 1, count
+        if top > best_hits:
+            best, best_hits = (tokens, hits, start), top
+    if best is None:
+        return None
+    tokens, hits, start = best
+    end = min(start + size, len(tokens))
+    snippet = ' '.join(f'[{token}]' if hit else token for token, hit in zip(tokens[start:end], hits[start:end]))
+    return ('…' if start > 0 else '') + snippet + ('…' if end < len(tokens) else '')
+
+
+class SearchIndex:
+    def __init__(self, db_path='AlBorsaSearch.db'):
+        """Open (or create) the search database"""
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                url TEXT UNIQUE NOT NULL,
+                title TEXT,
+                category TEXT,
+                published TEXT,
+                content TEXT,
+                summary TEXT,
+                key_points TEXT,
+                indexed_at TEXT DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE INDEX IF NOT EXISTS documents_published ON documents (published);
+            CREATE INDEX IF NOT EXISTS documents_category ON documents (category);
+            CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                title, content, summary, key_points, tokenize = 'unicode61'
+            );
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(documents)")}
+        for column in TEXT_COLUMNS:
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE documents ADD COLUMN {column} TEXT")
+        self.conn.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def add(self, article):
+        self.add_many([article])
+
+    def add_many(self, articles):
+        """Insert or update articles (Articles or dicts) by URL"""
+        with self.lock:
+            for article in articles:
+                published = publish_date(article)
+                key_points = ' '.join(article.get('key_points') or [])
+                # Summaries may arrive after the article; keep text already stored
+                row = self.conn.execute("""
+                    INSERT INTO documents (url, title, category, published, content, summary, key_points)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        title = COALESCE(NULLIF(excluded.title, ''), documents.title),
+                        category = COALESCE(NULLIF(excluded.category, ''), documents.category),
+                        published = COALESCE(excluded.published, documents.published),
+                        indexed_at = CURRENT_TIMESTAMP,
+                        content = COALESCE(excluded.content, documents.content),
+                        summary = COALESCE(excluded.summary, documents.summary),
+                        key_points = COALESCE(excluded.key_points, documents.key_points)
+                    RETURNING id
+                """, (
+                    article['url'], article.get('title', ''), article.get('category', ''),
+                    published.isoformat() if published else None,
+                    article.get('content') or None, article.get('summary') or None, key_points or None
+                )).fetchone()
+
+                previous = self.conn.execute(
+                    "SELECT title, content, summary, key_points FROM documents_fts WHERE rowid = ?", (row[0],)
+                ).fetchone() or ('', '', '', '')
+                title, content, summary, key_points = normalize_batch([
+                    article.get('title'), article.get('content'), article.get('summary'), key_points,
+                ])
+                self.conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (row[0],))
+                self.conn.execute(
+                    "INSERT INTO documents_fts (rowid, title, content, summary, key_points) VALUES (?, ?, ?, ?, ?)",
+                    (row[0], title or previous[0], content or previous[1], summary or previous[2],
+                     key_points or previous[3])
+                )
+            self.conn.commit()
+
+    def search(self, query, limit=20, since=None, until=None, categories=None, raw=False):
+        """Best BM25 matches: [{'url', 'title', 'category', 'published', 'score', 'snippet'}]
+
+        since/until: dates, datetimes or ISO strings, compared by day (until includes its whole
+        day); categories: list to keep.
+        raw=True passes FTS5 syntax (OR, NEAR, prefix*) through after normalizing it.
+        """
+        match = normalize(query) if raw else fts_query(query)
+        if not match:
+            return []
+
+        sql = f"""
+            SELECT d.url, d.title, d.category, d.published, d.content, d.summary, d.key_points,
+                   bm25(documents_fts, {', '.join(map(str, BM25_WEIGHTS))}) AS score,
+                   snippet(documents_fts, -1, '[', ']', '…', 12)
+            FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid
+            WHERE documents_fts MATCH ?
+        """
+        params = [match]
+        if since is not None:
+            sql += " AND d.published >= ?"
+            params.append(day(since))
+        if until is not None:
+            sql += " AND d.published <= ?"
+            params.append(day(until))
+        if categories:
+            sql += f" AND d.category IN ({','.join('?' * len(categories))})"
+            params.extend(categories)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        terms = query_terms(match)
+        results = []
+        for url, title, category, published, content, summary, key_points, score, indexed in rows:
+            # The FTS snippet is in normalized spelling; only used for rows stored without originals
+            snippet = highlight((content, summary, key_points, title), terms) or indexed
+            results.append({'url': url, 'title': title, 'category': category, 'published': published,
+                            'score': -score, 'snippet': snippet})
+        return results
+
+    def close(self):
+        self.conn.close()
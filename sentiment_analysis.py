@@ -1,101 +1,105 @@
-import requests
-from bs4 import BeautifulSoup
+from arabic_text import word_count
+from html_parser import LINKS, make_soup
 from textblob import TextBlob
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import pandas as pd
-from concurrent.futures import ThreadPoolExecutor
+from fetch_parse import FetchParsePool
+from http_client import get_client
+from parquet_store import HAVE_ARROW, ParquetStore
 
 # ---------------------------
 # 1️⃣ Main page URL
 # ---------------------------
 main_url = "https://www.alborsaanews.com"  # You can change to a category page
-response = requests.get(main_url)
-soup = BeautifulSoup(response.text, "html.parser")
 
 # ---------------------------
-# 2️⃣ Extract article links
-# ---------------------------
-articles = soup.find_all("a", href=True)
-article_links = []
-for a in articles:
-    href = a['href']
-    if "/2025/" in href and href not in article_links:
-        article_links.append(href)
-
-print(f"Found {len(article_links)} articles.")
-
-# ---------------------------
-# 3️⃣ Initialize sentiment analyzer
+# 2️⃣ Initialize sentiment analyzer (once per worker process)
 # ---------------------------
 analyzer = SentimentIntensityAnalyzer()
 
 # ---------------------------
-# 4️⃣ Function to process a single article
+# 3️⃣ Extract article links
 # ---------------------------
-def process_article(url):
-    if url.startswith("/"):
-        url_full = main_url + url
-    else:
-        url_full = url
-
-    try:
-        res = requests.get(url_full, timeout=10)
-        article_soup = BeautifulSoup(res.text, "lxml")  # faster parser
-
-        # Extract article text
-        body = article_soup.find("div", {"class": "post-content"})
-        text = body.get_text(separator=" ", strip=True) if body else article_soup.get_text(separator=" ", strip=True)
-
-        # Optional: Extract title
-        title_tag = article_soup.find("h1")
-        title = title_tag.get_text(strip=True) if title_tag else "No Title"
-
-        # TextBlob sentiment
-        blob = TextBlob(text)
-        polarity = blob.sentiment.polarity
-        subjectivity = blob.sentiment.subjectivity
-
-        # VADER sentiment
-        vader_scores = analyzer.polarity_scores(text)
-        if vader_scores["compound"] >= 0.05:
-            overall = "Positive"
-        elif vader_scores["compound"] <= -0.05:
-            overall = "Negative"
-        else:
-            overall = "Neutral"
-
-        return {
-            "Title": title,
-            "URL": url_full,
-            "Text Length": len(text),
-            "TextBlob Polarity": polarity,
-            "TextBlob Subjectivity": subjectivity,
-            "VADER Compound": vader_scores["compound"],
-            "VADER Positive": vader_scores["pos"],
-            "VADER Neutral": vader_scores["neu"],
-            "VADER Negative": vader_scores["neg"],
-            "Overall Sentiment": overall
-        }
-
-    except Exception as e:
-        print(f"Error processing {url_full}: {e}")
-        return None
+def get_article_links(client):
+    response = client.get(main_url)
+    response.encoding = "utf-8"
+    soup = make_soup(response.text, parse_only=LINKS)
+
+    articles = soup.find_all("a", href=True)
+    article_links = []
+    seen = set()
+    for a in articles:
+        href = a['href']
+        if "/2025/" in href and href not in seen:
+            seen.add(href)
+            article_links.append(main_url + href if href.startswith("/") else href)
+    return article_links
 
 # ---------------------------
-# 5️⃣ Parallel processing
+# 4️⃣ Function to analyze a single downloaded article (runs in a worker process)
 # ---------------------------
-results = []
-with ThreadPoolExecutor(max_workers=10) as executor:
-    for result in executor.map(process_article, article_links):
-        if result:
-            results.append(result)
+def analyze_article(raw, url_full):
+    article_soup = make_soup(raw.decode("utf-8", errors="replace"))  # lxml when installed
+
+    # Extract article text
+    body = article_soup.find("div", {"class": "post-content"})
+    text = body.get_text(separator=" ", strip=True) if body else article_soup.get_text(separator=" ", strip=True)
+
+    # Optional: Extract title
+    title_tag = article_soup.find("h1")
+    title = title_tag.get_text(strip=True) if title_tag else "No Title"
+
+    # TextBlob sentiment
+    blob = TextBlob(text)
+    polarity = blob.sentiment.polarity
+    subjectivity = blob.sentiment.subjectivity
+
+    # VADER sentiment
+    vader_scores = analyzer.polarity_scores(text)
+    if vader_scores["compound"] >= 0.05:
+        overall = "Positive"
+    elif vader_scores["compound"] <= -0.05:
+        overall = "Negative"
+    else:
+        overall = "Neutral"
+
+    return {
+        "Title": title,
+        "URL": url_full,
+        "Text Length": len(text),
+        "Word Count": word_count(text),
+        "TextBlob Polarity": polarity,
+        "TextBlob Subjectivity": subjectivity,
+        "VADER Compound": vader_scores["compound"],
+        "VADER Positive": vader_scores["pos"],
+        "VADER Neutral": vader_scores["neu"],
+        "VADER Negative": vader_scores["neg"],
+        "Overall Sentiment": overall
+    }
 
 # ---------------------------
-# 6️⃣ Save to Excel
+# 5️⃣ Parallel processing: downloads on threads, parsing + sentiment on every core
 # ---------------------------
-df = pd.DataFrame(results)
-df.to_excel("articles_sentiment.xlsx", index=False, engine='openpyxl')  # no encoding needed
-print("✅ Sentiment analysis saved to articles_sentiment.xlsx")
-
-
-
+def main(processes=None):
+    client = get_client()  # Shared pooled session with retries
+    article_links = get_article_links(client)
+    print(f"Found {len(article_links)} articles.")
+
+    pool = FetchParsePool(analyze_article, fetch_workers=10, processes=processes, client=client)
+    results = [result for result in pool.run(article_links) if result]
+
+    # ---------------------------
+    # 6️⃣ Save to Excel
+    # ---------------------------
+    df = pd.DataFrame(results)
+    df.to_excel("articles_sentiment.xlsx", index=False, engine='openpyxl')  # no encoding needed
+    print("✅ Sentiment analysis saved to articles_sentiment.xlsx")
+    
+    # Also append to the columnar corpus when pyarrow is installed
+    if HAVE_ARROW:
+        ParquetStore().write_sentiment(results)
+        print("✅ Sentiment scores appended to AlBorsaCorpus/sentiment")
+
+
+if __name__ == "__main__":
+    main()
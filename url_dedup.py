@@ -0,0 +1,151 @@
+"""
+URL canonicalization and a compact on-disk fingerprint index for dedup.
+
+The same article shows up as .../slug/, .../slug, with utm_* or fbclid
+parameters, /amp/ variants, and with its Arabic slug percent-encoded in
+upper or lower case (or not at all). canonicalize_url() maps all of
+these to one string, and UrlFingerprintIndex stores a 64-bit hash of it
+in a sorted array instead of the URL itself: 8 bytes per URL against
+~200 for a str in a set, so memory stays flat on multi-year crawls.
+At ten million URLs the chance of any hash collision is around 1e-6.
+save()/load() keep an index in a flat file (a header, then the sorted
+hashes); which articles were extracted is recorded in url_index.UrlIndex
+(SQLite, keyed by the same canonical URLs).
+"""
+import hashlib
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from itertools import chain
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'igshid', 'mc_cid', 'mc_eid',
+    'ref', 'ref_src', 'amp', 'output', '_ga', 'share', 'from',
+}
+TRACKING_PREFIXES = ('utm_',)
+
+# Characters left unescaped in a canonical path; everything else is %XX (upper case)
+PATH_SAFE = "/:@!$&'()*+,;=-._~"
+
+# File header: magic, then the number of hashes (little-endian u64); hashes follow, little-endian
+INDEX_MAGIC = b'URLFP2\n'
+INDEX_COUNT = struct.Struct('<Q')
+
+
+def canonicalize_url(url):
+    """One canonical string per article URL, for dedup keys (not for fetching)"""
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or 'https').lower()
+    if scheme == 'http':
+        scheme = 'https'
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = quote(unquote(parts.path), safe=PATH_SAFE)
+    path = path.rstrip('/')
+    if path.endswith('/amp'):
+        path = path[:-4]
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ''))
+
+
+def url_fingerprint(url):
+    """64-bit fingerprint of the canonical URL"""
+    digest = hashlib.blake2b(canonicalize_url(url).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+class UrlFingerprintIndex:
+    """Set-like index of URL fingerprints: `url in index`, index.add(url), len(index)
+
+    New fingerprints go to a small pending set and are merged into the
+    sorted array in batches (at least merge_every, and growing with the
+    index so merges stay amortized O(1) per add); lookups are a bisect.
+    """
+
+    def __init__(self, urls=(), merge_every=4096):
+        self.hashes = array('Q')
+        self.pending = set()
+        self.merge_every = merge_every
+        self.update(urls)
+
+    def _contains_hash(self, fingerprint):
+        if fingerprint in self.pending:
+            return True
+        i = bisect_left(self.hashes, fingerprint)
+        return i < len(self.hashes) and self.hashes[i] == fingerprint
+
+    def __contains__(self, url):
+        return self._contains_hash(url_fingerprint(url))
+
+    def __len__(self):
+        return len(self.hashes) + len(self.pending)
+
+    def add(self, url):
+        """Add a URL; returns True if it was not already present"""
+        fingerprint = url_fingerprint(url)
+        if self._contains_hash(fingerprint):
+            return False
+        self.pending.add(fingerprint)
+        if len(self.pending) >= max(self.merge_every, len(self.hashes) // 16):
+            self._merge()
+        return True
+
+    def update(self, urls):
+        for url in urls:
+            self.add(url)
+
+    def _merge(self):
+        if self.pending:
+            # Both runs sorted: Timsort finds them and merges in linear time
+            self.hashes = array('Q', sorted(chain(self.hashes, sorted(self.pending))))
+            self.pending = set()
+
+    def copy(self):
+        clone = UrlFingerprintIndex(merge_every=self.merge_every)
+        clone.hashes = array('Q', self.hashes)
+        clone.pending = set(self.pending)
+        return clone
+
+    def save(self, path):
+        """Write the index to disk (atomically replacing any previous file)"""
+        self._merge()
+        hashes = self.hashes
+        if sys.byteorder == 'big':
+            hashes = array('Q', hashes)
+            hashes.byteswap()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(INDEX_MAGIC)
+            f.write(INDEX_COUNT.pack(len(hashes)))
+            hashes.tofile(f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, merge_every=4096):
+        """Read an index written by save(); a missing file gives an empty index"""
+        index = cls(merge_every=merge_every)
+        if not os.path.exists(path):
+            return index
+        with open(path, 'rb') as f:
+            if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise ValueError(f"{path} is not a URL fingerprint index")
+            (count,) = INDEX_COUNT.unpack(f.read(INDEX_COUNT.size))
+            try:
+                index.hashes.fromfile(f, count)
+            except (EOFError, ValueError):
+                raise ValueError(f"{path} is truncated (expected {count} hashes)") from None
+        if sys.byteorder == 'big':
+            index.hashes.byteswap()
+        return index
@@ -0,0 +1,93 @@
+"""
+Persistent index of article URLs that were already extracted.
+
+Backed by SQLite so scheduled runs can skip articles scraped by earlier
+runs and stop paginating once they reach known territory. URLs are
+stored in canonical form (url_dedup.canonicalize_url), so a link that
+comes back with tracking parameters or without its trailing slash is
+still recognized.
+"""
+import sqlite3
+import threading
+from datetime import datetime
+
+from url_dedup import canonicalize_url
+
+# PRAGMA user_version of a database whose URLs are canonical
+CANONICAL_VERSION = 1
+
+
+class UrlIndex:
+    def __init__(self, db_path='AlBorsaUrlIndex.db'):
+        """Open (or create) the index database"""
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS extracted_urls (
+                url TEXT PRIMARY KEY,
+                title TEXT,
+                extracted_at TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < CANONICAL_VERSION:
+            self._canonicalize()
+
+    def _canonicalize(self):
+        """One-off migration of an index written with raw URLs"""
+        rows = self.conn.execute("SELECT url, title, extracted_at FROM extracted_urls").fetchall()
+        self.conn.execute("DELETE FROM extracted_urls")
+        # Oldest first, so the newest record of an article wins
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO extracted_urls (url, title, extracted_at) VALUES (?, ?, ?)",
+            [(canonicalize_url(url), title, at) for url, title, at in sorted(rows, key=lambda row: row[2])]
+        )
+        self.conn.execute(f"PRAGMA user_version = {CANONICAL_VERSION}")
+        self.conn.commit()
+
+    def __contains__(self, url):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM extracted_urls WHERE url = ?", (canonicalize_url(url),)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM extracted_urls").fetchone()[0]
+
+    def known(self, urls):
+        """Return the subset of urls (as given) whose canonical form is already in the index"""
+        by_key = {}
+        for url in urls:
+            by_key.setdefault(canonicalize_url(url), []).append(url)
+        keys = list(by_key)
+        found = set()
+        with self.lock:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT url FROM extracted_urls WHERE url IN ({placeholders})", chunk
+                ).fetchall()
+                for (key,) in rows:
+                    found.update(by_key[key])
+        return found
+
+    def add(self, url, title=None):
+        self.add_many([(url, title)])
+
+    def add_many(self, entries):
+        """Record (url, title) pairs as extracted"""
+        now = datetime.now().isoformat()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO extracted_urls (url, title, extracted_at) VALUES (?, ?, ?)",
+                [(canonicalize_url(url), title, now) for url, title in entries]
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
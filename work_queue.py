@@ -0,0 +1,272 @@
+"""
+Persistent work queue shared by crawl workers in several processes.
+
+The frontier (listing-page and article jobs) and the results live in a
+store every worker opens, so a backfill of years of archive pages is
+split between as many worker processes as the site tolerates, and a
+worker that dies loses nothing.
+
+A worker leases jobs for a visibility timeout. A job whose lease runs
+out without being completed is handed to another worker, up to
+max_attempts times before it is marked failed. Completion is
+idempotent: the first complete() of a job stores its result and queues
+its follow-up jobs in one transaction, later ones (from a worker whose
+lease had expired meanwhile) return False and change nothing. Jobs are
+deduplicated by (kind, url), so queueing the same page twice is a no-op,
+unless the job asks to be requeued once it has finished (see put_many).
+
+SQLiteWorkQueue (WAL journal) is the default backend, for workers on
+one machine. WAL needs shared memory, so workers on several machines
+need a server-backed store: register it with register_backend(scheme,
+factory) and open it with open_work_queue('scheme://...'). A backend
+provides put_many, lease, extend, complete, fail, pending, stats,
+results, requeue_failed and close, as SQLiteWorkQueue does.
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+from metrics import QUEUE_DEPTH
+
+
+class SQLiteWorkQueue:
+    def __init__(self, db_path='AlBorsaWorkQueue.db', max_attempts=3, busy_timeout=30):
+        """Open (or create) the queue database
+
+        max_attempts: leases of a job (expired or failed) before it is marked failed
+        busy_timeout: seconds to wait for another process's write lock
+        """
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        # Transactions are explicit (BEGIN IMMEDIATE), so a lease is one atomic read-and-claim
+        self.conn = sqlite3.connect(db_path, timeout=busy_timeout, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")  # Readers don't block the writer and vice versa
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                url TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                priority REAL NOT NULL DEFAULT 0,
+                state TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_token TEXT,
+                lease_expires REAL,
+                error TEXT,
+                UNIQUE (kind, url)
+            );
+            CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, priority DESC, id);
+            CREATE TABLE IF NOT EXISTS results (
+                url TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                data TEXT NOT NULL,
+                completed_at REAL NOT NULL,
+                PRIMARY KEY (kind, url)
+            );
+        """)
+
+    def transaction(self):
+        """Take the database write lock now rather than at the first write"""
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def put(self, kind, url, priority=0.0, **payload):
+        """Queue a job. Returns False if (kind, url) was already queued"""
+        return self.put_many([dict(payload, kind=kind, url=url, priority=priority)]) == 1
+
+    def put_many(self, jobs):
+        """Queue job dicts (kind, url, optional priority, anything else is payload). Returns how many were queued
+
+        A job already in the queue is left alone, unless the dict has
+        requeue=True and the job is done or failed: then it is queued again
+        with its new payload and fresh attempts (a page to read again on
+        the next crawl, say).
+        """
+        with self.lock:
+            self.transaction()
+            try:
+                added = self._insert(jobs)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def _insert(self, jobs):
+        added = 0
+        for job in jobs:
+            job = dict(job)
+            kind, url, priority = job.pop('kind'), job.pop('url'), job.pop('priority', 0.0)
+            conflict = "DO NOTHING"
+            if job.pop('requeue', False):
+                # Jobs still queued or leased keep going; finished ones start over
+                conflict = (
+                    "DO UPDATE SET state = 'queued', attempts = 0, available_at = 0, error = NULL, "
+                    "lease_token = NULL, payload = excluded.payload, priority = excluded.priority "
+                    "WHERE jobs.state IN ('done', 'failed')"
+                )
+            cursor = self.conn.execute(
+                "INSERT INTO jobs (kind, url, payload, priority) VALUES (?, ?, ?, ?) "
+                f"ON CONFLICT (kind, url) {conflict}",
+                (kind, url, json.dumps(job, ensure_ascii=False), priority)
+            )
+            added += cursor.rowcount
+        return added
+
+    def lease(self, owner, limit=1, visibility_timeout=120, kinds=None):
+        """Claim up to limit ready jobs for visibility_timeout seconds
+
+        Ready means queued (and past any retry delay), or leased with the
+        lease expired. Highest priority first. Returns job dicts: id, kind,
+        url, token, attempts and the payload; pass them back to complete()
+        or fail().
+        """
+        now = time.time()
+        kind_filter, kind_args = '', ()
+        if kinds:
+            kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})"
+            kind_args = tuple(kinds)
+        with self.lock:
+            self.transaction()
+            try:
+                # Jobs whose last allowed lease ran out are poison, not ready
+                self.conn.execute(
+                    "UPDATE jobs SET state = 'failed', error = 'lease expired', lease_token = NULL "
+                    "WHERE state = 'leased' AND lease_expires <= ? AND attempts >= ?",
+                    (now, self.max_attempts)
+                )
+                rows = self.conn.execute(
+                    "SELECT id, kind, url, payload, attempts FROM jobs "
+                    "WHERE ((state = 'queued' AND available_at <= ?) OR (state = 'leased' AND lease_expires <= ?))"
+                    f"{kind_filter} ORDER BY priority DESC, id LIMIT ?",
+                    (now, now) + kind_args + (limit,)
+                ).fetchall()
+                jobs = []
+                for job_id, kind, url, payload, attempts in rows:
+                    token = uuid.uuid4().hex
+                    self.conn.execute(
+                        "UPDATE jobs SET state = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                        "lease_token = ?, lease_expires = ? WHERE id = ?",
+                        (owner, token, now + visibility_timeout, job_id)
+                    )
+                    job = json.loads(payload)
+                    job.update(id=job_id, kind=kind, url=url, token=token, attempts=attempts + 1)
+                    jobs.append(job)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return jobs
+
+    def extend(self, job, visibility_timeout=120):
+        """Push back the lease of a long-running job. False if the lease was lost"""
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND state = 'leased' AND lease_token = ?",
+                (time.time() + visibility_timeout, job['id'], job['token'])
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job, result=None, jobs=()):
+        """Mark a job done, store its result (a JSON-able dict) and queue follow-up jobs, atomically
+
+        Returns False, storing nothing, if the job was already completed
+        (by a worker that took it over after this lease expired, or by an
+        earlier call).
+        """
+        with self.lock:
+            self.transaction()
+            try:
+                cursor = self.conn.execute(
+                    "UPDATE jobs SET state = 'done', lease_token = NULL, error = NULL WHERE id = ? AND state != 'done'",
+                    (job['id'],)
+                )
+                done = cursor.rowcount == 1
+                if done:
+                    if result is not None:
+                        self.conn.execute(
+                            "INSERT OR REPLACE INTO results (url, kind, data, completed_at) VALUES (?, ?, ?, ?)",
+                            (job['url'], job['kind'], json.dumps(result, ensure_ascii=False), time.time())
+                        )
+                    self._insert(jobs)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return done
+
+    def fail(self, job, error='', retry_delay=30):
+        """Give a job back after an error: retried after retry_delay * attempts seconds, or failed for good
+
+        Ignored if this lease was lost meanwhile. Returns True if the job will be retried.
+        """
+        retry = job['attempts'] < self.max_attempts
+        with self.lock:
+            self.conn.execute(
+                "UPDATE jobs SET state = ?, available_at = ?, lease_token = NULL, error = ? "
+                "WHERE id = ? AND state = 'leased' AND lease_token = ?",
+                ('queued' if retry else 'failed', time.time() + retry_delay * job['attempts'],
+                 str(error)[:500], job['id'], job['token'])
+            )
+        return retry
+
+    def pending(self):
+        """Jobs not finished yet (queued, or leased by some worker)"""
+        with self.lock:
+            count = self.conn.execute("SELECT COUNT(*) FROM jobs WHERE state IN ('queued', 'leased')").fetchone()[0]
+        QUEUE_DEPTH.labels('work_queue').set(count)
+        return count
+
+    def stats(self):
+        """{kind: {state: count}}"""
+        with self.lock:
+            rows = self.conn.execute("SELECT kind, state, COUNT(*) FROM jobs GROUP BY kind, state").fetchall()
+        counts = {}
+        for kind, state, count in rows:
+            counts.setdefault(kind, {})[state] = count
+        return counts
+
+    def results(self, kind='article'):
+        """Stored results of one job kind, in completion order"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT data FROM results WHERE kind = ? ORDER BY completed_at", (kind,)
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def requeue_failed(self):
+        """Give failed jobs a fresh set of attempts. Returns how many"""
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET state = 'queued', attempts = 0, available_at = 0 WHERE state = 'failed'"
+            )
+        return cursor.rowcount
+
+    def close(self):
+        self.conn.close()
+
+
+# URL scheme -> factory(location); 'sqlite' takes a file path
+BACKENDS = {'sqlite': SQLiteWorkQueue}
+
+
+def register_backend(scheme, factory):
+    """Make open_work_queue('scheme://...') call factory with the whole location"""
+    BACKENDS[scheme] = factory
+
+
+def open_work_queue(location='AlBorsaWorkQueue.db', **options):
+    """Open a queue by location: a SQLite file path (or sqlite:///path), or scheme://... of a registered backend"""
+    scheme, sep, rest = location.partition('://')
+    if not sep:
+        return SQLiteWorkQueue(location, **options)
+    if scheme not in BACKENDS:
+        raise ValueError(f"Unknown work queue backend '{scheme}' (registered: {', '.join(sorted(BACKENDS))})")
+    if scheme == 'sqlite':
+        return SQLiteWorkQueue(rest[1:] if rest.startswith('/') else rest, **options)
+    return BACKENDS[scheme](location, **options)